@@ -1,50 +1,181 @@
-from flask import Flask, jsonify, request
-from flask_cors import CORS
-import cv2
-import numpy as np
-
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
-
-# Initialize your system components
-class CalibrationManager:
-    def __init__(self):
-        self.is_calibrated = False
-
-    def calibrate(self, markers):
-        # Implement calibration logic
-        return {"status": "success", "message": "Calibration complete"}
-
-class DartTracker:
-    def track(self, frame_data):
-        # Implement dart tracking logic
-        return {"x": 0, "y": 0, "confidence": 0.95}
-
-# Initialize components
-calibration_manager = CalibrationManager()
-dart_tracker = DartTracker()
-
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    return jsonify({"status": "healthy"})
-
-@app.route('/api/calibrate', methods=['POST'])
-def calibrate():
-    try:
-        data = request.json
-        result = calibration_manager.calibrate(data.get('markers', []))
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/track-dart', methods=['POST'])
-def track_dart():
-    try:
-        data = request.json
-        result = dart_tracker.track(data.get('frame'))
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+from flask import Flask, Response, jsonify, request
+from flask_cors import CORS
+import cv2
+import json
+import itertools
+import os
+import threading
+import numpy as np
+from frame_stream import TrackingStream
+from image_decoder import decode_data_uri, decode_image_bytes
+from impact_detector import ImpactDetector, ImpactDetectorConfig
+from metrics import default_registry
+from triangulation import TriangulationEngine, load_camera_models
+
+try:
+    from flask_sock import Sock
+except ImportError:  # the streaming endpoint is optional
+    Sock = None
+
+app = Flask(__name__)
+CORS(app)  # Enable CORS for all routes
+
+# Initialize your system components
+class CalibrationManager:
+    def __init__(self):
+        self.is_calibrated = False
+
+    def calibrate(self, markers):
+        # Implement calibration logic
+        return {"status": "success", "message": "Calibration complete"}
+
+class DartTracker:
+    """
+    Per-camera impact detection; with calibrated camera models the tips
+    seen by the cameras are triangulated to a 3D position.
+    A detector carries the state of one frame sequence, so every camera
+    (or stream) gets its own, created under a lock.
+    """
+
+    def __init__(self, camera_models=None, detector_config=None, latch_timeout=0.5):
+        self.detector_config = detector_config
+        self.detectors = {}
+        self._lock = threading.Lock()
+        self.triangulator = TriangulationEngine(camera_models) if camera_models else None
+        # Cameras settle on an impact a few frames apart; each camera's tip
+        # is held until every camera has reported or latch_timeout (seconds
+        # of frame time) has passed since the first one
+        self.latch_timeout = latch_timeout
+        self._latched = {}
+        self._latch_lock = threading.Lock()
+
+    def detector(self, camera_id):
+        with self._lock:
+            if camera_id not in self.detectors:
+                self.detectors[camera_id] = ImpactDetector(self.detector_config or ImpactDetectorConfig())
+            return self.detectors[camera_id]
+
+    def release(self, camera_id):
+        """Drop the detector of a camera or stream that has gone away"""
+        with self._lock:
+            self.detectors.pop(camera_id, None)
+
+    def track(self, frame_data, camera_id):
+        """Feed one frame (ndarray, encoded bytes or data URI) to the camera's impact detector"""
+        if isinstance(frame_data, str):
+            frame = decode_data_uri(frame_data)
+        elif isinstance(frame_data, (bytes, bytearray, memoryview)):
+            frame = decode_image_bytes(frame_data)
+        else:
+            frame = frame_data
+
+        event = self.detector(camera_id).process(frame)
+        if event is None or event.kind != 'impact':
+            return {"detected": False, "event": event.kind if event else None,
+                    "x": None, "y": None, "confidence": 0.0}
+        return {"detected": True, "event": event.kind, "x": event.tip[0], "y": event.tip[1],
+                "confidence": event.confidence, "bbox": event.bbox}
+
+    def track_synced(self, synced):
+        """
+        Detect in every frame of a camera_sync.SyncedFrame. Impact tips are
+        latched per camera; once every camera of the set has one, or the
+        latch times out, they are triangulated together and cleared.
+        "detected" is True only for the frame set that completes an impact.
+        """
+        tips = {camera_id: self.detector(camera_id).detect_tip(frame)
+                for camera_id, frame in synced.frames.items()}
+
+        with self._latch_lock:
+            for camera_id, tip in tips.items():
+                if tip is not None and camera_id not in self._latched:
+                    self._latched[camera_id] = (tip, synced.timestamp)
+            if not self._latched:
+                return {"detected": False, "tips": {}, "pending": []}
+
+            first = min(latched_at for _, latched_at in self._latched.values())
+            complete = all(camera_id in self._latched for camera_id in synced.frames)
+            if not complete and synced.timestamp - first < self.latch_timeout:
+                return {"detected": False, "tips": {}, "pending": sorted(self._latched)}
+
+            latched = {camera_id: tip for camera_id, (tip, _) in self._latched.items()}
+            self._latched.clear()
+
+        impact = {camera_id: latched.get(camera_id) for camera_id in synced.frames}
+        result = {"detected": True, "pending": [],
+                  "tips": {camera_id: list(tip) if tip is not None else None for camera_id, tip in impact.items()}}
+        if self.triangulator is not None:
+            point = self.triangulator.triangulate(impact)
+            result["position"] = point.as_dict() if point is not None else None
+        return result
+
+def _load_camera_models():
+    path = os.getenv('CAMERA_MODELS_PATH', 'camera_models.json')
+    return load_camera_models(path) if os.path.exists(path) else None
+
+# Initialize components
+calibration_manager = CalibrationManager()
+dart_tracker = DartTracker(_load_camera_models())
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    return jsonify({"status": "healthy"})
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text-format metrics for frame processing and tracking streams"""
+    return Response(default_registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/calibrate', methods=['POST'])
+def calibrate():
+    try:
+        data = request.json
+        result = calibration_manager.calibrate(data.get('markers', []))
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/track-dart', methods=['POST'])
+def track_dart():
+    try:
+        data = request.json
+        if data.get('camera_id') is None:
+            return jsonify({"error": "camera_id is required"}), 400
+        result = dart_tracker.track(data.get('frame'), str(data['camera_id']))
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+if Sock is not None:
+    sock = Sock(app)
+    _stream_ids = itertools.count()
+
+    @sock.route('/api/track-dart/stream')
+    def track_dart_stream(ws):
+        """
+        Persistent tracking stream: the client sends binary JPEG frames and
+        receives one JSON text message per tracked frame. Frames arriving
+        while the tracker is busy replace the pending one instead of queueing.
+        Each connection tracks with its own detector, keyed by the optional
+        camera_id query argument plus a connection number.
+        """
+        stream_id = f"{request.args.get('camera_id', 'stream')}#{next(_stream_ids)}"
+        stream = TrackingStream(lambda frame: dart_tracker.track(frame, stream_id),
+                                lambda result: ws.send(json.dumps(result)))
+        try:
+            while stream.is_running:
+                message = ws.receive()
+                if message is None:
+                    break
+                if isinstance(message, str):
+                    # Text frames are reserved for control messages
+                    if message == 'close':
+                        break
+                    continue
+                stream.submit(message)
+        finally:
+            stream.close()
+            dart_tracker.release(stream_id)
+
+if __name__ == '__main__':
+    app.run(debug=True, port=5000)
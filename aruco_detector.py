@@ -1,83 +1,135 @@
-import cv2
-import numpy as np
-import logging
-from dataclasses import dataclass
-from typing import Tuple, List, Optional
-
-@dataclass
-class ArucoConfig:
-    """Configuration for ArUco detection"""
-    dictionary_type: int = cv2.aruco.DICT_5X5_250
-    marker_size: float = 0.05  # marker size in meters
-    camera_resolution: Tuple[int, int] = (1920, 1080)
-    min_markers: int = 1
-
-class ArucoDetector:
-    def __init__(self, config: ArucoConfig):
-        self.config = config
-        self.aruco_dict = cv2.aruco.getPredefinedDictionary(config.dictionary_type)
-        self.parameters = cv2.aruco.DetectorParameters()
-        self.detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.parameters)
-        self.logger = self._setup_logging()
-
-    def _setup_logging(self):
-        logger = logging.getLogger(__name__)
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
-        return logger
-
-    def detect_markers(self, frame: np.ndarray) -> Tuple[List, Optional[np.ndarray]]:
-        """
-        Detect ArUco markers in the given frame
-        Returns: (corners, ids)
-        """
-        if frame is None:
-            self.logger.error("No frame provided for marker detection")
-            return [], None
-
-        try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Optional: Add preprocessing to improve detection
-            gray = cv2.GaussianBlur(gray, (5, 5), 0)
-            gray = cv2.adaptiveThreshold(
-                gray, 255,
-                cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                cv2.THRESH_BINARY_INV, 11, 2
-            )
-            
-            # Updated marker detection with modified parameters
-            self.parameters.adaptiveThreshWinSizeMin = 3
-            self.parameters.adaptiveThreshWinSizeMax = 23
-            self.parameters.adaptiveThreshWinSizeStep = 10
-            self.parameters.adaptiveThreshConstant = 7
-            self.parameters.minMarkerPerimeterRate = 0.03
-            self.parameters.maxMarkerPerimeterRate = 4.0
-            self.parameters.polygonalApproxAccuracyRate = 0.03
-            self.parameters.minCornerDistanceRate = 0.05
-            self.parameters.minDistanceToBorder = 3
-            
-            corners, ids, rejected = self.detector.detectMarkers(gray)
-
-            if ids is not None:
-                self.logger.info(f"Detected {len(ids)} markers with IDs: {ids.flatten()}")
-                return corners, ids
-            else:
-                self.logger.debug("No markers detected")
-                return [], None
-
-        except Exception as e:
-            self.logger.error(f"Error in marker detection: {str(e)}")
-            return [], None
-
-    def draw_markers(self, frame: np.ndarray, corners: List, ids: np.ndarray) -> np.ndarray:
-        """Draw detected markers on the frame"""
-        if ids is not None and len(ids) > 0:
-            cv2.aruco.drawDetectedMarkers(frame, corners, ids)
+import cv2
+import numpy as np
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple, List, Optional
+from aruco_registry import detector_registry
+
+@dataclass
+class ArucoConfig:
+    """Configuration for ArUco detection"""
+    dictionary_type: int = cv2.aruco.DICT_5X5_250
+    marker_size: float = 0.05  # marker size in meters
+    camera_resolution: Tuple[int, int] = (1920, 1080)
+    min_markers: int = 1
+    profile: str = 'balanced'  # detector parameter set: fast, balanced or robust
+    preprocess: bool = False  # extra blur + adaptive threshold before detection
+
+class ArucoDetector:
+    STAGES = ('grayscale', 'preprocess', 'detect', 'total')
+
+    def __init__(self, config: ArucoConfig):
+        self.config = config
+        self.aruco_dict = detector_registry.get_dictionary(config.dictionary_type)
+        # Parameters are fixed at construction and shared; do not mutate them
+        self.parameters = detector_registry.get_parameters(config.profile)
+        self.logger = self._setup_logging()
+
+        # Per-stage timings in milliseconds: last frame and running totals
+        self.stage_timings: Dict[str, float] = {stage: 0.0 for stage in self.STAGES}
+        self.stage_totals: Dict[str, float] = {stage: 0.0 for stage in self.STAGES}
+        self.frames_timed = 0
+
+    @property
+    def detector(self) -> cv2.aruco.ArucoDetector:
+        """Process-wide detector for this config"""
+        return detector_registry.get(self.config.dictionary_type, self.config.profile)
+
+    def _setup_logging(self):
+        logger = logging.getLogger(__name__)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        return logger
+
+    def detect_markers(self, frame: np.ndarray) -> Tuple[List, Optional[np.ndarray]]:
+        """
+        Detect ArUco markers in the given frame
+        Returns: (corners, ids)
+        """
+        if frame is None:
+            self.logger.error("No frame provided for marker detection")
+            return [], None
+
+        try:
+            start = time.perf_counter()
+
+            # Convert to grayscale
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+            grayscale_done = time.perf_counter()
+
+            # The detector thresholds internally; this extra pass is opt-in
+            if self.config.preprocess:
+                gray = self._preprocess(gray)
+            preprocess_done = time.perf_counter()
+
+            corners, ids, rejected = self.detector.detectMarkers(gray)
+            detect_done = time.perf_counter()
+
+            self._record_timings(start, grayscale_done, preprocess_done, detect_done)
+
+            if ids is not None:
+                self.logger.info(f"Detected {len(ids)} markers with IDs: {ids.flatten()}")
+                return corners, ids
+            else:
+                self.logger.debug("No markers detected")
+                return [], None
+
+        except Exception as e:
+            self.logger.error(f"Error in marker detection: {str(e)}")
+            return [], None
+
+    def detect_gray(self, gray: np.ndarray) -> Tuple[List, Optional[np.ndarray]]:
+        """
+        Detect on an already grayscale image or region without logging or
+        timing; used by callers that run many small detections per frame
+        """
+        if self.config.preprocess:
+            gray = self._preprocess(gray)
+        corners, ids, rejected = self.detector.detectMarkers(gray)
+        if ids is None:
+            return [], None
+        return list(corners), ids
+
+    def _preprocess(self, gray: np.ndarray) -> np.ndarray:
+        """Legacy blur + adaptive threshold pass, kept for difficult lighting"""
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        return cv2.adaptiveThreshold(
+            gray, 255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY_INV, 11, 2
+        )
+
+    def _record_timings(self, start: float, grayscale_done: float,
+                        preprocess_done: float, detect_done: float):
+        timings = {
+            'grayscale': (grayscale_done - start) * 1000.0,
+            'preprocess': (preprocess_done - grayscale_done) * 1000.0,
+            'detect': (detect_done - preprocess_done) * 1000.0,
+            'total': (detect_done - start) * 1000.0,
+        }
+        self.stage_timings = timings
+        for stage, elapsed in timings.items():
+            self.stage_totals[stage] += elapsed
+        self.frames_timed += 1
+
+    def timing_summary(self) -> Dict[str, float]:
+        """Mean milliseconds per stage since construction or the last reset"""
+        if self.frames_timed == 0:
+            return {stage: 0.0 for stage in self.STAGES}
+        return {stage: total / self.frames_timed for stage, total in self.stage_totals.items()}
+
+    def reset_timings(self):
+        self.stage_totals = {stage: 0.0 for stage in self.STAGES}
+        self.frames_timed = 0
+
+    def draw_markers(self, frame: np.ndarray, corners: List, ids: np.ndarray) -> np.ndarray:
+        """Draw detected markers on the frame"""
+        if ids is not None and len(ids) > 0:
+            cv2.aruco.drawDetectedMarkers(frame, corners, ids)
         return frame
\ No newline at end of file
@@ -0,0 +1,119 @@
+import cv2
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+# Named DetectorParameters overrides; "default" is OpenCV's stock tuning.
+# The fast/balanced/robust profiles trade thresholding passes and corner
+# refinement against detection rate on small or poorly lit markers.
+PARAMETER_SETS: Dict[str, Dict[str, float]] = {
+    'default': {},
+    'fast': {
+        'adaptiveThreshWinSizeMin': 7,
+        'adaptiveThreshWinSizeMax': 17,
+        'adaptiveThreshWinSizeStep': 10,
+        'adaptiveThreshConstant': 7,
+        'minMarkerPerimeterRate': 0.05,
+        'maxMarkerPerimeterRate': 4.0,
+        'polygonalApproxAccuracyRate': 0.05,
+        'minCornerDistanceRate': 0.05,
+        'minDistanceToBorder': 3,
+        'cornerRefinementMethod': cv2.aruco.CORNER_REFINE_NONE,
+    },
+    'balanced': {
+        'adaptiveThreshWinSizeMin': 3,
+        'adaptiveThreshWinSizeMax': 23,
+        'adaptiveThreshWinSizeStep': 10,
+        'adaptiveThreshConstant': 7,
+        'minMarkerPerimeterRate': 0.03,
+        'maxMarkerPerimeterRate': 4.0,
+        'polygonalApproxAccuracyRate': 0.03,
+        'minCornerDistanceRate': 0.05,
+        'minDistanceToBorder': 3,
+    },
+    'robust': {
+        'adaptiveThreshWinSizeMin': 3,
+        'adaptiveThreshWinSizeMax': 53,
+        'adaptiveThreshWinSizeStep': 4,
+        'adaptiveThreshConstant': 7,
+        'minMarkerPerimeterRate': 0.02,
+        'maxMarkerPerimeterRate': 4.0,
+        'polygonalApproxAccuracyRate': 0.03,
+        'minCornerDistanceRate': 0.05,
+        'minDistanceToBorder': 3,
+        'cornerRefinementMethod': cv2.aruco.CORNER_REFINE_SUBPIX,
+    },
+}
+
+class DetectorRegistry:
+    """
+    Shares ArUco detectors keyed by (dictionary type, parameter set).
+    Dictionaries, DetectorParameters and one cv2.aruco.ArucoDetector per
+    key are built once per process, under a lock, and shared by every
+    thread (detectMarkers does not modify the detector), so warm_up() also
+    covers servers that run each request on a fresh thread.
+    """
+
+    def __init__(self, parameter_sets: Optional[Dict[str, Dict[str, float]]] = None):
+        self.parameter_sets = dict(PARAMETER_SETS if parameter_sets is None else parameter_sets)
+        self._dictionaries: Dict[int, cv2.aruco.Dictionary] = {}
+        self._parameters: Dict[str, cv2.aruco.DetectorParameters] = {}
+        self._detectors: Dict[Tuple[int, str], cv2.aruco.ArucoDetector] = {}
+        self._lock = threading.Lock()
+
+    def register_parameter_set(self, name: str, overrides: Dict[str, float]):
+        """Add or replace a named parameter set; detectors already handed out keep the old values"""
+        with self._lock:
+            self.parameter_sets[name] = dict(overrides)
+            self._parameters.pop(name, None)
+            for key in [key for key in self._detectors if key[1] == name]:
+                del self._detectors[key]
+
+    def get_dictionary(self, dictionary_type: int) -> cv2.aruco.Dictionary:
+        dictionary = self._dictionaries.get(dictionary_type)
+        if dictionary is None:
+            with self._lock:
+                dictionary = self._dictionaries.get(dictionary_type)
+                if dictionary is None:
+                    dictionary = cv2.aruco.getPredefinedDictionary(dictionary_type)
+                    self._dictionaries[dictionary_type] = dictionary
+        return dictionary
+
+    def get_parameters(self, parameter_set: str = 'default') -> cv2.aruco.DetectorParameters:
+        """Shared parameters object for a set; treat it as read-only"""
+        parameters = self._parameters.get(parameter_set)
+        if parameters is None:
+            with self._lock:
+                parameters = self._parameters.get(parameter_set)
+                if parameters is None:
+                    if parameter_set not in self.parameter_sets:
+                        raise KeyError(f"Unknown detector parameter set: {parameter_set}")
+                    parameters = cv2.aruco.DetectorParameters()
+                    for field, value in self.parameter_sets[parameter_set].items():
+                        setattr(parameters, field, value)
+                    self._parameters[parameter_set] = parameters
+        return parameters
+
+    def get(self, dictionary_type: int, parameter_set: str = 'default') -> cv2.aruco.ArucoDetector:
+        """Shared detector for a dictionary and parameter set"""
+        key = (dictionary_type, parameter_set)
+        detector = self._detectors.get(key)
+        if detector is None:
+            dictionary = self.get_dictionary(dictionary_type)
+            parameters = self.get_parameters(parameter_set)
+            with self._lock:
+                detector = self._detectors.get(key)
+                if detector is None:
+                    detector = cv2.aruco.ArucoDetector(dictionary, parameters)
+                    self._detectors[key] = detector
+        return detector
+
+    def warm_up(self, keys: Iterable[Tuple[int, str]]):
+        """Build dictionaries, parameters and detectors ahead of time"""
+        for dictionary_type, parameter_set in keys:
+            self.get(dictionary_type, parameter_set)
+
+# Process-wide registry
+detector_registry = DetectorRegistry()
+
+def get_detector(dictionary_type: int, parameter_set: str = 'default') -> cv2.aruco.ArucoDetector:
+    return detector_registry.get(dictionary_type, parameter_set)
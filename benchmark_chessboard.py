@@ -0,0 +1,72 @@
+import argparse
+import time
+import cv2
+import numpy as np
+from chessboard import find_chessboard_corners
+
+def make_board_frame(pattern_size, resolution, square=60, seed=0):
+    """Synthetic camera frame with a perspective-warped chessboard"""
+    cols, rows = pattern_size[0] + 1, pattern_size[1] + 1
+    board = np.full(((rows + 2) * square, (cols + 2) * square), 255, np.uint8)
+    for r in range(rows):
+        for c in range(cols):
+            if (r + c) % 2 == 0:
+                board[(r + 1) * square:(r + 2) * square, (c + 1) * square:(c + 2) * square] = 0
+
+    width, height = resolution
+    rng = np.random.default_rng(seed)
+    h, w = board.shape
+    src = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+    fit = 0.6 * min(width / w, height / h)
+    dst = src * fit + np.float32([width * 0.2, height * 0.2]) + rng.uniform(-30, 30, (4, 2)).astype(np.float32)
+    M = cv2.getPerspectiveTransform(src, dst)
+    frame = cv2.warpPerspective(board, M, (width, height), borderValue=200)
+    noise = rng.normal(0, 3, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+def make_empty_frame(resolution, seed=0):
+    """Textured frame without a chessboard, the slow case for findChessboardCorners"""
+    width, height = resolution
+    rng = np.random.default_rng(seed)
+    frame = cv2.resize(rng.integers(0, 256, (height // 16, width // 16), dtype=np.uint8),
+                       (width, height), interpolation=cv2.INTER_CUBIC)
+    return cv2.GaussianBlur(frame, (5, 5), 0)
+
+def time_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, float(np.median(timings)) * 1000.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-resolution vs pyramid chessboard search")
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--cols', type=int, default=9, help="inner corners per row")
+    parser.add_argument('--rows', type=int, default=6, help="inner corners per column")
+    parser.add_argument('--search-dimension', type=int, default=640)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    pattern_size = (args.cols, args.rows)
+    resolution = (args.width, args.height)
+    board = make_board_frame(pattern_size, resolution)
+    empty = make_empty_frame(resolution)
+
+    for label, frame in (('board', board), ('empty', empty)):
+        (full_found, full_corners), full_ms = time_call(
+            lambda: find_chessboard_corners(frame, pattern_size, search_dimension=0), args.repeats)
+        (pyr_found, pyr_corners), pyr_ms = time_call(
+            lambda: find_chessboard_corners(frame, pattern_size, search_dimension=args.search_dimension),
+            args.repeats)
+
+        print(f"{label:>5}: full {full_ms:8.1f} ms (found={full_found})  "
+              f"pyramid {pyr_ms:8.1f} ms (found={pyr_found})  speedup x{full_ms / max(pyr_ms, 1e-6):.1f}")
+        if full_found and pyr_found:
+            delta = np.linalg.norm(full_corners.reshape(-1, 2) - pyr_corners.reshape(-1, 2), axis=1)
+            print(f"       corner difference after refinement: max {delta.max():.4f} px, mean {delta.mean():.4f} px")
+
+if __name__ == '__main__':
+    main()
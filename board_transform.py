@@ -0,0 +1,172 @@
+import hashlib
+import cv2
+import numpy as np
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable, Optional, Tuple
+from undistortion import CameraUndistorter
+
+# calibration_data inputs of the transform, each with the keys it may be
+# stored under (first match wins), in fingerprint order
+TRANSFORM_KEYS = (
+    ('camera_matrix', 'cameraMatrix', 'mtx'),
+    ('dist_coeffs', 'distCoeffs', 'dist'),
+    ('homography',),
+    ('image_points',),
+    ('board_points',),
+    ('board_rotation', 'rvec'),
+    ('board_translation', 'tvec'),
+    ('image_size',),
+)
+CAMERA_MATRIX, DIST_COEFFS, HOMOGRAPHY, IMAGE_POINTS, BOARD_POINTS, ROTATION, TRANSLATION, IMAGE_SIZE = TRANSFORM_KEYS
+
+def _array(data: dict, *keys) -> Optional[np.ndarray]:
+    for key in keys:
+        if data.get(key) is not None:
+            return np.asarray(data[key], dtype=np.float64)
+    return None
+
+class BoardTransform:
+    """
+    Camera -> board mapping compiled once per calibration. Board
+    coordinates are metres in the board plane with the bull at the origin.
+
+    * 3D points (N, 3), e.g. from triangulation, go through the rigid
+      transform: board = R_inv @ (p - t), where (R, t) is the board pose
+      (rvec/tvec or board_rotation/board_translation, board -> world).
+    * 2D pixel points (N, 2) are undistorted (if intrinsics are given) and
+      mapped through the image -> board homography, taken from 'homography'
+      or fitted from 'image_points'/'board_points'.
+    """
+
+    def __init__(self, calibration_data: dict, key: Hashable = None):
+        self.key = key
+        self.camera_matrix = _array(calibration_data, *CAMERA_MATRIX)
+        dist = _array(calibration_data, *DIST_COEFFS)
+        self.dist_coeffs = dist.ravel() if dist is not None else None
+        image_size = calibration_data.get('image_size')
+        self.image_size = tuple(int(v) for v in image_size) if image_size is not None else None
+        self.undistorter = None
+        if self.camera_matrix is not None and self.dist_coeffs is not None:
+            self.undistorter = CameraUndistorter(self.camera_matrix, self.dist_coeffs, image_size=self.image_size)
+
+        # Rigid board pose: p_world = R @ p_board + t
+        rotation = _array(calibration_data, *ROTATION)
+        translation = _array(calibration_data, *TRANSLATION)
+        self.rotation = None
+        self.translation = None
+        self.inverse_rotation = None
+        if rotation is not None and translation is not None:
+            if rotation.size == 3:
+                rotation, _ = cv2.Rodrigues(rotation.reshape(3, 1))
+            self.rotation = rotation.reshape(3, 3)
+            self.translation = translation.reshape(3)
+            self.inverse_rotation = self.rotation.T
+
+        # Image -> board homography (on undistorted pixels)
+        homography = _array(calibration_data, *HOMOGRAPHY)
+        if homography is None:
+            image_points = _array(calibration_data, *IMAGE_POINTS)
+            board_points = _array(calibration_data, *BOARD_POINTS)
+            if image_points is not None and board_points is not None:
+                image_points = self._undistort(image_points.reshape(-1, 2))
+                board_points = board_points.reshape(len(image_points), -1)[:, :2]
+                homography, _ = cv2.findHomography(image_points, board_points)
+        self.homography = homography.reshape(3, 3) if homography is not None else None
+        self.inverse_homography = np.linalg.inv(self.homography) if self.homography is not None else None
+
+    @property
+    def has_rigid(self) -> bool:
+        return self.rotation is not None
+
+    @property
+    def has_homography(self) -> bool:
+        return self.homography is not None
+
+    def _undistort(self, pixels: np.ndarray) -> np.ndarray:
+        if self.undistorter is None:
+            return pixels
+        return self.undistorter.undistort_points(pixels)
+
+    def to_board(self, points: np.ndarray) -> np.ndarray:
+        """(N, 3) world points or (N, 2) pixels -> (N, 2) board-plane coordinates"""
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim == 1:
+            points = points.reshape(1, -1)
+
+        if points.shape[1] == 3:
+            if not self.has_rigid:
+                raise ValueError("Calibration has no board pose for 3D points")
+            # Row-vector form of R^T @ (p - t)
+            return ((points - self.translation) @ self.rotation)[:, :2]
+
+        if points.shape[1] == 2:
+            if not self.has_homography:
+                raise ValueError("Calibration has no image-to-board homography for 2D points")
+            undistorted = self._undistort(points)
+            mapped = cv2.perspectiveTransform(undistorted.reshape(-1, 1, 2), self.homography)
+            return mapped.reshape(-1, 2)
+
+        raise ValueError(f"Expected (N, 2) or (N, 3) points, got shape {points.shape}")
+
+    def from_board(self, board_points: np.ndarray) -> np.ndarray:
+        """(N, 2) board-plane coordinates -> (N, 3) world points, or undistorted pixels without a pose"""
+        board_points = np.asarray(board_points, dtype=np.float64).reshape(-1, 2)
+        if self.has_rigid:
+            planar = np.hstack((board_points, np.zeros((len(board_points), 1))))
+            return planar @ self.inverse_rotation + self.translation
+        if self.has_homography:
+            return cv2.perspectiveTransform(board_points.reshape(-1, 1, 2), self.inverse_homography).reshape(-1, 2)
+        raise ValueError("Calibration has neither a board pose nor a homography")
+
+    def undistortion_maps(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Full-frame remap tables (CV_16SC2), built on first use; needs image_size"""
+        if self.undistorter is None or self.image_size is None:
+            return None
+        return self.undistorter.maps(self.image_size)
+
+def calibration_key(calibration_data: dict) -> Hashable:
+    """'version' when the calibration carries one, else a fingerprint of its transform inputs"""
+    version = calibration_data.get('version')
+    if version is not None:
+        return ('version', version)
+    digest = hashlib.blake2b(digest_size=16)
+    for keys in TRANSFORM_KEYS:
+        # Resolve aliases the same way BoardTransform does, so 'distCoeffs'
+        # and 'dist_coeffs' fingerprint identically
+        value = _array(calibration_data, *keys)
+        if value is None:
+            continue
+        digest.update(keys[0].encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    return ('fingerprint', digest.hexdigest())
+
+class BoardTransformCache:
+    """
+    Compiled BoardTransforms keyed by calibration version or fingerprint,
+    so a recalibration invalidates the cached transform automatically.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._transforms: 'OrderedDict[Hashable, BoardTransform]' = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, calibration_data: dict) -> BoardTransform:
+        key = calibration_key(calibration_data)
+        with self._lock:
+            transform = self._transforms.get(key)
+            if transform is not None:
+                self._transforms.move_to_end(key)
+                return transform
+
+        transform = BoardTransform(calibration_data, key)
+        with self._lock:
+            self._transforms[key] = transform
+            while len(self._transforms) > self.max_entries:
+                self._transforms.popitem(last=False)
+        return transform
+
+    def clear(self):
+        with self._lock:
+            self._transforms.clear()
@@ -1 +1 @@
-from .calibration import CalibrationManager
+from .calibration import CalibrationManager
@@ -1,99 +1,109 @@
-import cv2
-import numpy as np
-
-class CalibrationManager:
-    def __init__(self):
-        self.calibration_data = None
-        self.camera_matrix = None
-        self.dist_coeffs = None
-
-    def detect_markers(self, image):
-        # Implementation for marker detection
-        # Placeholder implementation:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        aruco = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_ARUCO_ORIGINAL)
-        corners, ids, rejectedImgPoints = cv2.aruco.detectMarkers(gray, aruco)
-        
-        if ids is not None:
-            marker_list = []
-            for i in range(len(ids)):
-                marker_list.append({
-                    'id': int(ids[i][0]),
-                    'corners': corners[i].tolist()
-                })
-            return marker_list
-        else:
-            return []
-
-    def calculate_extrinsic(self, camera1_markers, camera2_markers, marker_size):
-        # Implementation for extrinsic calculation
-        # Convert marker data to numpy arrays
-        camera1_points = np.array([marker['corners'][0] for marker in camera1_markers], dtype=np.float32)
-        camera2_points = np.array([marker['corners'][0] for marker in camera2_markers], dtype=np.float32)
-
-        # Define object points (assuming a flat marker)
-        object_points = np.array([
-            [-marker_size / 2, marker_size / 2, 0],
-            [marker_size / 2, marker_size / 2, 0],
-            [marker_size / 2, -marker_size / 2, 0],
-            [-marker_size / 2, -marker_size / 2, 0]
-        ], dtype=np.float32)
-
-        # Estimate pose for camera 1
-        _, rvec1, tvec1 = cv2.solvePnP(object_points, camera1_points, self.camera_matrix, self.dist_coeffs)
-
-        # Estimate pose for camera 2
-        _, rvec2, tvec2 = cv2.solvePnP(object_points, camera2_points, self.camera_matrix, self.dist_coeffs)
-
-        # Convert rotation vectors to rotation matrices
-        rotation_matrix1, _ = cv2.Rodrigues(rvec1)
-        rotation_matrix2, _ = cv2.Rodrigues(rvec2)
-
-        # Calculate relative transformation from camera 1 to camera 2
-        relative_rotation = np.dot(rotation_matrix2, rotation_matrix1.T)
-        relative_translation = tvec2 - tvec1
-
-        # Convert relative rotation matrix to list
-        relative_rotation_list = relative_rotation.tolist()
-        relative_translation_list = relative_translation.flatten().tolist()
-
-        return {
-            'rotation_matrix': relative_rotation_list,
-            'translation_vector': relative_translation_list
-        }
-
-    def calibrate_camera(self, images, board_size, square_size):
-        # Implementation for camera calibration
-        # Convert images to grayscale
-        gray_images = [cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) for img in images]
-
-        # Define object points (chessboard corners)
-        objp = np.zeros((board_size[0] * board_size[1], 3), np.float32)
-        objp[:, :2] = np.mgrid[0:board_size[0], 0:board_size[1]].T.reshape(-1, 2)
-        objp = objp * square_size
-
-        objpoints = []  # 3d point in real world space
-        imgpoints = []  # 2d points in image plane.
-
-        for gray in gray_images:
-            # Find the chessboard corners
-            ret, corners = cv2.findChessboardCorners(gray, board_size, None)
-
-            # If found, add object points, image points (after refining them)
-            if ret == True:
-                objpoints.append(objp)
-
-                corners2 = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1),
-                                            (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001))
-                imgpoints.append(corners2)
-
-        # Calibrate camera
-        ret, self.camera_matrix, self.dist_coeffs, rvecs, tvecs = cv2.calibrateCamera(
-            objpoints, imgpoints, gray.shape[::-1], None, None)
-
-        self.calibration_data = {
-            'camera_matrix': self.camera_matrix.tolist(),
-            'dist_coeffs': self.dist_coeffs.tolist()
-        }
-
-        return self.calibration_data
+import cv2
+import numpy as np
+from aruco_registry import detector_registry
+from chessboard import DEFAULT_SEARCH_DIMENSION, find_chessboard_corners
+from recalibration import calibrate_with_outlier_rejection
+
+class CalibrationManager:
+    def __init__(self):
+        self.calibration_data = None
+        self.camera_matrix = None
+        self.dist_coeffs = None
+
+    def detect_markers(self, image):
+        # Implementation for marker detection
+        # Placeholder implementation:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        detector = detector_registry.get(cv2.aruco.DICT_ARUCO_ORIGINAL)
+        corners, ids, rejectedImgPoints = detector.detectMarkers(gray)
+        
+        if ids is not None:
+            marker_list = []
+            for i in range(len(ids)):
+                marker_list.append({
+                    'id': int(ids[i][0]),
+                    'corners': corners[i].tolist()
+                })
+            return marker_list
+        else:
+            return []
+
+    def calculate_extrinsic(self, camera1_markers, camera2_markers, marker_size):
+        # Implementation for extrinsic calculation
+        # Convert marker data to numpy arrays
+        camera1_points = np.array([marker['corners'][0] for marker in camera1_markers], dtype=np.float32)
+        camera2_points = np.array([marker['corners'][0] for marker in camera2_markers], dtype=np.float32)
+
+        # Define object points (assuming a flat marker)
+        object_points = np.array([
+            [-marker_size / 2, marker_size / 2, 0],
+            [marker_size / 2, marker_size / 2, 0],
+            [marker_size / 2, -marker_size / 2, 0],
+            [-marker_size / 2, -marker_size / 2, 0]
+        ], dtype=np.float32)
+
+        # Estimate pose for camera 1
+        _, rvec1, tvec1 = cv2.solvePnP(object_points, camera1_points, self.camera_matrix, self.dist_coeffs)
+
+        # Estimate pose for camera 2
+        _, rvec2, tvec2 = cv2.solvePnP(object_points, camera2_points, self.camera_matrix, self.dist_coeffs)
+
+        # Convert rotation vectors to rotation matrices
+        rotation_matrix1, _ = cv2.Rodrigues(rvec1)
+        rotation_matrix2, _ = cv2.Rodrigues(rvec2)
+
+        # Calculate relative transformation from camera 1 to camera 2
+        relative_rotation = np.dot(rotation_matrix2, rotation_matrix1.T)
+        relative_translation = tvec2 - tvec1
+
+        # Convert relative rotation matrix to list
+        relative_rotation_list = relative_rotation.tolist()
+        relative_translation_list = relative_translation.flatten().tolist()
+
+        return {
+            'rotation_matrix': relative_rotation_list,
+            'translation_vector': relative_translation_list
+        }
+
+    def calibrate_camera(self, images, board_size, square_size, search_dimension=DEFAULT_SEARCH_DIMENSION,
+                         outlier_rejection=None):
+        # Implementation for camera calibration
+        # Convert images to grayscale
+        gray_images = [cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) for img in images]
+
+        # Define object points (chessboard corners)
+        objp = np.zeros((board_size[0] * board_size[1], 3), np.float32)
+        objp[:, :2] = np.mgrid[0:board_size[0], 0:board_size[1]].T.reshape(-1, 2)
+        objp = objp * square_size
+
+        objpoints = []  # 3d point in real world space
+        imgpoints = []  # 2d points in image plane.
+        view_images = []  # index into images of each view
+
+        for image_index, gray in enumerate(gray_images):
+            # Find the chessboard corners on a downscaled copy, refined at full resolution
+            ret, corners2 = find_chessboard_corners(gray, board_size, search_dimension)
+
+            # If found, add object points, image points
+            if ret == True:
+                objpoints.append(objp)
+                imgpoints.append(corners2)
+                view_images.append(image_index)
+
+        # Calibrate camera, pruning views with outlying reprojection error
+        refined = calibrate_with_outlier_rejection(objpoints, imgpoints, gray.shape[::-1], outlier_rejection)
+        if refined is None:
+            raise RuntimeError("Camera calibration failed")
+        self.camera_matrix = refined.camera_matrix
+        self.dist_coeffs = refined.dist_coeffs
+
+        self.calibration_data = {
+            'camera_matrix': self.camera_matrix.tolist(),
+            'dist_coeffs': self.dist_coeffs.tolist(),
+            'reprojection_error': refined.rms,
+            'removed_views': [
+                {'image': view_images[view.index], 'rms': view.rms} for view in refined.removed_views
+            ]
+        }
+
+        return self.calibration_data
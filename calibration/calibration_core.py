@@ -1,95 +1,101 @@
-
-import cv2
-import numpy as np
-import os
-
-# Constants
-CHECKERBOARD_SIZE = (7, 5)  # Inner corners
-CAMERA_INDICES = [0, 1, 2] #camera indexes
-MIN_CAPTURES_REQUIRED = 15 # Minimum captures
-
-# Termination criteria for the iterative optimization algorithm
-criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-
-# Prepare object points, like (0,0,0), (1,0,0), (2,0,0) ....,(6,5,0)
-objp = np.zeros((CHECKERBOARD_SIZE[0] * CHECKERBOARD_SIZE[1], 3), np.float32)
-objp[:, :2] = np.mgrid[0:CHECKERBOARD_SIZE[0], 0:CHECKERBOARD_SIZE[1]].T.reshape(-1, 2)
-
-# Arrays to store object points and image points from all the images.
-objpoints = []  # 3d point in real world space
-imgpoints = []  # 2d points in image plane.
-
-def run_intrinsic_calibration(camera_index):
-    """Runs the intrinsic calibration process for the specified camera."""
-
-    cap = cv2.VideoCapture(camera_index)  # Open camera with given index
-
-    if not cap.isOpened():
-        print(f"Error: Cannot open camera {camera_index}")
-        return False
-
-    # Create the display window
-    cv2.namedWindow(f"Camera {camera_index}", cv2.WINDOW_NORMAL)
-        
-    # Keep reading frames until we have at least 15 captures
-    while len(imgpoints) < MIN_CAPTURES_REQUIRED:
-        ret, frame = cap.read()  # Read a frame from the camera
-        if not ret:
-            print(f"Error: Can't receive frame from camera {camera_index}. Exiting.")
-            break
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Convert to grayscale
-
-        # Find the chessboard corners
-        ret, corners = cv2.findChessboardCorners(gray, CHECKERBOARD_SIZE, None)
-        if ret:
-            # Refine the corners
-            corners2 = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
-            # Draw and display the corners
-            cv2.drawChessboardCorners(frame, CHECKERBOARD_SIZE, corners2, ret)
-            cv2.imshow(f"Camera {camera_index}", frame)
-            cv2.waitKey(500)  # Wait 500ms to display the corners
-
-            # Add object points, image points (after refining them)
-            objpoints.append(objp)
-            imgpoints.append(corners2)
-
-            print(f"Checkerboard found and added to image points! {len(imgpoints)}/{MIN_CAPTURES_REQUIRED}")
-
-        else:
-            print("Checkerboard not found.")
-            cv2.imshow(f"Camera {camera_index}", frame)
-        if cv2.waitKey(1) == ord('q'):  # Press 'q' to quit and start calibration
-            break
-
-    cap.release()  # Release camera
-    cv2.destroyAllWindows()  # Close display window
-
-    if len(objpoints) == 0 or len(imgpoints) == 0:
-        print("Error: No valid images for calibration.")
-        return False
-    print("Performing calibration...")
-    ret, mtx, dist, rvecs, tvecs = cv2.calibrateCamera(objpoints, imgpoints, gray.shape[::-1], None, None)
-    if not ret:
-        print("Error: Camera calibration failed.")
-        return False
-
-    # Print calibration results
-    print("\nCamera matrix:")
-    print(mtx)
-    print("\nDistortion coefficients:")
-    print(dist)
-
-    mean_error = 0
-    for i in range(len(objpoints)):
-        imgpoints2, _ = cv2.projectPoints(objpoints[i], rvecs[i], tvecs[i], mtx, dist)
-        error = cv2.norm(imgpoints[i], imgpoints2, cv2.NORM_L2) / len(imgpoints2)
-        mean_error += error
-
-    print("\nTotal error: {}".format(mean_error / len(objpoints)))
-
-    # Save camera calibration data.
-    print (f"Saving calibration data to calib_cam_{camera_index}.npz")
-    np.savez(f"calib_cam_{camera_index}.npz", mtx=mtx, dist=dist, rvecs=rvecs, tvecs=tvecs)
-    print("Calibration data saved.")
-    return True
+
+import cv2
+import numpy as np
+import os
+from chessboard import find_chessboard_corners
+from recalibration import calibrate_with_outlier_rejection
+from undistortion import CameraUndistorter
+
+# Constants
+CHECKERBOARD_SIZE = (7, 5)  # Inner corners
+CAMERA_INDICES = [0, 1, 2] #camera indexes
+MIN_CAPTURES_REQUIRED = 15 # Minimum captures
+
+# Termination criteria for the iterative optimization algorithm
+criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+
+# Prepare object points, like (0,0,0), (1,0,0), (2,0,0) ....,(6,5,0)
+objp = np.zeros((CHECKERBOARD_SIZE[0] * CHECKERBOARD_SIZE[1], 3), np.float32)
+objp[:, :2] = np.mgrid[0:CHECKERBOARD_SIZE[0], 0:CHECKERBOARD_SIZE[1]].T.reshape(-1, 2)
+
+# Arrays to store object points and image points from all the images.
+objpoints = []  # 3d point in real world space
+imgpoints = []  # 2d points in image plane.
+
+def run_intrinsic_calibration(camera_index):
+    """Runs the intrinsic calibration process for the specified camera."""
+
+    cap = cv2.VideoCapture(camera_index)  # Open camera with given index
+
+    if not cap.isOpened():
+        print(f"Error: Cannot open camera {camera_index}")
+        return False
+
+    # Create the display window
+    cv2.namedWindow(f"Camera {camera_index}", cv2.WINDOW_NORMAL)
+        
+    # Keep reading frames until we have at least 15 captures
+    while len(imgpoints) < MIN_CAPTURES_REQUIRED:
+        ret, frame = cap.read()  # Read a frame from the camera
+        if not ret:
+            print(f"Error: Can't receive frame from camera {camera_index}. Exiting.")
+            break
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Convert to grayscale
+
+        # Find the chessboard corners (downscaled search, full-resolution refinement)
+        ret, corners2 = find_chessboard_corners(gray, CHECKERBOARD_SIZE, criteria=criteria)
+        if ret:
+            # Draw and display the corners
+            cv2.drawChessboardCorners(frame, CHECKERBOARD_SIZE, corners2, ret)
+            cv2.imshow(f"Camera {camera_index}", frame)
+            cv2.waitKey(500)  # Wait 500ms to display the corners
+
+            # Add object points, image points (after refining them)
+            objpoints.append(objp)
+            imgpoints.append(corners2)
+
+            print(f"Checkerboard found and added to image points! {len(imgpoints)}/{MIN_CAPTURES_REQUIRED}")
+
+        else:
+            print("Checkerboard not found.")
+            cv2.imshow(f"Camera {camera_index}", frame)
+        if cv2.waitKey(1) == ord('q'):  # Press 'q' to quit and start calibration
+            break
+
+    cap.release()  # Release camera
+    cv2.destroyAllWindows()  # Close display window
+
+    if len(objpoints) == 0 or len(imgpoints) == 0:
+        print("Error: No valid images for calibration.")
+        return False
+    print("Performing calibration...")
+    refined = calibrate_with_outlier_rejection(objpoints, imgpoints, gray.shape[::-1])
+    if refined is None:
+        print("Error: Camera calibration failed.")
+        return False
+    mtx, dist, rvecs, tvecs = refined.camera_matrix, refined.dist_coeffs, refined.rvecs, refined.tvecs
+    for view in refined.removed_views:
+        print(f"Removed capture {view.index} (RMS {view.rms:.3f} px)")
+
+    # Print calibration results
+    print("\nCamera matrix:")
+    print(mtx)
+    print("\nDistortion coefficients:")
+    print(dist)
+
+    errors = refined.errors
+    print("\nTotal error (RMS): {}".format(errors.rms))
+    for view in errors.worst_views(3):
+        print(f"  capture {refined.kept_views[view]}: RMS {errors.per_view_rms[view]:.4f} px")
+
+    # Save camera calibration data.
+    print (f"Saving calibration data to calib_cam_{camera_index}.npz")
+    calibration_file = f"calib_cam_{camera_index}.npz"
+    np.savez(calibration_file, mtx=mtx, dist=dist, rvecs=rvecs, tvecs=tvecs, image_size=gray.shape[::-1])
+    print("Calibration data saved.")
+
+    # Build the undistortion remap tables once so runtime can memory-map them
+    CameraUndistorter.from_npz(calibration_file).prepare()
+    print("Undistortion maps saved.")
+    return True
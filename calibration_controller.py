@@ -1,106 +1,104 @@
-from dataclasses import dataclass
-from typing import Tuple
-import cv2
-import logging
-import numpy as np
-
-@dataclass
-class CalibrationConfig:
-    """Configuration class for calibration parameters"""
-    num_cameras: int = 3
-    resolution: Tuple[int, int] = (1920, 1080)
-    aruco_dict_type: int = cv2.aruco.DICT_5X5_250
-    marker_size: float = 0.05  # meters
-    min_markers_detected: int = 4
-    max_reproj_error: float = 1.0
-
-class AutomaticCalibrationSystem:
-    """Handles the camera calibration process"""
-    
-    def __init__(self, config: CalibrationConfig):
-        self.config = config
-        self.cameras = []
-        self.aruco_dict = cv2.aruco.Dictionary_get(config.aruco_dict_type)
-        self.aruco_params = cv2.aruco.DetectorParameters_create()
-        self.calibration_frames = []
-        self.progress = 0
-        self.is_running = False
-        self._setup_logging()
-
-    def _setup_logging(self):
-        """Setup logging configuration"""
-        self.logger = logging.getLogger(__name__)
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        self.logger.setLevel(logging.INFO)
-        return self.logger
-
-    def start_calibration(self):
-        """Start the calibration process"""
-        try:
-            self.is_running = True
-            self.progress = 0
-            self.logger.info("Starting calibration process")
-            # Add your calibration logic here
-            # This is a placeholder for the actual calibration process
-            # You should implement the actual camera calibration logic
-            
-            # Example progress update
-            self.progress = 100
-            self.logger.info("Calibration completed successfully")
-            
-        except Exception as e:
-            self.logger.error(f"Calibration failed: {str(e)}")
-            self.is_running = False
-            raise
-
-    def stop_calibration(self):
-        """Stop the calibration process"""
-        try:
-            self.is_running = False
-            self.progress = 0
-            self.logger.info("Stopping calibration process")
-            # Add cleanup logic here
-            # Release cameras and clean up resources
-            for camera in self.cameras:
-                if camera:
-                    camera.release()
-            self.cameras = []
-            
-        except Exception as e:
-            self.logger.error(f"Error stopping calibration: {str(e)}")
-            raise
-
-    def get_progress(self) -> float:
-        """Get the current calibration progress"""
-        return self.progress
-
-    def initialize_cameras(self):
-        """Initialize the cameras for calibration"""
-        try:
-            for i in range(self.config.num_cameras):
-                cap = cv2.VideoCapture(i)
-                if not cap.isOpened():
-                    raise Exception(f"Could not open camera {i}")
-                cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.config.resolution[0])
-                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config.resolution[1])
-                self.cameras.append(cap)
-            self.logger.info(f"Initialized {len(self.cameras)} cameras")
-        except Exception as e:
-            self.logger.error(f"Error initializing cameras: {str(e)}")
-            self.stop_calibration()
-            raise
-
-    def detect_markers(self, frame):
-        """Detect ArUco markers in a frame"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        corners, ids, rejected = cv2.aruco.detectMarkers(
-            gray, 
-            self.aruco_dict, 
-            parameters=self.aruco_params
-        )
-        return corners, ids
+from dataclasses import dataclass
+from typing import Tuple
+import cv2
+import logging
+import numpy as np
+from aruco_registry import detector_registry
+
+@dataclass
+class CalibrationConfig:
+    """Configuration class for calibration parameters"""
+    num_cameras: int = 3
+    resolution: Tuple[int, int] = (1920, 1080)
+    aruco_dict_type: int = cv2.aruco.DICT_5X5_250
+    marker_size: float = 0.05  # meters
+    min_markers_detected: int = 4
+    max_reproj_error: float = 1.0
+
+class AutomaticCalibrationSystem:
+    """Handles the camera calibration process"""
+    
+    def __init__(self, config: CalibrationConfig):
+        self.config = config
+        self.cameras = []
+        self.aruco_dict = detector_registry.get_dictionary(config.aruco_dict_type)
+        self.aruco_params = detector_registry.get_parameters('default')
+        self.calibration_frames = []
+        self.progress = 0
+        self.is_running = False
+        self._setup_logging()
+
+    def _setup_logging(self):
+        """Setup logging configuration"""
+        self.logger = logging.getLogger(__name__)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+        self.logger.setLevel(logging.INFO)
+        return self.logger
+
+    def start_calibration(self):
+        """Start the calibration process"""
+        try:
+            self.is_running = True
+            self.progress = 0
+            self.logger.info("Starting calibration process")
+            # Add your calibration logic here
+            # This is a placeholder for the actual calibration process
+            # You should implement the actual camera calibration logic
+            
+            # Example progress update
+            self.progress = 100
+            self.logger.info("Calibration completed successfully")
+            
+        except Exception as e:
+            self.logger.error(f"Calibration failed: {str(e)}")
+            self.is_running = False
+            raise
+
+    def stop_calibration(self):
+        """Stop the calibration process"""
+        try:
+            self.is_running = False
+            self.progress = 0
+            self.logger.info("Stopping calibration process")
+            # Add cleanup logic here
+            # Release cameras and clean up resources
+            for camera in self.cameras:
+                if camera:
+                    camera.release()
+            self.cameras = []
+            
+        except Exception as e:
+            self.logger.error(f"Error stopping calibration: {str(e)}")
+            raise
+
+    def get_progress(self) -> float:
+        """Get the current calibration progress"""
+        return self.progress
+
+    def initialize_cameras(self):
+        """Initialize the cameras for calibration"""
+        try:
+            for i in range(self.config.num_cameras):
+                cap = cv2.VideoCapture(i)
+                if not cap.isOpened():
+                    raise Exception(f"Could not open camera {i}")
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.config.resolution[0])
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config.resolution[1])
+                self.cameras.append(cap)
+            self.logger.info(f"Initialized {len(self.cameras)} cameras")
+        except Exception as e:
+            self.logger.error(f"Error initializing cameras: {str(e)}")
+            self.stop_calibration()
+            raise
+
+    def detect_markers(self, frame):
+        """Detect ArUco markers in a frame"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        detector = detector_registry.get(self.config.aruco_dict_type)
+        corners, ids, rejected = detector.detectMarkers(gray)
+        return corners, ids
@@ -1,45 +1,236 @@
-import cv2
-import numpy as np
-from typing import Tuple, Optional
-import logging
-
-class CameraHandler:
-    def __init__(self, camera_id: int, resolution: Tuple[int, int]):
-        self.camera_id = camera_id
-        self.resolution = resolution
-        self.cap = None
-        self.logger = logging.getLogger(__name__)
-
-    def initialize(self) -> bool:
-        """Initialize the camera"""
-        try:
-            self.cap = cv2.VideoCapture(self.camera_id)
-            if not self.cap.isOpened():
-                self.logger.error(f"Failed to open camera {self.camera_id}")
-                return False
-
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
-            return True
-
-        except Exception as e:
-            self.logger.error(f"Error initializing camera: {str(e)}")
-            return False
-
-    def get_frame(self) -> Optional[np.ndarray]:
-        """Capture a frame from the camera"""
-        if self.cap is None or not self.cap.isOpened():
-            return None
-
-        ret, frame = self.cap.read()
-        if not ret:
-            self.logger.error("Failed to capture frame")
-            return None
-
-        return frame
-
-    def release(self):
-        """Release the camera"""
-        if self.cap is not None:
-            self.cap.release()
-            self.cap = None
\ No newline at end of file
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from threading import Thread, Lock, Event
+from typing import Callable, List, Tuple, Optional, Union
+import logging
+import time
+
+@dataclass
+class GrabbedFrame:
+    """A frame published by the background grabber"""
+    seq: int
+    timestamp: float  # capture time (time.time()) taken right after grab()
+    frame: np.ndarray
+
+class SyntheticCapture:
+    """
+    Stand-in for cv2.VideoCapture that produces generated frames (or replays
+    a list of frames) at a fixed rate. Useful for tests and for running the
+    capture pipeline without hardware; a video file path passed to
+    cv2.VideoCapture works as a file source as well.
+    """
+
+    def __init__(self, resolution: Tuple[int, int] = (640, 480), fps: float = 30.0,
+                 frames: Optional[List[np.ndarray]] = None, loop: bool = True):
+        self.resolution = resolution
+        self.fps = fps
+        self.frames = frames
+        self.loop = loop
+        self.frame_index = -1
+        self._opened = True
+        self._next_time = time.monotonic()
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def set(self, prop_id: int, value: float) -> bool:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            self.resolution = (int(value), self.resolution[1])
+        elif prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.resolution = (self.resolution[0], int(value))
+        elif prop_id == cv2.CAP_PROP_FPS:
+            self.fps = value
+        else:
+            return False
+        return True
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.resolution[0])
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.resolution[1])
+        if prop_id == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return 0.0
+
+    def grab(self) -> bool:
+        if not self._opened:
+            return False
+        if self.frames is not None and not self.loop and self.frame_index + 1 >= len(self.frames):
+            return False
+
+        # Pace like a real device
+        if self.fps > 0:
+            delay = self._next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = max(self._next_time, time.monotonic() - 1.0) + 1.0 / self.fps
+        self.frame_index += 1
+        return True
+
+    def retrieve(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.frame_index < 0:
+            return False, None
+
+        if self.frames is not None:
+            source = self.frames[self.frame_index % len(self.frames)]
+        else:
+            width, height = self.resolution
+            source = np.full((height, width, 3), self.frame_index % 256, dtype=np.uint8)
+
+        if image is not None and image.shape == source.shape and image.dtype == source.dtype:
+            np.copyto(image, source)
+            return True, image
+        return True, source.copy()
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def release(self):
+        self._opened = False
+
+class CameraHandler:
+    def __init__(self, camera_id: Union[int, str], resolution: Tuple[int, int],
+                 capture_factory: Optional[Callable] = None):
+        self.camera_id = camera_id
+        self.resolution = resolution
+        self.capture_factory = capture_factory or cv2.VideoCapture
+        self.cap = None
+        self.logger = logging.getLogger(__name__)
+
+        # Background grabber state
+        self._grab_thread: Optional[Thread] = None
+        self._grab_stop = Event()
+        self._frame_lock = Lock()
+        self._buffers: List[Optional[np.ndarray]] = [None, None]
+        self._front = 0
+        self._latest_seq = -1
+        self._latest_timestamp = 0.0
+        self._read_seq = -1
+        self.grab_failures = 0
+        self.frames_dropped = 0  # frames replaced before any latest() call saw them
+        self.synchronizer = None
+        self.sync_camera_id = None
+
+    def initialize(self) -> bool:
+        """Initialize the camera"""
+        try:
+            self.cap = self.capture_factory(self.camera_id)
+            if not self.cap.isOpened():
+                self.logger.error(f"Failed to open camera {self.camera_id}")
+                return False
+
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error initializing camera: {str(e)}")
+            return False
+
+    def get_frame(self) -> Optional[np.ndarray]:
+        """Capture a frame from the camera"""
+        if self.is_grabbing:
+            # Background mode: hand out the newest frame instead of blocking on I/O
+            latest = self.latest()
+            return latest.frame if latest is not None else None
+
+        if self.cap is None or not self.cap.isOpened():
+            return None
+
+        ret, frame = self.cap.read()
+        if not ret:
+            self.logger.error("Failed to capture frame")
+            return None
+
+        return frame
+
+    @property
+    def is_grabbing(self) -> bool:
+        return self._grab_thread is not None and self._grab_thread.is_alive()
+
+    def start_grabber(self, synchronizer=None, sync_camera_id: Optional[str] = None) -> bool:
+        """
+        Start a background thread that grab()s continuously and retrieve()s
+        into a double buffer, so the driver queue never fills with stale
+        frames. If a CameraSynchronizer is given, every frame is also fed
+        to synchronizer.add_frame with its capture timestamp.
+        """
+        if self.is_grabbing:
+            return True
+        if self.cap is None and not self.initialize():
+            return False
+
+        self.synchronizer = synchronizer
+        self.sync_camera_id = sync_camera_id if sync_camera_id is not None else str(self.camera_id)
+        self._grab_stop.clear()
+        self._grab_thread = Thread(target=self._grab_loop, daemon=True)
+        self._grab_thread.start()
+        return True
+
+    def stop_grabber(self):
+        """Stop the background grabber thread"""
+        if self._grab_thread is not None:
+            self._grab_stop.set()
+            self._grab_thread.join(timeout=2.0)
+            self._grab_thread = None
+
+    def latest(self, copy: bool = True) -> Optional[GrabbedFrame]:
+        """
+        Non-blocking access to the newest grabbed frame, or None if nothing
+        has been captured yet. With copy=False the array is the grabber's
+        front buffer and is overwritten two frames later.
+        """
+        with self._frame_lock:
+            if self._latest_seq < 0:
+                return None
+            self._read_seq = self._latest_seq
+            frame = self._buffers[self._front]
+            return GrabbedFrame(
+                seq=self._latest_seq,
+                timestamp=self._latest_timestamp,
+                frame=frame.copy() if copy else frame
+            )
+
+    def _grab_loop(self):
+        while not self._grab_stop.is_set():
+            cap = self.cap
+            if cap is None or not cap.isOpened():
+                break
+
+            if not cap.grab():
+                self.grab_failures += 1
+                self._grab_stop.wait(0.01)
+                continue
+            timestamp = time.time()
+
+            # Decode into the back buffer while readers use the front one
+            back = 1 - self._front
+            ret, frame = cap.retrieve(self._buffers[back])
+            if not ret or frame is None:
+                self.grab_failures += 1
+                continue
+
+            with self._frame_lock:
+                if self._latest_seq > self._read_seq:
+                    self.frames_dropped += 1
+                self._buffers[back] = frame
+                self._front = back
+                self._latest_seq += 1
+                self._latest_timestamp = timestamp
+
+            if self.synchronizer is not None:
+                try:
+                    self.synchronizer.add_frame(self.sync_camera_id, frame, timestamp)
+                except Exception as e:
+                    self.logger.error(f"Error feeding synchronizer: {str(e)}")
+
+    def release(self):
+        """Release the camera"""
+        self.stop_grabber()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
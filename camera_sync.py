@@ -1,101 +1,377 @@
-from dataclasses import dataclass
-from threading import Lock, Event
-from typing import Dict, List, Optional
-import time
-import cv2
-import numpy as np
-
-@dataclass
-class SyncedFrame:
-    timestamp: float
-    frames: Dict[str, np.ndarray]
-    metadata: Dict[str, any]
-
-class CameraSynchronizer:
-    def __init__(self, camera_ids: List[str], sync_threshold_ms: float = 16.67):
-        self.camera_ids = camera_ids
-        self.sync_threshold = sync_threshold_ms / 1000.0
-        self.frame_buffers: Dict[str, List[SyncedFrame]] = {
-            cam_id: [] for cam_id in camera_ids
-        }
-        self.locks: Dict[str, Lock] = {
-            cam_id: Lock() for cam_id in camera_ids
-        }
-        self.sync_event = Event()
-        self.last_sync_time = time.time()
-
-    def add_frame(self, camera_id: str, frame: np.ndarray, timestamp: Optional[float] = None):
-        if camera_id not in self.camera_ids:
-            raise ValueError(f"Unknown camera ID: {camera_id}")
-
-        timestamp = timestamp or time.time()
-        
-        with self.locks[camera_id]:
-            self.frame_buffers[camera_id].append(SyncedFrame(
-                timestamp=timestamp,
-                frames={camera_id: frame},
-                metadata={}
-            ))
-            
-            # Clean old frames
-            self._cleanup_old_frames(camera_id)
-
-        # Check if we can sync frames
-        self._try_sync()
-
-    def get_synced_frames(self) -> Optional[SyncedFrame]:
-        """
-        Get the most recent set of synchronized frames
-        """
-        if not self.sync_event.is_set():
-            return None
-
-        synced_frames = {}
-        synced_metadata = {}
-        sync_timestamp = None
-
-        for camera_id in self.camera_ids:
-            with self.locks[camera_id]:
-                if not self.frame_buffers[camera_id]:
-                    return None
-                
-                frame_data = self.frame_buffers[camera_id][-1]
-                synced_frames.update(frame_data.frames)
-                synced_metadata.update(frame_data.metadata)
-                
-                if sync_timestamp is None:
-                    sync_timestamp = frame_data.timestamp
-
-        return SyncedFrame(
-            timestamp=sync_timestamp,
-            frames=synced_frames,
-            metadata=synced_metadata
-        )
-
-    def _try_sync(self):
-        """
-        Attempt to synchronize frames from all cameras
-        """
-        timestamps = []
-        
-        for camera_id in self.camera_ids:
-            with self.locks[camera_id]:
-                if not self.frame_buffers[camera_id]:
-                    return
-                timestamps.append(self.frame_buffers[camera_id][-1].timestamp)
-
-        if max(timestamps) - min(timestamps) <= self.sync_threshold:
-            self.sync_event.set()
-            self.last_sync_time = time.time()
-        else:
-            self.sync_event.clear()
-
-    def _cleanup_old_frames(self, camera_id: str, max_age: float = 1.0):
-        """
-        Remove frames older than max_age seconds
-        """
-        current_time = time.time()
-        self.frame_buffers[camera_id] = [
-            frame for frame in self.frame_buffers[camera_id]
-            if current_time - frame.timestamp <= max_age
-        ]
\ No newline at end of file
+from dataclasses import dataclass, field
+from threading import Lock, Event, Condition
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
+import heapq
+import time
+import cv2
+import numpy as np
+
+@dataclass
+class SyncedFrame:
+    timestamp: float
+    frames: Dict[str, np.ndarray]
+    metadata: Dict[str, any]
+
+@dataclass
+class MatchStats:
+    """Running statistics for timestamp-matched frame sets"""
+    frames_added: Dict[str, int] = field(default_factory=dict)
+    sets_matched: int = 0
+    frames_skipped: int = 0  # frames passed over without joining a set
+    skew_last: float = 0.0
+    skew_max: float = 0.0
+    skew_total: float = 0.0
+
+    @property
+    def match_rate(self) -> float:
+        """Matched sets per frame delivered by the slowest camera"""
+        if not self.frames_added:
+            return 0.0
+        slowest = min(self.frames_added.values())
+        return self.sets_matched / slowest if slowest else 0.0
+
+    @property
+    def skew_mean(self) -> float:
+        return self.skew_total / self.sets_matched if self.sets_matched else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'sets_matched': self.sets_matched,
+            'frames_skipped': self.frames_skipped,
+            'match_rate': self.match_rate,
+            'skew_mean_ms': self.skew_mean * 1000.0,
+            'skew_max_ms': self.skew_max * 1000.0,
+            'skew_last_ms': self.skew_last * 1000.0,
+        }
+
+class FrameRing:
+    """
+    Fixed-capacity frame store for one camera. Frames are copied into a
+    preallocated (capacity, H, W, C) slab and their timestamps kept in a
+    parallel float64 array, so memory stays flat whatever the frame rate.
+    Timestamps are kept in ascending order, which lets age eviction use a
+    binary search instead of a scan.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("Ring capacity must be at least 1")
+        self.capacity = capacity
+        self.slab: Optional[np.ndarray] = None
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.start = 0
+        self.count = 0
+        self.out_of_order = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _index(self, i: int) -> int:
+        """Physical slot of the i-th oldest frame"""
+        return (self.start + i) % self.capacity
+
+    def append(self, frame: np.ndarray, timestamp: float) -> bool:
+        """Copy frame into the next slot, overwriting the oldest when full"""
+        if self.count and timestamp < self.timestamps[self._index(self.count - 1)]:
+            # Keeping timestamps sorted is what makes eviction a binary search
+            self.out_of_order += 1
+            return False
+
+        if self.slab is None or self.slab.shape[1:] != frame.shape or self.slab.dtype != frame.dtype:
+            # First frame, or the camera changed resolution: reallocate once
+            self.slab = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+            self.start = 0
+            self.count = 0
+
+        if self.count == self.capacity:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        else:
+            slot = self._index(self.count)
+            self.count += 1
+
+        np.copyto(self.slab[slot], frame)
+        self.timestamps[slot] = timestamp
+        return True
+
+    def ordered_timestamps(self) -> np.ndarray:
+        """Copy of the buffered timestamps, oldest first"""
+        end = self.start + self.count
+        if end <= self.capacity:
+            return self.timestamps[self.start:end].copy()
+        return np.concatenate((self.timestamps[self.start:], self.timestamps[:end - self.capacity]))
+
+    def find(self, timestamp: float) -> Optional[int]:
+        """Logical index of the frame with exactly this timestamp"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps[self._index(mid)] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.timestamps[self._index(lo)] == timestamp:
+            return lo
+        return None
+
+    def timestamp_at(self, i: int) -> float:
+        return float(self.timestamps[self._index(i)])
+
+    def frame_at(self, i: int) -> np.ndarray:
+        """View of the i-th oldest frame; only valid until that slot is overwritten"""
+        return self.slab[self._index(i)]
+
+    def latest(self) -> Optional[Tuple[np.ndarray, float]]:
+        if self.count == 0:
+            return None
+        return self.frame_at(self.count - 1), self.timestamp_at(self.count - 1)
+
+    def evict_older_than(self, cutoff: float) -> int:
+        """Drop frames with timestamp < cutoff; returns the number evicted"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps[self._index(mid)] < cutoff:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo:
+            self.start = self._index(lo)
+            self.count -= lo
+        return lo
+
+class CameraSynchronizer:
+    def __init__(self, camera_ids: List[str], sync_threshold_ms: float = 16.67,
+                 buffer_capacity: int = 32, max_age: float = 1.0):
+        self.camera_ids = camera_ids
+        self.sync_threshold = sync_threshold_ms / 1000.0
+        self.max_age = max_age
+        self.frame_buffers: Dict[str, FrameRing] = {
+            cam_id: FrameRing(buffer_capacity) for cam_id in camera_ids
+        }
+        self.locks: Dict[str, Lock] = {
+            cam_id: Lock() for cam_id in camera_ids
+        }
+        self.sync_event = Event()
+        self.last_sync_time = time.time()
+
+        # Newest timestamp per camera, readable without taking camera locks
+        self._latest_timestamps: Dict[str, Optional[float]] = {
+            cam_id: None for cam_id in camera_ids
+        }
+
+        # Frame-set matching: producers only bump a generation counter
+        self._frame_added = Condition()
+        self._generation = 0
+        self._closed = False
+        self._last_emitted: Dict[str, float] = {
+            cam_id: float('-inf') for cam_id in camera_ids
+        }
+        self._match_lock = Lock()
+        self.match_stats = MatchStats(frames_added={cam_id: 0 for cam_id in camera_ids})
+
+    def add_frame(self, camera_id: str, frame: np.ndarray, timestamp: Optional[float] = None):
+        if camera_id not in self.camera_ids:
+            raise ValueError(f"Unknown camera ID: {camera_id}")
+
+        timestamp = timestamp or time.time()
+
+        with self.locks[camera_id]:
+            if self.frame_buffers[camera_id].append(frame, timestamp):
+                self._latest_timestamps[camera_id] = timestamp
+                self.match_stats.frames_added[camera_id] += 1
+
+            # Clean old frames
+            self._cleanup_old_frames(camera_id, self.max_age)
+
+        # Check if we can sync frames
+        self._try_sync()
+
+        with self._frame_added:
+            self._generation += 1
+            self._frame_added.notify_all()
+
+    def get_synced_frames(self) -> Optional[SyncedFrame]:
+        """
+        Get the most recent set of synchronized frames
+        """
+        if not self.sync_event.is_set():
+            return None
+
+        synced_frames = {}
+        sync_timestamp = None
+
+        for camera_id in self.camera_ids:
+            with self.locks[camera_id]:
+                latest = self.frame_buffers[camera_id].latest()
+                if latest is None:
+                    return None
+
+                # Copy out of the ring; the slot is reused by later frames
+                frame, timestamp = latest
+                synced_frames[camera_id] = frame.copy()
+
+                if sync_timestamp is None:
+                    sync_timestamp = timestamp
+
+        return SyncedFrame(
+            timestamp=sync_timestamp,
+            frames=synced_frames,
+            metadata={}
+        )
+
+    def next_matched(self, timeout: Optional[float] = None) -> Optional[SyncedFrame]:
+        """
+        Block until a new timestamp-matched frame set is available and
+        return it; each set is returned at most once. Returns None on
+        timeout or after close().
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        seen_generation = -1
+
+        while True:
+            with self._frame_added:
+                while self._generation == seen_generation and not self._closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._frame_added.wait(remaining)
+                if self._closed:
+                    return None
+                seen_generation = self._generation
+
+            # Match outside the condition so producers are never blocked by it
+            synced = self._match_frame_set()
+            if synced is not None:
+                return synced
+
+    def matched_sets(self, timeout: Optional[float] = None) -> Iterator[SyncedFrame]:
+        """Blocking iterator over matched frame sets; ends on timeout or close()"""
+        while True:
+            synced = self.next_matched(timeout)
+            if synced is None:
+                return
+            yield synced
+
+    def __iter__(self) -> Iterator[SyncedFrame]:
+        return self.matched_sets()
+
+    async def __aiter__(self):
+        """Async iterator over matched frame sets; ends after close()"""
+        loop = asyncio.get_running_loop()
+        while not self._closed:
+            synced = await loop.run_in_executor(None, self.next_matched, 0.5)
+            if synced is not None:
+                yield synced
+
+    def close(self):
+        """Wake and terminate any blocked matched-set consumers"""
+        with self._frame_added:
+            self._closed = True
+            self._frame_added.notify_all()
+
+    def _match_frame_set(self) -> Optional[SyncedFrame]:
+        # Held across snapshot, match and emit so concurrent consumers (sync
+        # and async iterators) never emit the same set twice or race the stats
+        with self._match_lock:
+            candidates = {}
+            for camera_id in self.camera_ids:
+                with self.locks[camera_id]:
+                    timestamps = self.frame_buffers[camera_id].ordered_timestamps()
+                timestamps = timestamps[timestamps > self._last_emitted[camera_id]]
+                if len(timestamps) == 0:
+                    return None
+                candidates[camera_id] = timestamps
+
+            match = self._find_min_spread(candidates)
+            if match is None:
+                return None
+
+            frames = {}
+            for camera_id, timestamp in match.items():
+                with self.locks[camera_id]:
+                    ring = self.frame_buffers[camera_id]
+                    index = ring.find(timestamp)
+                    if index is None:
+                        # Evicted or overwritten since the snapshot; retry on the next frame
+                        return None
+                    frames[camera_id] = ring.frame_at(index).copy()
+
+            for camera_id, timestamp in match.items():
+                self.match_stats.frames_skipped += int(np.count_nonzero(candidates[camera_id] < timestamp))
+                self._last_emitted[camera_id] = timestamp
+
+            spread = max(match.values()) - min(match.values())
+            stats = self.match_stats
+            stats.sets_matched += 1
+            stats.skew_last = spread
+            stats.skew_max = max(stats.skew_max, spread)
+            stats.skew_total += spread
+
+            return SyncedFrame(
+                timestamp=min(match.values()),
+                frames=frames,
+                metadata={'timestamps': match, 'skew': spread}
+            )
+
+    def _find_min_spread(self, candidates: Dict[str, np.ndarray]) -> Optional[Dict[str, float]]:
+        """
+        Sorted-merge sweep over the per-camera timestamp lists. Every window
+        holding one frame per camera is visited in time order; among the
+        windows within sync_threshold that compete with the oldest valid
+        window for frames, the one with the smallest spread wins.
+        """
+        camera_ids = list(candidates)
+        positions = [0] * len(camera_ids)
+        heap = [(candidates[cam][0], i) for i, cam in enumerate(camera_ids)]
+        heapq.heapify(heap)
+        current_max = max(entry[0] for entry in heap)
+
+        best = None
+        best_spread = None
+        first_valid_end = None
+        while True:
+            current_min, i = heap[0]
+            if first_valid_end is not None and current_min > first_valid_end:
+                break
+
+            spread = current_max - current_min
+            if spread <= self.sync_threshold:
+                if first_valid_end is None:
+                    first_valid_end = current_max
+                if best_spread is None or spread < best_spread:
+                    best_spread = spread
+                    best = {cam: float(candidates[cam][positions[k]]) for k, cam in enumerate(camera_ids)}
+
+            positions[i] += 1
+            timestamps = candidates[camera_ids[i]]
+            if positions[i] >= len(timestamps):
+                break
+            heapq.heapreplace(heap, (timestamps[positions[i]], i))
+            current_max = max(current_max, timestamps[positions[i]])
+
+        return best
+
+    def _try_sync(self):
+        """
+        Attempt to synchronize frames from all cameras
+        """
+        timestamps = list(self._latest_timestamps.values())
+        if any(timestamp is None for timestamp in timestamps):
+            return
+
+        if max(timestamps) - min(timestamps) <= self.sync_threshold:
+            self.sync_event.set()
+            self.last_sync_time = time.time()
+        else:
+            self.sync_event.clear()
+
+    def _cleanup_old_frames(self, camera_id: str, max_age: float = 1.0):
+        """
+        Remove frames more than max_age seconds older than the newest frame
+        """
+        ring = self.frame_buffers[camera_id]
+        latest = ring.latest()
+        if latest is not None:
+            ring.evict_older_than(latest[1] - max_age)
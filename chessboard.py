@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+SUBPIX_CRITERIA = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+DEFAULT_FLAGS = cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE
+
+# Longest side of the image searched in pyramid mode; 0 disables the pyramid
+DEFAULT_SEARCH_DIMENSION = 640
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+def refine_corners(gray: np.ndarray, corners: np.ndarray, win_size: Tuple[int, int] = (11, 11),
+                   criteria=SUBPIX_CRITERIA) -> np.ndarray:
+    """Sub-pixel refinement at full resolution"""
+    return cv2.cornerSubPix(gray, corners, win_size, (-1, -1), criteria)
+
+def find_chessboard_corners(image: np.ndarray, pattern_size: Tuple[int, int],
+                            search_dimension: int = DEFAULT_SEARCH_DIMENSION,
+                            flags: int = DEFAULT_FLAGS, refine: bool = True,
+                            win_size: Tuple[int, int] = (11, 11),
+                            criteria=SUBPIX_CRITERIA, fallback: bool = True) -> Tuple[bool, Optional[np.ndarray]]:
+    """
+    Chessboard search that runs findChessboardCorners on a copy downscaled
+    so its longest side is search_dimension, with CALIB_CB_FAST_CHECK so
+    frames without a board are rejected quickly. Corners found there are
+    mapped back to full resolution and, with refine=True, snapped with
+    cornerSubPix on the full-resolution image. Images already smaller than
+    search_dimension (or search_dimension=0) are searched directly.
+    A board too small to survive the downscale is missed by the coarse
+    pass; with fallback=True the full-resolution image is then searched
+    too, still with CALIB_CB_FAST_CHECK so empty frames stay cheap.
+    Returns (found, corners) like cv2.findChessboardCorners.
+    """
+    gray = to_gray(image)
+    height, width = gray.shape[:2]
+    scale = search_dimension / max(height, width) if search_dimension else 1.0
+
+    if scale >= 1.0:
+        found, corners = cv2.findChessboardCorners(gray, pattern_size, None, flags)
+    else:
+        small = cv2.resize(gray, (int(round(width * scale)), int(round(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        found, corners = cv2.findChessboardCorners(small, pattern_size, None, flags | cv2.CALIB_CB_FAST_CHECK)
+        if found:
+            # Pixel centres: x_full + 0.5 = (x_small + 0.5) * (full / small)
+            factors = np.array([width / small.shape[1], height / small.shape[0]], dtype=np.float32)
+            corners = ((corners + 0.5) * factors - 0.5).astype(np.float32)
+        elif fallback:
+            found, corners = cv2.findChessboardCorners(gray, pattern_size, None, flags | cv2.CALIB_CB_FAST_CHECK)
+
+    if not found:
+        return False, None
+    if refine:
+        corners = refine_corners(gray, corners, win_size, criteria)
+    return True, corners
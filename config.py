@@ -1,11 +1,19 @@
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class Config:
-    DEBUG = os.getenv('DEBUG', 'False') == 'True'
-    CAMERA_CONFIG = {
-        'num_cameras': int(os.getenv('NUM_CAMERAS', '3')),
-        'resolution': tuple(map(int, os.getenv('RESOLUTION', '1920,1080').split(',')))
-    }
\ No newline at end of file
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class Config:
+    DEBUG = os.getenv('DEBUG', 'False') == 'True'
+    CAMERA_CONFIG = {
+        'num_cameras': int(os.getenv('NUM_CAMERAS', '3')),
+        'resolution': tuple(map(int, os.getenv('RESOLUTION', '1920,1080').split(',')))
+    }
+    # Physical calibration target (an aruco GridBoard). The capture quality
+    # metrics fit detections to this model; when unset, the reprojection
+    # error is not reported
+    CALIBRATION_BOARD = {
+        'size': os.getenv('CALIBRATION_BOARD_SIZE'),  # markers per row,column, e.g. "5,7"
+        'marker_length': os.getenv('CALIBRATION_MARKER_LENGTH'),  # metres
+        'marker_separation': os.getenv('CALIBRATION_MARKER_SEPARATION')  # metres
+    }
@@ -0,0 +1,180 @@
+import cv2
+import json
+import logging
+import os
+import time
+import numpy as np
+from collections import deque
+from dataclasses import dataclass
+from queue import Queue, Full, Empty
+from threading import Thread, Lock
+from typing import Callable, Optional
+from metrics import MetricsRegistry, default_registry
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class DebugWriterConfig:
+    directory: str = "debug_images"
+    queue_size: int = 32
+    sample_every: int = 1          # write every Nth frame (failures always count as sampled)
+    failures_only: bool = False    # only write frames flagged as failed
+    max_files: int = 1000          # artifacts (images + JSON) kept in the directory
+    max_bytes: int = 256 * 1024 * 1024
+    max_age: float = 24 * 3600.0   # seconds; older artifacts are deleted
+    jpeg_quality: int = 85
+
+class DebugArtifactWriter:
+    """
+    Writes debug frames (JPEG) and their metrics (JSON) on a background
+    thread. submit() never blocks: frames are sampled first and dropped
+    with a counter when the queue is full, so request latency does not
+    depend on the disk. Files are named <session>_<sequence>, and the
+    directory is rotated by file count, total size and age.
+    """
+
+    def __init__(self, config: Optional[DebugWriterConfig] = None, name: str = 'default',
+                 metrics: Optional[MetricsRegistry] = None):
+        self.config = config or DebugWriterConfig()
+        self.session = f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self._queue = Queue(maxsize=self.config.queue_size)
+        self._seen = 0
+        self._seq = 0
+        self._lock = Lock()
+
+        # (path, size, mtime) of artifacts on disk, oldest first
+        self._files = deque()
+        self._total_bytes = 0
+
+        registry = metrics if metrics is not None else default_registry
+        labels = {'writer': name}
+        self._written = registry.counter(
+            'debug_writer_written_total', 'Debug frames written to disk', **labels)
+        self._dropped = registry.counter(
+            'debug_writer_dropped_total', 'Debug frames dropped because the write queue was full', **labels)
+        self._skipped = registry.counter(
+            'debug_writer_skipped_total', 'Debug frames skipped by sampling', **labels)
+        self._errors = registry.counter(
+            'debug_writer_errors_total', 'Debug frames that failed to write', **labels)
+        self._rotated = registry.counter(
+            'debug_writer_rotated_files_total', 'Debug files deleted by rotation', **labels)
+        registry.gauge('debug_writer_queue_depth', 'Debug frames waiting to be written',
+                       fn=self._queue.qsize, **labels)
+        self._registry = registry
+        self._labels = labels
+
+        self.is_running = True
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self) -> int:
+        return int(self._dropped.value)
+
+    @property
+    def written(self) -> int:
+        return int(self._written.value)
+
+    def submit(self, frame: np.ndarray, metrics: dict, failed: bool = False,
+               annotate: Optional[Callable[[np.ndarray], None]] = None) -> bool:
+        """
+        Queue a frame and its metrics. The writer takes ownership of frame;
+        annotate, if given, draws on it in the writer thread. Returns False
+        if the frame was skipped by sampling or dropped.
+        """
+        if not self.is_running:
+            return False
+
+        with self._lock:
+            self._seen += 1
+            sampled = failed or (not self.config.failures_only and
+                                 (self._seen - 1) % max(self.config.sample_every, 1) == 0)
+            if not sampled:
+                self._skipped.inc()
+                return False
+            seq = self._seq
+            self._seq += 1
+
+        try:
+            self._queue.put_nowait((seq, frame, metrics, annotate))
+            return True
+        except Full:
+            self._dropped.inc()
+            return False
+
+    def close(self, timeout: float = 5.0):
+        """Flush queued artifacts and stop the writer thread"""
+        self.is_running = False
+        self._thread.join(timeout=timeout)
+        self._registry.remove('debug_writer_queue_depth', **self._labels)
+
+    def _run(self):
+        try:
+            os.makedirs(self.config.directory, exist_ok=True)
+            self._scan_existing()
+        except OSError as e:
+            logger.error("Cannot prepare debug directory %s: %s", self.config.directory, str(e))
+
+        while self.is_running or not self._queue.empty():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except Empty:
+                continue
+            try:
+                self._write(*item)
+                self._written.inc()
+            except Exception as e:
+                self._errors.inc()
+                logger.error("Failed to write debug artifact: %s", str(e))
+            self._rotate()
+
+    def _write(self, seq: int, frame: np.ndarray, metrics: dict, annotate: Optional[Callable]):
+        if annotate is not None:
+            annotate(frame)
+        base = os.path.join(self.config.directory, f"{self.session}_{seq:08d}")
+
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.config.jpeg_quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        image_path = base + "_frame.jpg"
+        with open(image_path, 'wb') as f:
+            f.write(buffer.tobytes())
+        self._track(image_path)
+
+        metrics_path = base + "_metrics.json"
+        with open(metrics_path, 'w') as f:
+            json.dump(metrics, f, indent=2, default=float)
+        self._track(metrics_path)
+
+    def _track(self, path: str):
+        stat = os.stat(path)
+        self._files.append((path, stat.st_size, stat.st_mtime))
+        self._total_bytes += stat.st_size
+
+    def _scan_existing(self):
+        """Pick up artifacts left by earlier runs so rotation covers them too"""
+        entries = []
+        with os.scandir(self.config.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(('_frame.jpg', '_metrics.json')):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        for entry in sorted(entries, key=lambda e: e[2]):
+            self._files.append(entry)
+            self._total_bytes += entry[1]
+        self._rotate()
+
+    def _rotate(self):
+        cutoff = time.time() - self.config.max_age
+        while self._files and (len(self._files) > self.config.max_files or
+                               self._total_bytes > self.config.max_bytes or
+                               self._files[0][2] < cutoff):
+            path, size, _ = self._files.popleft()
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+                self._rotated.inc()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Could not rotate debug file %s: %s", path, str(e))
@@ -1,11 +1,11 @@
-class CalibrationError(Exception):
-    """Base exception for calibration errors"""
-    pass
-
-class CameraError(CalibrationError):
-    """Exception raised for camera-related errors"""
-    pass
-
-class ConfigurationError(CalibrationError):
-    """Exception raised for configuration-related errors"""
+class CalibrationError(Exception):
+    """Base exception for calibration errors"""
+    pass
+
+class CameraError(CalibrationError):
+    """Exception raised for camera-related errors"""
+    pass
+
+class ConfigurationError(CalibrationError):
+    """Exception raised for configuration-related errors"""
     pass
\ No newline at end of file
@@ -0,0 +1,94 @@
+import numpy as np
+import logging
+import time
+from threading import Thread, Condition
+from typing import Callable, Optional, Tuple
+from image_decoder import decode_image_bytes
+from metrics import MetricsRegistry, default_registry
+
+class TrackingStream:
+    """
+    Latest-frame-wins bridge between a streaming transport and a tracker.
+    Incoming encoded frames go into a single slot; if the tracker is still
+    busy when the next frame arrives, the stale one is dropped rather than
+    queued, so a slow track() never builds up an unbounded backlog.
+    """
+
+    def __init__(self, track_fn: Callable[[np.ndarray], dict],
+                 on_result: Callable[[dict], None],
+                 metrics: Optional[MetricsRegistry] = None):
+        self.track_fn = track_fn
+        self.on_result = on_result
+        self.logger = logging.getLogger(__name__)
+
+        self._condition = Condition()
+        self._pending: Optional[Tuple[int, bytes, float]] = None
+        self._next_seq = 0
+        self.is_running = True
+
+        # Stream statistics
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.frames_processed = 0
+
+        # Aggregated across all streams served by this process
+        registry = metrics if metrics is not None else default_registry
+        self._received_total = registry.counter('tracking_stream_frames_total', 'Frames received on tracking streams')
+        self._dropped_total = registry.counter('tracking_stream_dropped_frames_total', 'Stale frames replaced before tracking')
+        self._latency = registry.summary('tracking_stream_latency_seconds', 'Time from frame arrival to result')
+
+        self._worker = Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, payload: bytes) -> int:
+        """Queue an encoded JPEG frame, replacing any frame not yet picked up"""
+        with self._condition:
+            seq = self._next_seq
+            self._next_seq += 1
+            self.frames_received += 1
+            self._received_total.inc()
+            if self._pending is not None:
+                self.frames_dropped += 1
+                self._dropped_total.inc()
+            self._pending = (seq, payload, time.time())
+            self._condition.notify()
+        return seq
+
+    def close(self):
+        """Stop the worker; a frame currently being tracked is allowed to finish"""
+        with self._condition:
+            self.is_running = False
+            self._pending = None
+            self._condition.notify()
+        self._worker.join(timeout=1.0)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self.is_running and self._pending is None:
+                    self._condition.wait()
+                if not self.is_running:
+                    return
+                seq, payload, received_at = self._pending
+                self._pending = None
+
+            try:
+                frame = decode_image_bytes(payload)
+                result = dict(self.track_fn(frame))
+            except Exception as e:
+                result = {"error": str(e)}
+
+            self.frames_processed += 1
+            latency = time.time() - received_at
+            self._latency.observe(latency)
+            result["seq"] = seq
+            result["latency_ms"] = latency * 1000.0
+
+            try:
+                self.on_result(result)
+            except Exception as e:
+                # The client went away; stop tracking for this stream
+                self.logger.debug(f"Dropping tracking stream: {str(e)}")
+                with self._condition:
+                    self.is_running = False
+                return
@@ -0,0 +1,108 @@
+import base64
+import threading
+import cv2
+import numpy as np
+from typing import Tuple, Union
+
+RAW_IMAGE_TYPES = ('image/jpeg', 'image/png', 'application/octet-stream')
+
+# Largest image body accepted when the app sets no MAX_CONTENT_LENGTH
+MAX_IMAGE_BYTES = 32 << 20
+# Receive buffers up to this size are kept per thread; larger ones are per request
+REUSED_BUFFER_BYTES = 4 << 20
+
+class ImageTooLarge(ValueError):
+    """The image body exceeds the accepted size; map to HTTP 413"""
+
+# Per-thread receive buffer, grown on demand and reused across requests
+_local = threading.local()
+
+def _receive_buffer(size: int) -> memoryview:
+    if size > REUSED_BUFFER_BYTES:
+        return memoryview(bytearray(size))
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None or len(buffer) < size:
+        buffer = bytearray(max(size, 1 << 20))
+        _local.buffer = buffer
+    return memoryview(buffer)[:size]
+
+def _size_limit(req) -> int:
+    return getattr(req, 'max_content_length', None) or MAX_IMAGE_BYTES
+
+def _check_size(length: int, limit: int):
+    if length > limit:
+        raise ImageTooLarge(f"Image of {length} bytes exceeds the {limit} byte limit")
+
+def decode_image_bytes(data: Union[bytes, bytearray, memoryview], flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """Decode an encoded JPEG/PNG buffer without copying it first"""
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+    if img is None:
+        raise ValueError("Failed to decode image")
+    return img
+
+def decode_data_uri(data_uri: str, flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """Compatibility path for base64 data URIs ("data:image/jpeg;base64,...")"""
+    if not data_uri or ',' not in data_uri:
+        raise ValueError("Invalid data URI format")
+    _, encoded = data_uri.split(",", 1)
+    return decode_image_bytes(base64.b64decode(encoded), flags)
+
+def read_stream(stream, length: int) -> memoryview:
+    """Read exactly length bytes from a file-like stream into the reusable buffer"""
+    view = _receive_buffer(length)
+    received = 0
+    while received < length:
+        n = stream.readinto(view[received:])
+        if not n:
+            raise ValueError(f"Request body ended after {received} of {length} bytes")
+        received += n
+    return view
+
+def decode_request_image(req, field: str = 'image_data',
+                         flags: int = cv2.IMREAD_COLOR) -> Tuple[np.ndarray, dict]:
+    """
+    Decode the image carried by a Flask request.
+    Accepts a raw image/jpeg, image/png or application/octet-stream body,
+    a multipart upload (file field `field`), or, as a fallback, a JSON body
+    with a data URI under `field`.
+    Returns (image, params) where params holds the remaining request fields.
+    Bodies larger than the app's MAX_CONTENT_LENGTH (or MAX_IMAGE_BYTES)
+    raise ImageTooLarge before anything is allocated for them.
+    """
+    mimetype = req.mimetype
+    limit = _size_limit(req)
+    length = req.content_length
+    if length is not None:
+        _check_size(length, limit)
+
+    if mimetype in RAW_IMAGE_TYPES:
+        if length:
+            data = read_stream(req.stream, length)
+        else:
+            # Chunked upload without a Content-Length; read one byte past the limit
+            data = req.stream.read(limit + 1)
+            _check_size(len(data), limit)
+        return decode_image_bytes(data, flags), req.args.to_dict()
+
+    if mimetype == 'multipart/form-data':
+        upload = req.files.get(field) or next(iter(req.files.values()), None)
+        if upload is None:
+            raise ValueError("No image file in multipart upload")
+        stream = upload.stream
+        if hasattr(stream, 'getbuffer'):
+            # Small uploads are spooled in memory; decode from that buffer directly
+            data = stream.getbuffer()
+        else:
+            stream.seek(0, 2)
+            length = stream.tell()
+            stream.seek(0)
+            _check_size(length, limit)
+            data = read_stream(stream, length)
+        params = req.args.to_dict()
+        params.update(req.form.to_dict())
+        return decode_image_bytes(data, flags), params
+
+    params = req.get_json(silent=True) or {}
+    if field not in params:
+        raise ValueError(f"Missing '{field}' in request")
+    return decode_data_uri(params[field], flags), params
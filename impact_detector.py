@@ -0,0 +1,243 @@
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional, Tuple
+
+# Detector states
+WAITING = 'waiting'      # board matches the reference
+SETTLING = 'settling'    # a new blob appeared; waiting for it to stop changing
+OCCLUDED = 'occluded'    # large change (player at the board, darts being pulled)
+
+@dataclass
+class ImpactDetectorConfig:
+    roi: Optional[Tuple[int, int, int, int]] = None  # board (x, y, w, h) in full-resolution pixels
+    board_center: Optional[Tuple[float, float]] = None  # full-resolution pixels; defaults to the ROI centre
+    scale: float = 0.25             # working resolution relative to the input
+    blur_size: int = 3
+    diff_threshold: int = 25        # grey-level change counted as foreground
+    min_area: int = 12              # dart blob area at working resolution (pixels)
+    max_area: int = 1500
+    motion_pixels: int = 6          # frame-to-frame changed pixels (working resolution) still counted as still
+    settle_frames: int = 2          # still frames required before an impact is reported
+    occlusion_fraction: float = 0.04  # changed fraction of the ROI treated as occlusion (about a hand)
+    clear_frames: int = 5           # still frames before re-baselining after an occlusion
+
+@dataclass
+class ImpactEvent:
+    kind: str                       # 'impact' or 'pullout'; a pullout after an occlusion has no tip
+    frame_index: int
+    tip: Optional[Tuple[float, float]] = None        # full-resolution pixels
+    bbox: Optional[Tuple[int, int, int, int]] = None  # full-resolution (x, y, w, h)
+    area: float = 0.0               # blob area in full-resolution pixels
+    confidence: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'kind': self.kind,
+            'frame_index': self.frame_index,
+            'tip': list(self.tip) if self.tip is not None else None,
+            'bbox': list(self.bbox) if self.bbox is not None else None,
+            'area': self.area,
+            'confidence': self.confidence,
+        }
+
+class ImpactDetector:
+    """
+    Background-subtraction impact detector for one camera. Each frame is
+    cropped to the board ROI, converted to grayscale and downscaled, then
+    compared with a reference image of the board. A change that stays
+    still for settle_frames frames is split into added pixels (different
+    from the empty board as well) and removed pixels (back to the empty
+    board). An added blob is reported as an impact, with its tip taken as
+    the end of the blob's principal axis nearest the board centre; a
+    removed blob is reported as a 'pullout' of that one dart. Either way
+    the change becomes part of the reference. A change covering a large
+    part of the board (a hand, darts being pulled) suspends detection until
+    the scene is still again; then the board is assumed empty, both images
+    are re-taken and a 'pullout' event without a tip is reported.
+    Frames must be fed in order; process() is serialized by a lock.
+    """
+
+    def __init__(self, config: Optional[ImpactDetectorConfig] = None):
+        self.config = config or ImpactDetectorConfig()
+        size = max(self.config.blur_size | 1, 1)
+        self._blur_size = (size, size)
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget the reference; the next frame becomes the new baseline"""
+        self.reference: Optional[np.ndarray] = None
+        self.background: Optional[np.ndarray] = None  # board without darts
+        self.previous: Optional[np.ndarray] = None
+        self.state = WAITING
+        self.still_frames = 0
+        self.frame_index = -1
+        self.impacts = 0
+        self._roi: Optional[Tuple[int, int, int, int]] = None
+        self._factors = (1.0, 1.0)
+        # Preallocated working buffers, sized on the first frame
+        self._diff = None
+        self._mask = None
+        self._motion = None
+        self._added = None
+
+    def rebaseline(self, frame: Optional[np.ndarray] = None):
+        """Take the given frame (or the last one seen) as the new reference of an empty board"""
+        with self._lock:
+            small = self._prepare(frame) if frame is not None else self.previous
+            if small is not None:
+                self.reference = small.copy()
+                self.background = small.copy()
+            self.state = WAITING
+            self.still_frames = 0
+
+    def __call__(self, frame: np.ndarray) -> Optional[dict]:
+        """detect_fn adapter for FrameProcessor (use a single worker so frames stay in order)"""
+        event = self.process(frame)
+        return event.as_dict() if event is not None else None
+
+    def detect_tip(self, frame: np.ndarray) -> Optional[Tuple[float, float]]:
+        """Tip of a newly landed dart in this frame, if any"""
+        event = self.process(frame)
+        return event.tip if event is not None and event.kind == 'impact' else None
+
+    def process(self, frame: np.ndarray) -> Optional[ImpactEvent]:
+        with self._lock:
+            self.frame_index += 1
+            small = self._prepare(frame)
+            if self.reference is None:
+                self.reference = small.copy()
+                self.background = small.copy()
+                self.previous = small.copy()
+                return None
+
+            # Frame-to-frame motion decides whether the scene has settled.
+            # Counted in pixels, not as a fraction: a dart is a tiny part of the ROI
+            cv2.absdiff(small, self.previous, dst=self._diff)
+            cv2.threshold(self._diff, self.config.diff_threshold, 255, cv2.THRESH_BINARY, dst=self._motion)
+            moving = cv2.countNonZero(self._motion)
+            np.copyto(self.previous, small)
+            still = moving <= self.config.motion_pixels
+            self.still_frames = self.still_frames + 1 if still else 0
+
+            # Change against the reference board
+            cv2.absdiff(small, self.reference, dst=self._diff)
+            cv2.threshold(self._diff, self.config.diff_threshold, 255, cv2.THRESH_BINARY, dst=self._mask)
+            cv2.morphologyEx(self._mask, cv2.MORPH_OPEN, self._kernel, dst=self._mask)
+            changed = cv2.countNonZero(self._mask) / self._mask.size
+
+            if changed >= self.config.occlusion_fraction:
+                self.state = OCCLUDED
+                return None
+
+            if self.state == OCCLUDED:
+                if self.still_frames < self.config.clear_frames:
+                    return None
+                # Scene is still again: darts were pulled (or the player stepped away)
+                np.copyto(self.reference, small)
+                np.copyto(self.background, small)
+                self.state = WAITING
+                return ImpactEvent(kind='pullout', frame_index=self.frame_index)
+
+            if changed == 0:
+                self.state = WAITING
+                return None
+
+            self.state = SETTLING
+            if self.still_frames < self.config.settle_frames:
+                return None
+
+            # Changed pixels that also differ from the empty board were added
+            # (a new dart); the rest went back to the empty board (a dart removed)
+            cv2.absdiff(small, self.background, dst=self._diff)
+            cv2.threshold(self._diff, self.config.diff_threshold, 255, cv2.THRESH_BINARY, dst=self._added)
+            cv2.bitwise_and(self._added, self._mask, dst=self._added)
+            cv2.bitwise_xor(self._mask, self._added, dst=self._mask)
+
+            event = self._find_blob(self._added, 'impact')
+            if event is None:
+                event = self._find_blob(self._mask, 'pullout')
+            # Whatever changed is now part of the board: the next dart is
+            # compared against a reference that already holds this one
+            np.copyto(self.reference, small)
+            self.state = WAITING
+            if event is not None and event.kind == 'impact':
+                self.impacts += 1
+            return event
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """ROI crop -> grayscale -> downscale -> blur"""
+        height, width = frame.shape[:2]
+        if self._roi is None:
+            x, y, w, h = self.config.roi or (0, 0, width, height)
+            x, y = max(int(x), 0), max(int(y), 0)
+            w, h = min(int(w), width - x), min(int(h), height - y)
+            self._roi = (x, y, w, h)
+            small_size = (max(int(round(w * self.config.scale)), 1), max(int(round(h * self.config.scale)), 1))
+            self._small_size = small_size
+            self._factors = (w / small_size[0], h / small_size[1])
+            shape = (small_size[1], small_size[0])
+            self._diff = np.empty(shape, dtype=np.uint8)
+            self._mask = np.empty(shape, dtype=np.uint8)
+            self._motion = np.empty(shape, dtype=np.uint8)
+            self._added = np.empty(shape, dtype=np.uint8)
+
+        x, y, w, h = self._roi
+        roi = frame[y:y + h, x:x + w]
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+        small = cv2.resize(gray, self._small_size, interpolation=cv2.INTER_AREA)
+        if self._blur_size[0] > 1:
+            cv2.GaussianBlur(small, self._blur_size, 0, dst=small)
+        return small
+
+    def _find_blob(self, mask: np.ndarray, kind: str) -> Optional[ImpactEvent]:
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        if count <= 1:
+            return None
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        valid = np.flatnonzero((areas >= self.config.min_area) & (areas <= self.config.max_area))
+        if len(valid) == 0:
+            return None
+
+        # The largest blob is the dart; smaller ones are noise or its shadow
+        label = int(valid[np.argmax(areas[valid])]) + 1
+        left, top, w, h, area = stats[label]
+        ys, xs = np.nonzero(labels[top:top + h, left:left + w] == label)
+        points = np.stack((xs + left, ys + top), axis=1).astype(np.float32)
+
+        tip = self._tip_point(points)
+        fx, fy = self._factors
+        rx, ry = self._roi[:2]
+        full_tip = (rx + (tip[0] + 0.5) * fx - 0.5, ry + (tip[1] + 0.5) * fy - 0.5)
+        bbox = (int(rx + left * fx), int(ry + top * fy), int(round(w * fx)), int(round(h * fy)))
+
+        # Elongated blobs look like darts; round ones are more likely noise
+        elongation = max(w, h) / max(min(w, h), 1)
+        confidence = float(min(1.0, 0.5 + 0.1 * elongation))
+        return ImpactEvent(kind=kind, frame_index=self.frame_index, tip=(float(full_tip[0]), float(full_tip[1])),
+                           bbox=bbox, area=float(area * fx * fy), confidence=confidence)
+
+    def _tip_point(self, points: np.ndarray) -> np.ndarray:
+        """End of the blob's principal axis nearest the board centre (working pixels)"""
+        mean = points.mean(axis=0)
+        if len(points) < 3:
+            return mean
+        centered = points - mean
+        _, _, vt = np.linalg.svd(centered, full_matrices=False)
+        axis = vt[0]
+        projection = centered @ axis
+        ends = (points[np.argmin(projection)], points[np.argmax(projection)])
+
+        center = self._board_center_small()
+        return min(ends, key=lambda end: float(np.sum((end - center) ** 2)))
+
+    def _board_center_small(self) -> np.ndarray:
+        x, y, w, h = self._roi
+        fx, fy = self._factors
+        if self.config.board_center is None:
+            return np.array([w / fx / 2.0, h / fy / 2.0], dtype=np.float32)
+        cx, cy = self.config.board_center
+        return np.array([(cx - x) / fx, (cy - y) / fy], dtype=np.float32)
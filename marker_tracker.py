@@ -1,57 +1,176 @@
-import cv2
-import numpy as np
-from typing import List, Tuple, Optional
-from aruco_detector import ArucoDetector, ArucoConfig
-from camera_handler import CameraHandler
-import logging
-
-class MarkerTracker:
-    def __init__(self, camera_id: int, aruco_config: ArucoConfig):
-        self.camera_handler = CameraHandler(camera_id, aruco_config.camera_resolution)
-        self.aruco_detector = ArucoDetector(aruco_config)
-        self.logger = logging.getLogger(__name__)
-        self.camera_matrix = None
-        self.dist_coeffs = None
-
-    def start(self) -> bool:
-        """Start the marker tracking system"""
-        return self.camera_handler.initialize()
-
-    def stop(self):
-        """Stop the marker tracking system"""
-        self.camera_handler.release()
-
-    def load_camera_calibration(self, calibration_file: str) -> bool:
-        """Load camera calibration parameters"""
-        try:
-            calibration_data = np.load(calibration_file)
-            self.camera_matrix = calibration_data['camera_matrix']
-            self.dist_coeffs = calibration_data['dist_coeffs']
-            return True
-        except Exception as e:
-            self.logger.error(f"Error loading calibration: {str(e)}")
-            return False
-
-    def track_markers(self) -> Tuple[Optional[np.ndarray], List, Optional[np.ndarray]]:
-        """
-        Track markers in real-time
-        Returns: (frame, corners, ids)
-        """
-        frame = self.camera_handler.get_frame()
-        if frame is None:
-            return None, [], None
-
-        corners, ids = self.aruco_detector.detect_markers(frame)
-        if ids is not None:
-            frame = self.aruco_detector.draw_markers(frame, corners, ids)
-            
-            if self.camera_matrix is not None and self.dist_coeffs is not None:
-                rvecs, tvecs = self.aruco_detector.estimate_pose(
-                    corners, ids, self.camera_matrix, self.dist_coeffs
-                )
-                frame = self.aruco_detector.draw_axes(
-                    frame, corners, ids, rvecs, tvecs,
-                    self.camera_matrix, self.dist_coeffs
-                )
-
-        return frame, corners, ids
\ No newline at end of file
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Optional
+from aruco_detector import ArucoDetector, ArucoConfig
+from camera_handler import CameraHandler
+from undistortion import CameraUndistorter
+import logging
+
+@dataclass
+class RoiTrackingConfig:
+    """Configuration for ROI-tracked incremental marker detection"""
+    padding: float = 0.5  # ROI padding as a fraction of the marker's size
+    min_padding: int = 24  # minimum ROI padding in pixels
+    full_detect_interval: int = 30  # force a full-frame detection every N frames
+    downscale: float = 1.0  # < 1.0 tries full-frame detection on a resized image first
+
+class MarkerTracker:
+    def __init__(self, camera_id: int, aruco_config: ArucoConfig,
+                 roi_tracking: Optional[RoiTrackingConfig] = None):
+        self.camera_handler = CameraHandler(camera_id, aruco_config.camera_resolution)
+        self.aruco_detector = ArucoDetector(aruco_config)
+        self.logger = logging.getLogger(__name__)
+        self.camera_matrix = None
+        self.dist_coeffs = None
+        self.undistorter: Optional[CameraUndistorter] = None
+
+        # ROI tracking state: last known quad per marker ID
+        self.roi_tracking = roi_tracking
+        self.tracked_markers: Dict[int, np.ndarray] = {}
+        self.frames_since_full = 0
+        self.full_detections = 0
+        self.roi_detections = 0
+
+    def start(self) -> bool:
+        """Start the marker tracking system"""
+        return self.camera_handler.initialize()
+
+    def stop(self):
+        """Stop the marker tracking system"""
+        self.camera_handler.release()
+
+    def load_camera_calibration(self, calibration_file: str) -> bool:
+        """Load camera calibration parameters and map (or build) its undistortion tables"""
+        try:
+            self.undistorter = CameraUndistorter.from_npz(calibration_file)
+            self.camera_matrix = self.undistorter.camera_matrix
+            self.dist_coeffs = self.undistorter.dist_coeffs
+            self.undistorter.prepare()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error loading calibration: {str(e)}")
+            return False
+
+    def track_markers(self) -> Tuple[Optional[np.ndarray], List, Optional[np.ndarray]]:
+        """
+        Track markers in real-time
+        Returns: (frame, corners, ids)
+        """
+        frame = self.camera_handler.get_frame()
+        if frame is None:
+            return None, [], None
+
+        if self.roi_tracking is not None:
+            corners, ids = self.detect_incremental(frame)
+        else:
+            corners, ids = self.aruco_detector.detect_markers(frame)
+        if ids is not None:
+            frame = self.aruco_detector.draw_markers(frame, corners, ids)
+
+            if self.camera_matrix is not None and self.dist_coeffs is not None:
+                rvecs, tvecs = self.aruco_detector.estimate_pose(
+                    corners, ids, self.camera_matrix, self.dist_coeffs
+                )
+                frame = self.aruco_detector.draw_axes(
+                    frame, corners, ids, rvecs, tvecs,
+                    self.camera_matrix, self.dist_coeffs
+                )
+
+        return frame, corners, ids
+
+    def reset_tracking(self):
+        """Forget tracked markers so the next frame runs full-frame detection"""
+        self.tracked_markers = {}
+        self.frames_since_full = 0
+
+    def detect_incremental(self, frame: np.ndarray) -> Tuple[List, Optional[np.ndarray]]:
+        """
+        Detect markers only inside padded regions around their last known
+        quads, falling back to full-frame detection every
+        full_detect_interval frames or as soon as a tracked marker is lost.
+        Returns: (corners, ids)
+        """
+        config = self.roi_tracking or RoiTrackingConfig()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+        found: Dict[int, np.ndarray] = {}
+        need_full = not self.tracked_markers or self.frames_since_full >= config.full_detect_interval
+        if not need_full:
+            for x0, y0, x1, y1 in self._tracking_regions(gray.shape, config):
+                corners, ids = self.aruco_detector.detect_gray(gray[y0:y1, x0:x1])
+                for quad, marker_id in zip(corners, ids.flatten() if ids is not None else []):
+                    found.setdefault(int(marker_id), quad.reshape(4, 2) + (x0, y0))
+            self.roi_detections += 1
+            # Any lost marker means it moved out of its ROI; re-acquire on the full frame
+            need_full = not set(self.tracked_markers) <= set(found)
+
+        if need_full:
+            found = self._detect_full_frame(gray, config)
+            self.frames_since_full = 0
+            self.full_detections += 1
+        else:
+            self.frames_since_full += 1
+
+        self.tracked_markers = found
+        if not found:
+            return [], None
+
+        marker_ids = sorted(found)
+        corners = [found[marker_id].reshape(1, 4, 2).astype(np.float32) for marker_id in marker_ids]
+        return corners, np.array(marker_ids, dtype=np.int32).reshape(-1, 1)
+
+    def _detect_full_frame(self, gray: np.ndarray, config: RoiTrackingConfig) -> Dict[int, np.ndarray]:
+        found: Dict[int, np.ndarray] = {}
+
+        if config.downscale < 1.0:
+            small = cv2.resize(gray, None, fx=config.downscale, fy=config.downscale,
+                               interpolation=cv2.INTER_AREA)
+            corners, ids = self.aruco_detector.detect_gray(small)
+            if ids is not None:
+                points = np.concatenate([quad.reshape(4, 2) for quad in corners]) / config.downscale
+                # Refine the upscaled corners against the full-resolution image
+                points = cv2.cornerSubPix(
+                    gray, points.astype(np.float32).reshape(-1, 1, 2), (5, 5), (-1, -1),
+                    (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.01)
+                ).reshape(-1, 4, 2)
+                found = {int(marker_id): quad for marker_id, quad in zip(ids.flatten(), points)}
+
+            # Small markers may vanish when downscaled; only accept the cheap pass
+            # if it recovered everything we were tracking
+            if found and set(self.tracked_markers) <= set(found):
+                return found
+
+        corners, ids = self.aruco_detector.detect_gray(gray)
+        if ids is not None:
+            found = {int(marker_id): quad.reshape(4, 2) for marker_id, quad in zip(ids.flatten(), corners)}
+        return found
+
+    def _tracking_regions(self, shape: Tuple[int, int], config: RoiTrackingConfig) -> List[Tuple[int, int, int, int]]:
+        """Padded bounding boxes around tracked quads, merged where they overlap"""
+        h, w = shape[:2]
+        regions = []
+        for quad in self.tracked_markers.values():
+            x0, y0 = quad.min(axis=0)
+            x1, y1 = quad.max(axis=0)
+            pad = max(config.min_padding, config.padding * max(x1 - x0, y1 - y0))
+            regions.append([
+                max(0, int(x0 - pad)), max(0, int(y0 - pad)),
+                min(w, int(np.ceil(x1 + pad))), min(h, int(np.ceil(y1 + pad)))
+            ])
+
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(regions)):
+                for j in range(i + 1, len(regions)):
+                    a, b = regions[i], regions[j]
+                    if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                        regions[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                        del regions[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+
+        return [tuple(region) for region in regions]
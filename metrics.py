@@ -0,0 +1,162 @@
+import math
+import numpy as np
+from threading import Lock
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label_value(value)}"' for key, value in items) + '}'
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+class Counter:
+    """Monotonically increasing count"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+class Gauge:
+    """Point-in-time value, either set explicitly or read from a callback"""
+
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self._value = 0.0
+        self.fn = fn
+
+    def set(self, value: float):
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return float(self.fn()) if self.fn is not None else self._value
+
+class RollingSummary:
+    """
+    Latency summary over a fixed window of the most recent observations,
+    stored in a preallocated ring so recording is O(1). Quantiles are
+    computed on demand; count and sum cover all observations.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._values = np.zeros(window, dtype=np.float64)
+        self._next = 0
+        self._filled = 0
+        self.count = 0
+        self.sum = 0.0
+        self._lock = Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._values[self._next] = value
+            self._next = (self._next + 1) % self.window
+            self._filled = min(self._filled + 1, self.window)
+            self.count += 1
+            self.sum += value
+
+    def quantiles(self, qs: Iterable[float] = DEFAULT_QUANTILES) -> Dict[float, float]:
+        with self._lock:
+            recent = self._values[:self._filled].copy()
+        qs = tuple(qs)
+        if len(recent) == 0:
+            return {q: float('nan') for q in qs}
+        return {q: float(value) for q, value in zip(qs, np.quantile(recent, qs))}
+
+    def mean(self) -> float:
+        with self._lock:
+            return float(np.mean(self._values[:self._filled])) if self._filled else 0.0
+
+class MetricsRegistry:
+    """Named metric families rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._families: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._metrics: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], object] = {}
+        self._lock = Lock()
+
+    def _get_or_create(self, kind: str, name: str, help_text: str, labels: dict, factory: Callable):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text))
+            if family[0] != kind:
+                raise ValueError(f"Metric {name} is already registered as a {family[0]}")
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = factory()
+            return metric
+
+    def counter(self, name: str, help_text: str, **labels) -> Counter:
+        return self._get_or_create('counter', name, help_text, labels, Counter)
+
+    def gauge(self, name: str, help_text: str, fn: Optional[Callable[[], float]] = None, **labels) -> Gauge:
+        gauge = self._get_or_create('gauge', name, help_text, labels, lambda: Gauge(fn))
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def summary(self, name: str, help_text: str, window: int = 1024, **labels) -> RollingSummary:
+        return self._get_or_create('summary', name, help_text, labels, lambda: RollingSummary(window))
+
+    def remove(self, name: str, **labels) -> bool:
+        """
+        Drop one labelled metric, e.g. a gauge whose callback belongs to a
+        stopped component; the family goes when its last metric does
+        """
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            if self._metrics.pop(key, None) is None:
+                return False
+            if not any(metric_name == name for metric_name, _ in self._metrics):
+                self._families.pop(name, None)
+            return True
+
+    def render(self) -> str:
+        with self._lock:
+            families = dict(self._families)
+            metrics = sorted(self._metrics.items(), key=lambda item: item[0])
+
+        lines = []
+        current = None
+        for (name, labels), metric in metrics:
+            if name != current:
+                kind, help_text = families[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                current = name
+
+            if isinstance(metric, RollingSummary):
+                for q, value in metric.quantiles().items():
+                    lines.append(f"{name}{_format_labels(labels, ('quantile', str(q)))} {_format_value(value)}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(metric.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+            else:
+                try:
+                    value = metric.value
+                except Exception:
+                    value = float('nan')
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+# Process-wide registry served by /api/metrics
+default_registry = MetricsRegistry()
@@ -1,78 +1,299 @@
-import cv2
-import numpy as np
-from threading import Thread, Lock
-from queue import Queue
-from typing import Optional, Tuple
-import time
-
-class FrameProcessor:
-    def __init__(self, buffer_size: int = 5):
-        self.frame_buffer = Queue(maxsize=buffer_size)
-        self.result_buffer = Queue(maxsize=buffer_size)
-        self.processing_lock = Lock()
-        self.is_running = True
-        self.processing_thread = Thread(target=self._processing_loop, daemon=True)
-        self.processing_thread.start()
-        
-        # Performance metrics
-        self.fps = 0
-        self.processing_time = 0
-        self.last_frame_time = time.time()
-
-    def _processing_loop(self):
-        while self.is_running:
-            try:
-                frame = self.frame_buffer.get(timeout=1.0)
-                start_time = time.time()
-                
-                # Process frame with GPU acceleration if available
-                with self.processing_lock:
-                    result = self._process_frame_optimized(frame)
-                
-                self.processing_time = time.time() - start_time
-                self.result_buffer.put(result)
-                
-                # Update FPS
-                current_time = time.time()
-                self.fps = 1.0 / (current_time - self.last_frame_time)
-                self.last_frame_time = current_time
-                
-            except Queue.Empty:
-                continue
-
-    def _process_frame_optimized(self, frame: np.ndarray) -> dict:
-        try:
-            # Use GPU acceleration if available
-            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
-                gpu_frame = cv2.cuda_GpuMat()
-                gpu_frame.upload(frame)
-                
-                # GPU-accelerated processing
-                processed_frame = self._gpu_process(gpu_frame)
-                result = processed_frame.download()
-            else:
-                # CPU processing with optimization
-                result = self._cpu_process(frame)
-            
-            return {
-                'success': True,
-                'data': result,
-                'processing_time': self.processing_time,
-                'fps': self.fps
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'processing_time': self.processing_time,
-                'fps': self.fps
-            }
-
-    def _gpu_process(self, gpu_frame: cv2.cuda_GpuMat) -> cv2.cuda_GpuMat:
-        # Implement GPU-accelerated processing
-        pass
-
-    def _cpu_process(self, frame: np.ndarray) -> np.ndarray:
-        # Implement optimized CPU processing
-        pass
\ No newline at end of file
+import cv2
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from threading import Thread, Lock, Semaphore
+from queue import Queue, Empty, Full
+from typing import Any, Callable, Dict, Optional
+import os
+import time
+from image_decoder import decode_image_bytes
+from metrics import MetricsRegistry, default_registry
+
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
+
+def _cuda_available() -> bool:
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+def _init_worker():
+    # One OpenCV thread per worker process; the pool provides the parallelism
+    cv2.setNumThreads(1)
+
+def process_frame(frame: Any, detect_fn: Optional[Callable] = None,
+                  score_fn: Optional[Callable] = None, use_gpu: bool = False) -> dict:
+    """
+    Run the decode -> grayscale -> detect -> score stages on one frame.
+    Module-level so it can run in a process pool; detect_fn and score_fn
+    must then be picklable (module-level functions).
+    """
+    stage_times = {}
+    try:
+        start = time.perf_counter()
+        if isinstance(frame, (bytes, bytearray, memoryview)):
+            frame = decode_image_bytes(frame)
+        decoded = time.perf_counter()
+        stage_times['decode'] = decoded - start
+
+        if frame.ndim == 2:
+            gray = frame
+        elif use_gpu:
+            gpu_frame = cv2.cuda_GpuMat()
+            gpu_frame.upload(frame)
+            gray = cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGR2GRAY).download()
+        else:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        converted = time.perf_counter()
+        stage_times['grayscale'] = converted - decoded
+
+        detections = detect_fn(gray) if detect_fn is not None else None
+        detected = time.perf_counter()
+        stage_times['detect'] = detected - converted
+
+        score = score_fn(detections) if score_fn is not None and detections is not None else None
+        stage_times['score'] = time.perf_counter() - detected
+
+        return {
+            'success': True,
+            'data': {'detections': detections, 'score': score},
+            'stage_times': stage_times
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'stage_times': stage_times
+        }
+
+class FrameProcessor:
+    """
+    Frame-processing pipeline backed by a thread or process pool.
+    Frames submitted with submit() are dispatched to the pool as workers
+    free up; results come out of result_buffer in submission order, tagged
+    with their sequence number. When a queue fills, the overflow policy
+    either drops the oldest entry (DROP_OLDEST) or blocks the caller (BLOCK).
+    Under BLOCK, backpressure is applied before dispatch: a frame only goes
+    to a worker once there is room for its result, so completion callbacks
+    never block and stop() cannot hang on an unconsumed result queue.
+    Latency, per-stage timings, queue depths and drop counts are recorded
+    in a MetricsRegistry, labelled with the processor's name.
+    """
+
+    def __init__(self, buffer_size: int = 5, num_workers: Optional[int] = None,
+                 use_processes: bool = False, overflow_policy: str = DROP_OLDEST,
+                 detect_fn: Optional[Callable] = None, score_fn: Optional[Callable] = None,
+                 name: str = 'default', metrics: Optional[MetricsRegistry] = None,
+                 metrics_window: int = 1024):
+        if overflow_policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.frame_buffer = Queue(maxsize=buffer_size)
+        self.result_buffer = Queue(maxsize=buffer_size)
+        self.processing_lock = Lock()
+        self.overflow_policy = overflow_policy
+        self.detect_fn = detect_fn
+        self.score_fn = score_fn
+        self.use_gpu = not use_processes and _cuda_available()
+
+        self.num_workers = num_workers or os.cpu_count() or 1
+        if use_processes:
+            self.executor = ProcessPoolExecutor(max_workers=self.num_workers, initializer=_init_worker)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.num_workers)
+        # Bound work handed to the pool so frames wait in frame_buffer, where
+        # the overflow policy applies, rather than in the executor's queue
+        self._in_flight = Semaphore(self.num_workers * 2)
+        # BLOCK: result slots reserved per dispatched frame, freed by get_result()
+        self._result_slots = Semaphore(buffer_size) if overflow_policy == BLOCK else None
+
+        # Reorder buffer: completed results wait here until earlier ones finish
+        self._next_seq = 0
+        self._next_emit = 0
+        self._completed: Dict[int, dict] = {}
+
+        # Performance metrics
+        self.fps = 0
+        self.processing_time = 0
+        self.last_frame_time = time.time()
+        self._emit_times = np.zeros(metrics_window, dtype=np.float64)
+        self._emitted = 0
+        self._setup_metrics(metrics if metrics is not None else default_registry, name, metrics_window)
+
+        self.is_running = True
+        self.processing_thread = Thread(target=self._processing_loop, daemon=True)
+        self.processing_thread.start()
+
+    def submit(self, frame: Any, metadata: Optional[dict] = None) -> bool:
+        """Queue a frame (ndarray or encoded bytes); False if it was not accepted"""
+        if not self.is_running:
+            return False
+
+        item = (frame, metadata or {}, time.time())
+        if self.overflow_policy == BLOCK:
+            while self.is_running:
+                try:
+                    self.frame_buffer.put(item, timeout=0.5)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        while True:
+            try:
+                self.frame_buffer.put_nowait(item)
+                return True
+            except Full:
+                try:
+                    self.frame_buffer.get_nowait()
+                    self._frames_dropped.inc()
+                except Empty:
+                    pass
+
+    def _setup_metrics(self, registry: MetricsRegistry, name: str, window: int):
+        self.metrics = registry
+        labels = {'processor': name}
+        self._latency = registry.summary(
+            'frame_processor_latency_seconds', 'Time from submit() to an ordered result', window, **labels)
+        self._processing = registry.summary(
+            'frame_processor_processing_seconds', 'Worker time spent on one frame', window, **labels)
+        self._stage_summaries = {
+            stage: registry.summary(
+                'frame_processor_stage_seconds', 'Worker time per pipeline stage', window, stage=stage, **labels)
+            for stage in ('decode', 'grayscale', 'detect', 'score')
+        }
+        self._frames_processed = registry.counter(
+            'frame_processor_frames_total', 'Frames that produced a result', **labels)
+        self._frame_errors = registry.counter(
+            'frame_processor_errors_total', 'Frames whose pipeline raised an error', **labels)
+        self._frames_dropped = registry.counter(
+            'frame_processor_dropped_frames_total', 'Input frames dropped because the input queue was full', **labels)
+        self._results_dropped = registry.counter(
+            'frame_processor_dropped_results_total', 'Results dropped because nobody consumed them', **labels)
+        registry.gauge('frame_processor_input_queue_depth', 'Frames waiting for a worker',
+                       fn=self.frame_buffer.qsize, **labels)
+        registry.gauge('frame_processor_result_queue_depth', 'Results waiting to be consumed',
+                       fn=self.result_buffer.qsize, **labels)
+        registry.gauge('frame_processor_reorder_depth', 'Completed results waiting on earlier frames',
+                       fn=lambda: len(self._completed), **labels)
+        registry.gauge('frame_processor_fps', 'Result rate over the rolling window',
+                       fn=lambda: self.fps, **labels)
+        # Gauges call back into this processor; stop() unregisters them
+        self._metric_labels = labels
+        self._gauges = ('frame_processor_input_queue_depth', 'frame_processor_result_queue_depth',
+                        'frame_processor_reorder_depth', 'frame_processor_fps')
+
+    @property
+    def frames_dropped(self) -> int:
+        return int(self._frames_dropped.value)
+
+    @property
+    def results_dropped(self) -> int:
+        return int(self._results_dropped.value)
+
+    def latency_percentiles(self) -> dict:
+        """Rolling-window p50/p95/p99 end-to-end latency in seconds"""
+        return self._latency.quantiles()
+
+    def get_result(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next result in sequence order, or None on timeout"""
+        try:
+            result = self.result_buffer.get(timeout=timeout)
+        except Empty:
+            return None
+        if self._result_slots is not None:
+            self._result_slots.release()
+        return result
+
+    def stop(self):
+        """Stop dispatching and shut the worker pool down; unconsumed results are discarded"""
+        self.is_running = False
+        self.processing_thread.join(timeout=2.0)
+        self.executor.shutdown(wait=True)
+        for gauge in self._gauges:
+            self.metrics.remove(gauge, **self._metric_labels)
+
+    def _processing_loop(self):
+        while self.is_running:
+            try:
+                frame, metadata, submitted_at = self.frame_buffer.get(timeout=1.0)
+            except Empty:
+                continue
+
+            # Under BLOCK, wait until the result will have somewhere to go
+            if self._result_slots is not None:
+                while not self._result_slots.acquire(timeout=0.5):
+                    if not self.is_running:
+                        return
+
+            # Wait for a free worker slot without losing the ability to stop
+            while not self._in_flight.acquire(timeout=0.5):
+                if not self.is_running:
+                    return
+
+            seq = self._next_seq
+            self._next_seq += 1
+            future = self.executor.submit(process_frame, frame, self.detect_fn, self.score_fn, self.use_gpu)
+            future.add_done_callback(partial(self._on_complete, seq, metadata, submitted_at))
+
+    def _on_complete(self, seq: int, metadata: dict, submitted_at: float, future: Future):
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'success': False, 'error': str(e), 'stage_times': {}}
+        finally:
+            self._in_flight.release()
+
+        result['seq'] = seq
+        result['metadata'] = metadata
+        result['latency'] = time.time() - submitted_at
+
+        with self.processing_lock:
+            self._completed[seq] = result
+            while self._next_emit in self._completed:
+                self._emit(self._completed.pop(self._next_emit))
+                self._next_emit += 1
+
+    def _emit(self, result: dict):
+        # Update metrics
+        current_time = time.time()
+        processing_time = sum(result['stage_times'].values())
+        self._processing.observe(processing_time)
+        self._latency.observe(result['latency'])
+        for stage, elapsed in result['stage_times'].items():
+            self._stage_summaries[stage].observe(elapsed)
+        self._frames_processed.inc()
+        if not result['success']:
+            self._frame_errors.inc()
+
+        # Rolling averages instead of a single frame's 1/delta
+        window = len(self._emit_times)
+        oldest = self._emit_times[self._emitted % window] if self._emitted >= window else self._emit_times[0]
+        self._emit_times[self._emitted % window] = current_time
+        self._emitted += 1
+        span = current_time - oldest
+        frames_in_span = min(self._emitted, window) - 1
+        self.fps = frames_in_span / span if frames_in_span > 0 and span > 0 else 0
+        self.processing_time = self._processing.mean()
+        self.last_frame_time = current_time
+        result['processing_time'] = processing_time
+        result['fps'] = self.fps
+
+        if self.overflow_policy == BLOCK:
+            # A result slot was reserved at dispatch, so this cannot be full
+            self.result_buffer.put_nowait(result)
+            return
+
+        while True:
+            try:
+                self.result_buffer.put_nowait(result)
+                return
+            except Full:
+                try:
+                    self.result_buffer.get_nowait()
+                    self._results_dropped.inc()
+                except Empty:
+                    pass
@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+from reprojection import ReprojectionErrors, compute_reprojection_errors
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class OutlierRejectionConfig:
+    max_view_error: float = 1.0      # per-view RMS (px) always accepted
+    relative_threshold: float = 2.5  # ...as is anything under this multiple of the median view RMS
+    min_views: int = 10              # never prune below this many views
+    max_iterations: int = 10
+    drop_per_iteration: int = 1
+    min_improvement: float = 1e-3    # stop when the global RMS improves by less (px)
+    flags: int = 0                   # extra calibrateCamera flags
+
+@dataclass
+class RemovedView:
+    index: int       # position in the views passed in
+    rms: float       # its RMS when it was removed
+    iteration: int
+
+    def as_dict(self) -> dict:
+        return {'index': self.index, 'rms': self.rms, 'iteration': self.iteration}
+
+@dataclass
+class RefinedCalibration:
+    camera_matrix: np.ndarray
+    dist_coeffs: np.ndarray
+    rvecs: Tuple[np.ndarray, ...]
+    tvecs: Tuple[np.ndarray, ...]
+    errors: ReprojectionErrors
+    kept_views: List[int]
+    removed_views: List[RemovedView] = field(default_factory=list)
+    iterations: int = 0
+    converged: bool = False
+
+    @property
+    def rms(self) -> float:
+        return self.errors.rms
+
+def view_error_threshold(errors: ReprojectionErrors, config: OutlierRejectionConfig) -> float:
+    return max(config.max_view_error, config.relative_threshold * float(np.median(errors.per_view_rms)))
+
+def calibrate_with_outlier_rejection(objpoints: Sequence[np.ndarray], imgpoints: Sequence[np.ndarray],
+                                     image_size: Tuple[int, int],
+                                     config: Optional[OutlierRejectionConfig] = None,
+                                     camera_matrix: Optional[np.ndarray] = None,
+                                     dist_coeffs: Optional[np.ndarray] = None) -> Optional[RefinedCalibration]:
+    """
+    Calibrate, rank views by reprojection RMS, drop the worst views above
+    the threshold and recalibrate warm-started from the previous intrinsics
+    (CALIB_USE_INTRINSIC_GUESS), until no view exceeds the threshold, the
+    global RMS stops improving or min_views is reached. Returns None if
+    calibrateCamera fails on the initial set.
+    """
+    config = config or OutlierRejectionConfig()
+    kept = list(range(len(objpoints)))
+    flags = config.flags
+    if camera_matrix is not None:
+        flags |= cv2.CALIB_USE_INTRINSIC_GUESS
+
+    def calibrate(views, mtx, dist, calib_flags):
+        obj = [objpoints[i] for i in views]
+        img = [imgpoints[i] for i in views]
+        ret, mtx, dist, rvecs, tvecs = cv2.calibrateCamera(obj, img, image_size, mtx, dist, flags=calib_flags)
+        if not ret:
+            return None
+        return mtx, dist, rvecs, tvecs, compute_reprojection_errors(obj, img, rvecs, tvecs, mtx, dist)
+
+    try:
+        current = calibrate(kept, camera_matrix, dist_coeffs, flags)
+    except cv2.error as e:
+        logger.error("Initial calibration failed: %s", str(e))
+        return None
+    if current is None:
+        return None
+
+    removed: List[RemovedView] = []
+    iteration = 0
+    converged = False
+    while iteration < config.max_iterations:
+        mtx, dist, rvecs, tvecs, errors = current
+        threshold = view_error_threshold(errors, config)
+        budget = min(config.drop_per_iteration, len(kept) - config.min_views)
+        worst = [int(v) for v in errors.worst_views(max(budget, 0)) if errors.per_view_rms[v] > threshold]
+        if not worst:
+            converged = not np.any(errors.per_view_rms > threshold)
+            break
+
+        iteration += 1
+        candidate_views = [view for position, view in enumerate(kept) if position not in worst]
+        try:
+            candidate = calibrate(candidate_views, mtx.copy(), dist.copy(),
+                                  config.flags | cv2.CALIB_USE_INTRINSIC_GUESS)
+        except cv2.error as e:
+            logger.warning("Recalibration failed on iteration %d: %s", iteration, str(e))
+            break
+        if candidate is None:
+            break
+
+        # Only accept the pruned calibration if it is actually better;
+        # otherwise keep the current one and its views
+        improvement = errors.rms - candidate[4].rms
+        if improvement < config.min_improvement:
+            logger.info("Stopping: removing %d view(s) changed RMS by %.4f px", len(worst), -improvement)
+            converged = True
+            break
+
+        for position in worst:
+            removed.append(RemovedView(kept[position], float(errors.per_view_rms[position]), iteration))
+            logger.info("Removed view %d (RMS %.3f px > %.3f px)", kept[position],
+                        errors.per_view_rms[position], threshold)
+        kept = candidate_views
+        current = candidate
+
+    mtx, dist, rvecs, tvecs, errors = current
+    return RefinedCalibration(
+        camera_matrix=mtx,
+        dist_coeffs=dist,
+        rvecs=rvecs,
+        tvecs=tvecs,
+        errors=errors,
+        kept_views=kept,
+        removed_views=removed,
+        iterations=iteration,
+        converged=converged
+    )
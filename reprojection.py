@@ -0,0 +1,107 @@
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from typing import Sequence
+
+@dataclass
+class ReprojectionErrors:
+    """Reprojection residuals of a calibration, flattened over all views"""
+    residuals: np.ndarray     # (M, 2) observed - projected, in pixels
+    view_index: np.ndarray    # (M,) view each residual belongs to
+    per_point: np.ndarray     # (M,) residual length
+    per_view_rms: np.ndarray  # (V,)
+    rms: float
+
+    @property
+    def num_views(self) -> int:
+        return len(self.per_view_rms)
+
+    def view_residuals(self, view: int) -> np.ndarray:
+        """Per-point residual lengths of one view"""
+        return self.per_point[self.view_index == view]
+
+    def worst_views(self, count: int = 1) -> np.ndarray:
+        """Indices of the views with the highest RMS, worst first"""
+        return np.argsort(self.per_view_rms)[::-1][:count]
+
+def rodrigues_batch(rvecs: np.ndarray) -> np.ndarray:
+    """(V, 3) rotation vectors -> (V, 3, 3) rotation matrices"""
+    rvecs = np.asarray(rvecs, dtype=np.float64).reshape(-1, 3)
+    theta = np.linalg.norm(rvecs, axis=1)
+    small = theta < 1e-12
+    k = rvecs / np.where(small, 1.0, theta)[:, None]
+    kx, ky, kz = k[:, 0], k[:, 1], k[:, 2]
+    zero = np.zeros_like(kx)
+    K = np.stack([
+        np.stack([zero, -kz, ky], axis=1),
+        np.stack([kz, zero, -kx], axis=1),
+        np.stack([-ky, kx, zero], axis=1),
+    ], axis=1)
+    sin = np.sin(theta)[:, None, None]
+    cos = np.cos(theta)[:, None, None]
+    R = np.eye(3) + sin * K + (1.0 - cos) * (K @ K)
+    R[small] = np.eye(3)
+    return R
+
+def project_camera_points(camera: np.ndarray, camera_matrix: np.ndarray,
+                          dist_coeffs: np.ndarray) -> np.ndarray:
+    """
+    Project (M, 3) camera-frame points with OpenCV's distortion model
+    (k1 k2 p1 p2 [k3 [k4 k5 k6 [s1 s2 s3 s4]]]) in NumPy. cv2.projectPoints
+    always computes the Jacobian as well, which dominates its cost; the
+    tilted-sensor model (14 coefficients) is left to it.
+    """
+    K = np.asarray(camera_matrix, dtype=np.float64)
+    dist = np.zeros(12) if dist_coeffs is None else np.asarray(dist_coeffs, dtype=np.float64).ravel()
+    if len(dist) > 12:
+        projected, _ = cv2.projectPoints(camera.reshape(-1, 1, 3), np.zeros(3), np.zeros(3), K, dist)
+        return projected.reshape(-1, 2)
+    k = np.zeros(12)
+    k[:len(dist)] = dist
+    k1, k2, p1, p2, k3, k4, k5, k6, s1, s2, s3, s4 = k
+
+    z = camera[:, 2]
+    z = np.where(z != 0, z, 1.0)
+    x = camera[:, 0] / z
+    y = camera[:, 1] / z
+    r2 = x * x + y * y
+    r4 = r2 * r2
+    r6 = r4 * r2
+    radial = (1 + k1 * r2 + k2 * r4 + k3 * r6) / (1 + k4 * r2 + k5 * r4 + k6 * r6)
+    xy2 = 2 * x * y
+    xd = x * radial + p1 * xy2 + p2 * (r2 + 2 * x * x) + s1 * r2 + s2 * r4
+    yd = y * radial + p1 * (r2 + 2 * y * y) + p2 * xy2 + s3 * r2 + s4 * r4
+
+    # Like projectPoints, the skew term K[0, 1] is ignored
+    return np.stack((K[0, 0] * xd + K[0, 2], K[1, 1] * yd + K[1, 2]), axis=1)
+
+def compute_reprojection_errors(objpoints: Sequence[np.ndarray], imgpoints: Sequence[np.ndarray],
+                                rvecs: Sequence[np.ndarray], tvecs: Sequence[np.ndarray],
+                                camera_matrix: np.ndarray, dist_coeffs: np.ndarray) -> ReprojectionErrors:
+    """
+    Residuals for every view in one batch: all object points are moved into
+    their camera frames and projected with NumPy instead of one projectPoints
+    call per view. Views may have different point counts.
+    """
+    counts = np.array([len(np.asarray(points).reshape(-1, 3)) for points in objpoints])
+    view_index = np.repeat(np.arange(len(counts)), counts)
+
+    world = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1, 3) for p in objpoints])
+    observed = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in imgpoints])
+    R = rodrigues_batch(np.asarray(rvecs).reshape(-1, 3))
+    t = np.asarray(tvecs, dtype=np.float64).reshape(-1, 3)
+
+    camera = np.einsum('mij,mj->mi', R[view_index], world) + t[view_index]
+    projected = project_camera_points(camera, camera_matrix, dist_coeffs)
+
+    residuals = observed - projected
+    squared = np.einsum('mi,mi->m', residuals, residuals)
+    per_view_rms = np.sqrt(np.bincount(view_index, weights=squared, minlength=len(counts)) / np.maximum(counts, 1))
+
+    return ReprojectionErrors(
+        residuals=residuals,
+        view_index=view_index,
+        per_point=np.sqrt(squared),
+        per_view_rms=per_view_rms,
+        rms=float(np.sqrt(squared.mean())) if len(squared) else 0.0
+    )
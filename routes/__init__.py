@@ -1,2 +1,2 @@
-
-# Package marker file
+
+# Package marker file
@@ -1,426 +1,686 @@
-from flask import Blueprint, request, jsonify
-import cv2
-import cv2.aruco as aruco
-import numpy as np
-import base64
-import logging
-from datetime import datetime
-import json
-import os
-
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
-
-# Create blueprint
-calibration_bp = Blueprint('calibration', __name__)
-
-def data_uri_to_cv2_img(data_uri):
-    try:
-        header, encoded = data_uri.split(",", 1)
-        data = base64.b64decode(encoded)
-        np_arr = np.frombuffer(data, np.uint8)
-        img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        
-        if img is None:
-            raise ValueError("Failed to decode image")
-            
-        return img
-        
-    except Exception as e:
-        raise ValueError(f"Error processing image: {str(e)}")
-
-class CalibrationState:
-    def __init__(self):
-        self.objpoints = []
-        self.imgpoints = {}
-        self.capture_counts = {0: 0, 1: 0, 2: 0}
-        self.calibrated_cameras = set()
-        self.calibration_status = {
-            "status": "idle",
-            "message": "Ready to start calibration",
-            "progress": 0
-        }
-        self.camera_matrices = {}
-        self.dist_coeffs = {}
-
-class CalibrationQualityMetrics:
-    def __init__(self):
-        self.pose_history = []
-        self.error_history = []
-        self.min_poses = 15
-        self.error_threshold = 0.5
-        self.coverage_threshold = 0.7
-        self.stability_threshold = 0.8
-        
-    def calculate_metrics(self, corners, ids, image_shape):
-        """Calculate quality metrics for current frame"""
-        metrics = {
-            'reprojection_error': self.calculate_reprojection_error(corners, ids),
-            'coverage': self.calculate_coverage(corners, image_shape),
-            'stability': self.calculate_stability(corners),
-            'pose_count': len(self.pose_history)
-        }
-        return metrics
-        
-    def calculate_reprojection_error(self, corners, ids):
-        """Calculate reprojection error"""
-        if corners is None or len(corners) == 0:
-            return 0.0
-            
-        try:
-            # Simple estimation based on corner positions
-            error = np.std(corners.reshape(-1, 2))
-            self.error_history.append(error)
-            if len(self.error_history) > 10:  # Keep last 10 errors
-                self.error_history.pop(0)
-            return np.mean(self.error_history)
-        except:
-            return 0.0
-    
-    def calculate_coverage(self, corners, image_shape):
-        """Calculate board coverage of image area"""
-        if corners is None or len(corners) == 0:
-            return 0.0
-            
-        try:
-            h, w = image_shape
-            image_area = h * w
-            
-            # Calculate convex hull of corners
-            hull = cv2.convexHull(corners.reshape(-1, 2))
-            board_area = cv2.contourArea(hull)
-            
-            return min(board_area / image_area, 1.0)
-        except:
-            return 0.0
-    
-    def calculate_stability(self, corners):
-        """Calculate board position stability"""
-        if corners is None or len(corners) == 0:
-            return 0.0
-            
-        try:
-            # Calculate current pose
-            current_pose = np.mean(corners.reshape(-1, 2), axis=0)
-            
-            # Add to history
-            self.pose_history.append(current_pose)
-            if len(self.pose_history) > 10:  # Keep last 10 poses
-                self.pose_history.pop(0)
-            
-            if len(self.pose_history) < 2:
-                return 1.0
-                
-            # Calculate stability from pose differences
-            diffs = np.diff(self.pose_history, axis=0)
-            movement = np.mean(np.linalg.norm(diffs, axis=1))
-            
-            # Convert to stability score (0-1)
-            stability = 1.0 / (1.0 + movement/50)  # 50 is scaling factor
-            return stability
-        except:
-            return 0.0
-    
-    def generate_feedback(self, metrics):
-        """Generate feedback messages based on metrics"""
-        feedback = []
-        
-        if metrics['reprojection_error'] > self.error_threshold:
-            feedback.append("Move board more slowly")
-        if metrics['coverage'] < self.coverage_threshold:
-            feedback.append("Cover more image area")
-        if metrics['stability'] < self.stability_threshold:
-            feedback.append("Hold board more steady")
-        if metrics['pose_count'] < self.min_poses:
-            feedback.append(f"Need {self.min_poses - metrics['pose_count']} more poses")
-            
-        if not feedback:
-            feedback.append("Good capture!")
-            
-        return feedback
-
-class CalibrationVisualizationSystem:
-    def __init__(self):
-        self.window_name = "Calibration System"
-        self.debug_dir = "debug_images"
-        self.setup_windows()
-        self.initialize_parameters()
-        self.setup_trackbars()
-        
-    def setup_windows(self):
-        """Setup all visualization windows"""
-        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
-        cv2.namedWindow("Quality Metrics", cv2.WINDOW_NORMAL)
-        cv2.namedWindow("Coverage Map", cv2.WINDOW_NORMAL)
-        cv2.namedWindow("3D View", cv2.WINDOW_NORMAL)
-        
-    def initialize_parameters(self):
-        """Initialize visualization parameters"""
-        self.overlay_alpha = 0.3
-        self.history_length = 100
-        self.position_history = []
-        self.quality_history = []
-        self.view_mode = 0  # 0: Normal, 1: Debug, 2: Advanced
-        self.show_3d = True
-        self.show_metrics = True
-        self.show_feedback = True
-        
-    def setup_trackbars(self):
-        """Setup interactive controls"""
-        cv2.createTrackbar('Overlay Alpha', self.window_name, 30, 100, 
-                          lambda x: setattr(self, 'overlay_alpha', x/100))
-        cv2.createTrackbar('View Mode', self.window_name, 0, 2,
-                          lambda x: setattr(self, 'view_mode', x))
-        cv2.createTrackbar('Show 3D', self.window_name, 1, 1,
-                          lambda x: setattr(self, 'show_3d', bool(x)))
-        
-    def create_visualization(self, frame, corners, ids, quality_metrics, calibration_state):
-        """Create comprehensive visualization"""
-        # Create main visualization
-        main_vis = self.create_main_view(frame, corners, ids, quality_metrics)
-        
-        # Create quality metrics view
-        metrics_vis = self.create_metrics_view(quality_metrics)
-        
-        # Create coverage map
-        coverage_vis = self.create_coverage_view()
-        
-        # Create 3D view
-        three_d_vis = self.create_3d_view(corners, ids) if self.show_3d else None
-        
-        # Show all windows
-        cv2.imshow(self.window_name, main_vis)
-        cv2.imshow("Quality Metrics", metrics_vis)
-        cv2.imshow("Coverage Map", coverage_vis)
-        if three_d_vis is not None:
-            cv2.imshow("3D View", three_d_vis)
-        
-        return main_vis
-    
-    def create_main_view(self, frame, corners, ids, quality_metrics):
-        """Create main visualization view"""
-        vis_img = frame.copy()
-        h, w = frame.shape[:2]
-        
-        # Create overlay based on view mode
-        if self.view_mode == 0:  # Normal mode
-            overlay = self.create_normal_overlay(corners, ids, h, w)
-        elif self.view_mode == 1:  # Debug mode
-            overlay = self.create_debug_overlay(corners, ids, h, w)
-        else:  # Advanced mode
-            overlay = self.create_advanced_overlay(corners, ids, h, w)
-        
-        # Add quality indicators
-        self.add_quality_indicators(vis_img, quality_metrics)
-        
-        # Add feedback
-        if self.show_feedback:
-            self.add_feedback(vis_img, quality_metrics)
-        
-        # Blend overlay
-        return cv2.addWeighted(vis_img, 1 - self.overlay_alpha, overlay, self.overlay_alpha, 0)
-    
-    def create_metrics_view(self, metrics):
-        """Create quality metrics visualization"""
-        h, w = 480, 640
-        vis = np.zeros((h, w, 3), dtype=np.uint8)
-        
-        # Update history
-        self.quality_history.append(metrics)
-        if len(self.quality_history) > self.history_length:
-            self.quality_history.pop(0)
-        
-        # Draw graphs
-        self.draw_metric_graphs(vis)
-        
-        # Draw current values
-        self.draw_metric_values(vis, metrics)
-        
-        return vis
-    
-    def create_coverage_view(self):
-        """Create coverage visualization"""
-        h, w = 480, 640
-        vis = np.zeros((h, w, 3), dtype=np.uint8)
-        
-        if self.position_history:
-            # Create heatmap
-            heatmap = self.calculate_coverage_heatmap(
-                self.position_history,
-                (h, w)
-            )
-            
-            # Colorize heatmap
-            vis = self.colorize_heatmap(heatmap)
-            
-            # Add coverage statistics
-            self.add_coverage_stats(vis)
-        
-        return vis
-    
-    def create_3d_view(self, corners, ids):
-        """Create 3D visualization"""
-        h, w = 480, 640
-        vis = np.zeros((h, w, 3), dtype=np.uint8)
-        
-        if corners is not None and ids is not None:
-            # Estimate pose
-            rvec, tvec = self.estimate_pose(corners, ids)
-            
-            if rvec is not None:
-                # Draw 3D coordinate system
-                self.draw_3d_coords(vis, rvec, tvec)
-                
-                # Draw 3D board model
-                self.draw_3d_board(vis, rvec, tvec)
-                
-                # Add pose information
-                self.add_pose_info(vis, rvec, tvec)
-        
-        return vis
-    
-    def add_quality_indicators(self, img, metrics):
-        """Add quality indicators to image"""
-        h, w = img.shape[:2]
-        
-        # Draw quality bars
-        self.draw_quality_bars(img, metrics)
-        
-        # Draw stability indicator
-        self.draw_stability_indicator(img, metrics['stability'])
-        
-        # Draw coverage indicator
-        self.draw_coverage_indicator(img, metrics['coverage'])
-    
-    def draw_quality_bars(self, img, metrics):
-        """Draw quality metric bars"""
-        h, w = img.shape[:2]
-        bar_h = 20
-        bar_w = 150
-        margin = 10
-        
-        metrics_to_show = [
-            ('Reprojection Error', metrics['reprojection_error'], 0, 1, (0,165,255)),
-            ('Coverage', metrics['coverage'], 0, 1, (0,255,0)),
-            ('Stability', metrics['stability'], 0, 1, (255,0,0))
-        ]
-        
-        for i, (name, value, min_val, max_val, color) in enumerate(metrics_to_show):
-            y = margin + i * (bar_h + 5)
-            
-            # Draw bar background
-            cv2.rectangle(img, (margin,y), (margin+bar_w,y+bar_h), (50,50,50), -1)
-            
-            # Draw bar value
-            normalized = (value - min_val) / (max_val - min_val)
-            cv2.rectangle(img, (margin,y), 
-                        (margin+int(bar_w*normalized),y+bar_h), 
-                        color, -1)
-            
-            # Draw text
-            cv2.putText(img, f"{name}: {value:.2f}", (margin+bar_w+5, y+15),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,255), 1)
-    
-    def add_feedback(self, img, metrics):
-        """Add real-time feedback messages"""
-        h, w = img.shape[:2]
-        
-        feedback = []
-        if metrics['reprojection_error'] > 0.5:
-            feedback.append(("Move board more slowly", (0,165,255)))
-        if metrics['coverage'] < 0.7:
-            feedback.append(("Cover more image area", (0,255,0)))
-        if metrics['stability'] < 0.8:
-            feedback.append(("Hold board more steady", (255,0,0)))
-        if not feedback:
-            feedback.append(("Good capture!", (0,255,0)))
-        
-        # Draw feedback box
-        y = h - 10
-        for msg, color in reversed(feedback):
-            cv2.putText(img, msg, (10, y), cv2.FONT_HERSHEY_SIMPLEX,
-                       0.7, color, 2)
-            y -= 25
-    
-    def save_debug_info(self, frame, corners, ids, metrics):
-        """Save debug information"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Save frame with detections
-        debug_frame = frame.copy()
-        if corners is not None:
-            cv2.aruco.drawDetectedCornersCharuco(debug_frame, corners, ids)
-        cv2.imwrite(f"{self.debug_dir}/frame_{timestamp}.jpg", debug_frame)
-        
-        # Save metrics
-        with open(f"{self.debug_dir}/metrics_{timestamp}.json", 'w') as f:
-            json.dump(metrics, f, indent=2)
-
-# Create an instance of our visualization system
-vis_system = CalibrationVisualizationSystem()
-
-@calibration_bp.route('/capture_checkerboard_image', methods=['POST'])
-def capture_checkerboard_image():
-    try:
-        # Get the image data from the POST request
-        data = request.get_json()
-        # Convert the base64 image to OpenCV format
-        img = data_uri_to_cv2_img(data['image_data'])
-        # Get which camera sent the image (0, 1, or 2)
-        camera_index = int(data.get('camera_index', 0))
-        
-        # Try to find the ChArUco board in the image
-        success, corners, ids = detect_pattern(img)
-        
-        # Calculate quality metrics (reprojection error, coverage, etc.)
-        quality_metrics = calibration_metrics.calculate_metrics(
-            corners, 
-            ids, 
-            img.shape[:2]
-        )
-        
-        # Create the visualization with overlays
-        vis_img = vis_system.create_visualization(
-            img,
-            corners,
-            ids,
-            quality_metrics,
-            calibration_state
-        )
-        
-        # Save images and metrics for debugging
-        vis_system.save_debug_info(img, corners, ids, quality_metrics)
-        
-        # Convert the visualization image to base64 for web display
-        _, buffer = cv2.imencode('.jpg', vis_img)
-        vis_base64 = base64.b64encode(buffer).decode('utf-8')
-        
-        # Send back the results
-        return jsonify({
-            'success': success,  # Whether pattern was found
-            'visualization': f'data:image/jpeg;base64,{vis_base64}',  # Image with overlays
-            'quality_metrics': quality_metrics,  # Quality measurements
-            'feedback': vis_system.generate_feedback(quality_metrics)  # User instructions
-        }), 200
-        
-    except Exception as e:
-        logger.exception("Error in capture_checkerboard_image")
-        return jsonify({'error': str(e)}), 500
-
-def detect_pattern(img):
-    try:
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        aruco_dict = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_6X6_250)
-        detector_params = cv2.aruco.DetectorParameters()
-        detector = cv2.aruco.ArucoDetector(aruco_dict, detector_params)
-        corners, ids, rejected = detector.detectMarkers(gray)
-        
-        if ids is not None and len(ids) > 0:
-            return True, corners, ids
-        return False, None, None
-        
-    except Exception as e:
-        logger.error(f"Error in pattern detection: {str(e)}")
-        return False, None, None
-
+from flask import Blueprint, request, jsonify
+import cv2
+import cv2.aruco as aruco
+import numpy as np
+import base64
+import functools
+import logging
+import os
+import threading
+from collections import deque
+from image_decoder import ImageTooLarge, decode_data_uri, decode_request_image
+from aruco_registry import detector_registry
+from config import Config
+from debug_writer import DebugArtifactWriter, DebugWriterConfig
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Create blueprint
+calibration_bp = Blueprint('calibration', __name__)
+
+# Calibration board markers; the detector is built once and reused per thread
+PATTERN_DICTIONARY = cv2.aruco.DICT_6X6_250
+detector_registry.warm_up([(PATTERN_DICTIONARY, 'default')])
+
+def data_uri_to_cv2_img(data_uri):
+    try:
+        return decode_data_uri(data_uri)
+    except Exception as e:
+        raise ValueError(f"Error processing image: {str(e)}")
+
+class CalibrationState:
+    def __init__(self):
+        self.objpoints = []
+        self.imgpoints = {}
+        self.capture_counts = {0: 0, 1: 0, 2: 0}
+        self.calibrated_cameras = set()
+        self.calibration_status = {
+            "status": "idle",
+            "message": "Ready to start calibration",
+            "progress": 0
+        }
+        self.camera_matrices = {}
+        self.dist_coeffs = {}
+
+class CalibrationQualityMetrics:
+    """
+    Per-camera capture quality, updated incrementally in constant time per
+    frame: coverage is a running occupancy grid over the image, the
+    reprojection error comes from a solvePnP fit of the detected markers to
+    the board model, and histories are fixed-size deques.
+
+    The board model is an aruco GridBoard (board_size markers per row and
+    column, marker_length and marker_separation in metres) and must match
+    the physical calibration target; for any other target the reprojection
+    error would be meaningless. See calibration_board(). Without a board
+    model the reprojection error is reported as None and poses are told
+    apart by where the board sits in the image instead of by its 3D pose.
+
+    pose_count counts distinct poses: a pose differing from every earlier
+    one by less than min_pose_angle and min_pose_shift is not counted again.
+    """
+
+    def __init__(self, board_size=None, marker_length=None, marker_separation=None,
+                 dictionary_type=PATTERN_DICTIONARY, grid_size=(8, 6), history_length=10):
+        self.min_poses = 15
+        self.error_threshold = 0.5
+        self.coverage_threshold = 0.7
+        self.stability_threshold = 0.8
+        self.min_pose_angle = np.deg2rad(10.0)  # rotation between distinct poses
+        self.min_pose_shift = 0.1  # translation relative to distance (or image fraction without a board)
+
+        self.board = None
+        if board_size is not None:
+            self.board = aruco.GridBoard(board_size, marker_length, marker_separation,
+                                         detector_registry.get_dictionary(dictionary_type))
+        self.grid_size = grid_size  # (columns, rows)
+        self.history_length = history_length
+        self.reset()
+
+    def reset(self):
+        self.coverage_grid = np.zeros((self.grid_size[1], self.grid_size[0]), dtype=bool)
+        self.pose_history = deque(maxlen=self.history_length)   # board centroids (px)
+        self.error_history = deque(maxlen=self.history_length)  # per-frame RMS (px)
+        self.pose_count = 0
+        self.distinct_poses = []  # (R, t) per counted pose, or image placements without a board
+        self.last_pose = None  # (rvec, tvec) of the latest successful solvePnP
+
+    @staticmethod
+    def _stack_corners(corners):
+        """detectMarkers corner tuple -> (N*4, 2) float32"""
+        if corners is None or len(corners) == 0:
+            return None
+        return np.concatenate([np.asarray(c, dtype=np.float32).reshape(-1, 2) for c in corners])
+
+    @staticmethod
+    def default_camera_matrix(image_shape):
+        """Pinhole guess for uncalibrated cameras: f = longest side, centred principal point"""
+        h, w = image_shape[:2]
+        f = float(max(h, w))
+        return np.array([[f, 0, w / 2.0], [0, f, h / 2.0], [0, 0, 1]], dtype=np.float64)
+
+    def calculate_metrics(self, corners, ids, image_shape, camera_matrix=None, dist_coeffs=None):
+        """Calculate quality metrics for current frame"""
+        points = self._stack_corners(corners)
+        if self.board is None and points is not None:
+            self._count_placement(points, image_shape)
+        metrics = {
+            'reprojection_error': self.calculate_reprojection_error(
+                corners, ids, image_shape, camera_matrix, dist_coeffs),
+            'coverage': self.calculate_coverage(points, image_shape),
+            'stability': self.calculate_stability(points),
+            'pose_count': self.pose_count
+        }
+        return metrics
+
+    def calculate_reprojection_error(self, corners, ids, image_shape=None, camera_matrix=None, dist_coeffs=None):
+        """Mean RMS reprojection error (px) of recent solvePnP board poses; None without a board model"""
+        if self.board is None:
+            return None
+        if corners is None or len(corners) == 0 or ids is None:
+            return float(np.mean(self.error_history)) if self.error_history else 0.0
+
+        try:
+            obj_points, img_points = self.board.matchImagePoints(corners, ids)
+            if obj_points is None or len(obj_points) < 4:
+                return float(np.mean(self.error_history)) if self.error_history else 0.0
+
+            if camera_matrix is None:
+                camera_matrix = self.default_camera_matrix(image_shape)
+            camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+            dist_coeffs = np.zeros(5) if dist_coeffs is None else np.asarray(dist_coeffs, dtype=np.float64)
+
+            ok, rvec, tvec = cv2.solvePnP(obj_points, img_points, camera_matrix, dist_coeffs,
+                                          flags=cv2.SOLVEPNP_IPPE)
+            if not ok:
+                return float(np.mean(self.error_history)) if self.error_history else 0.0
+
+            projected, _ = cv2.projectPoints(obj_points, rvec, tvec, camera_matrix, dist_coeffs)
+            residuals = projected.reshape(-1, 2) - img_points.reshape(-1, 2)
+            error = float(np.sqrt(np.mean(np.sum(residuals * residuals, axis=1))))
+
+            self.error_history.append(error)
+            self._count_pose(rvec, tvec)
+            self.last_pose = (rvec, tvec)
+            return float(np.mean(self.error_history))
+        except cv2.error as e:
+            logger.debug("Pose estimation failed: %s", str(e))
+            return float(np.mean(self.error_history)) if self.error_history else 0.0
+
+    def _count_pose(self, rvec, tvec):
+        """Count a solvePnP pose unless it is close to one already counted"""
+        R, _ = cv2.Rodrigues(rvec)
+        t = np.asarray(tvec, dtype=np.float64).ravel()
+        for R_seen, t_seen in self.distinct_poses:
+            angle = np.arccos(np.clip((np.trace(R_seen.T @ R) - 1.0) / 2.0, -1.0, 1.0))
+            shift = np.linalg.norm(t - t_seen) / max(np.linalg.norm(t_seen), 1e-9)
+            if angle < self.min_pose_angle and shift < self.min_pose_shift:
+                return
+        self.distinct_poses.append((R, t))
+        self.pose_count += 1
+
+    def _count_placement(self, points, image_shape):
+        """Board-less fallback: count distinct (centre, apparent size) placements in the image"""
+        h, w = image_shape[:2]
+        centre = points.mean(axis=0) / (w, h)
+        size = np.sqrt(cv2.contourArea(cv2.convexHull(points)) / float(w * h))
+        placement = np.array([centre[0], centre[1], size])
+        for seen in self.distinct_poses:
+            if np.all(np.abs(placement - seen) < self.min_pose_shift):
+                return
+        self.distinct_poses.append(placement)
+        self.pose_count += 1
+
+    def calculate_coverage(self, points, image_shape):
+        """Fraction of image grid cells that have contained board corners so far"""
+        if points is not None and len(points):
+            h, w = image_shape[:2]
+            cols, rows = self.grid_size
+            cx = np.clip((points[:, 0] * cols / w).astype(np.intp), 0, cols - 1)
+            cy = np.clip((points[:, 1] * rows / h).astype(np.intp), 0, rows - 1)
+            self.coverage_grid[cy, cx] = True
+        return float(self.coverage_grid.mean())
+
+    def calculate_stability(self, points):
+        """Calculate board position stability"""
+        if points is None or len(points) == 0:
+            return 0.0
+
+        # Board centroid as the position
+        self.pose_history.append(points.mean(axis=0))
+        if len(self.pose_history) < 2:
+            return 1.0
+
+        # Calculate stability from pose differences
+        diffs = np.diff(np.asarray(self.pose_history), axis=0)
+        movement = np.mean(np.linalg.norm(diffs, axis=1))
+
+        # Convert to stability score (0-1)
+        return float(1.0 / (1.0 + movement / 50))  # 50 is scaling factor
+
+    def generate_feedback(self, metrics):
+        """Generate feedback messages based on metrics"""
+        feedback = []
+        
+        error = metrics['reprojection_error']
+        if error is not None and error > self.error_threshold:
+            feedback.append("Move board more slowly")
+        if metrics['coverage'] < self.coverage_threshold:
+            feedback.append("Cover more image area")
+        if metrics['stability'] < self.stability_threshold:
+            feedback.append("Hold board more steady")
+        if metrics['pose_count'] < self.min_poses:
+            feedback.append(f"Need {self.min_poses - metrics['pose_count']} more poses")
+            
+        if not feedback:
+            feedback.append("Good capture!")
+            
+        return feedback
+
+class CalibrationVisualizationSystem:
+    """
+    Headless renderer for the calibration views. Nothing touches HighGUI:
+    views are drawn into canvases preallocated per thread and reused across
+    requests, and only the views a client asks for are rendered. Returned
+    images alias those canvases, so encode them before the next render on
+    the same thread.
+    """
+
+    VIEWS = ('main', 'metrics', 'coverage', '3d')
+    VIEW_MODES = ('normal', 'debug', 'advanced')
+
+    def __init__(self, view_size=(640, 480), history_length=100, debug_config=None):
+        self.debug_config = debug_config or DebugWriterConfig(
+            directory=os.getenv('CALIBRATION_DEBUG_DIR', 'debug_images'),
+            sample_every=int(os.getenv('CALIBRATION_DEBUG_SAMPLE_EVERY', '1')),
+            failures_only=os.getenv('CALIBRATION_DEBUG_FAILURES_ONLY', 'False') == 'True'
+        )
+        self.debug_dir = self.debug_config.directory
+        self.debug_writer = DebugArtifactWriter(self.debug_config, name='calibration')
+        self.view_size = view_size  # (width, height) of the auxiliary views
+        self.history_length = history_length
+        self.initialize_parameters()
+        self._local = threading.local()
+
+    def initialize_parameters(self):
+        """Initialize visualization parameters"""
+        self.overlay_alpha = 0.3
+        self.quality_history = {}  # camera index -> deque of (error, coverage, stability)
+        self.view_mode = 0  # 0: Normal, 1: Debug, 2: Advanced
+        self.show_3d = True
+        self.show_metrics = True
+        self.show_feedback = True
+
+    def _canvas(self, name, shape):
+        """Zeroed canvas reused between requests on this thread"""
+        canvases = getattr(self._local, 'canvases', None)
+        if canvases is None:
+            canvases = self._local.canvases = {}
+        canvas = canvases.get(name)
+        if canvas is None or canvas.shape != shape:
+            canvas = canvases[name] = np.zeros(shape, dtype=np.uint8)
+        else:
+            canvas.fill(0)
+        return canvas
+
+    def history(self, camera_index=0):
+        """Graph history of one camera"""
+        history = self.quality_history.get(camera_index)
+        if history is None:
+            history = self.quality_history.setdefault(camera_index, deque(maxlen=self.history_length))
+        return history
+
+    def record(self, metrics, camera_index=0):
+        """Append a frame's metrics to the camera's graph history; cheap, call every frame"""
+        error = metrics['reprojection_error']
+        self.history(camera_index).append((
+            float('nan') if error is None else float(error), float(metrics['coverage']), float(metrics['stability'])
+        ))
+
+    def render(self, views, frame, corners, ids, quality_metrics, quality_engine=None, camera_index=0):
+        """Render the requested views of one camera; returns {view name: BGR image}"""
+        rendered = {}
+        for view in views:
+            if view == 'main':
+                rendered[view] = self.create_main_view(frame, corners, ids, quality_metrics)
+            elif view == 'metrics':
+                rendered[view] = self.create_metrics_view(quality_metrics, camera_index)
+            elif view == 'coverage':
+                rendered[view] = self.create_coverage_view(quality_engine)
+            elif view == '3d' and self.show_3d:
+                rendered[view] = self.create_3d_view(corners, ids, quality_engine)
+        return rendered
+
+    def create_visualization(self, frame, corners, ids, quality_metrics, calibration_state, quality_engine=None):
+        """Create the main visualization view"""
+        return self.render(('main',), frame, corners, ids, quality_metrics, quality_engine)['main']
+
+    def create_main_view(self, frame, corners, ids, quality_metrics):
+        """Create main visualization view"""
+        h, w = frame.shape[:2]
+        vis_img = self._canvas('main', frame.shape)
+        np.copyto(vis_img, frame)
+
+        # Create overlay based on view mode
+        overlay = self._canvas('overlay', frame.shape)
+        if self.view_mode == 0:  # Normal mode
+            self.create_normal_overlay(overlay, corners, ids, h, w)
+        elif self.view_mode == 1:  # Debug mode
+            self.create_debug_overlay(overlay, corners, ids, h, w)
+        else:  # Advanced mode
+            self.create_advanced_overlay(overlay, corners, ids, h, w)
+
+        # Add quality indicators
+        self.add_quality_indicators(vis_img, quality_metrics)
+
+        # Add feedback
+        if self.show_feedback:
+            self.add_feedback(vis_img, quality_metrics)
+
+        # Blend overlay in place
+        cv2.addWeighted(vis_img, 1 - self.overlay_alpha, overlay, self.overlay_alpha, 0, dst=vis_img)
+        return vis_img
+
+    def create_normal_overlay(self, overlay, corners, ids, h, w):
+        """Filled marker quads"""
+        if corners is None or len(corners) == 0:
+            return overlay
+        quads = [np.asarray(c, dtype=np.float32).reshape(-1, 2).astype(np.int32) for c in corners]
+        cv2.fillPoly(overlay, quads, (0, 255, 0))
+        return overlay
+
+    def create_debug_overlay(self, overlay, corners, ids, h, w):
+        """Marker outlines, first-corner dots and ids"""
+        if corners is None or len(corners) == 0:
+            return overlay
+        cv2.aruco.drawDetectedMarkers(overlay, corners, ids, (0, 255, 255))
+        return overlay
+
+    def create_advanced_overlay(self, overlay, corners, ids, h, w):
+        """Debug overlay plus the board's convex hull and centroid"""
+        self.create_debug_overlay(overlay, corners, ids, h, w)
+        if corners is None or len(corners) == 0:
+            return overlay
+        points = CalibrationQualityMetrics._stack_corners(corners)
+        hull = cv2.convexHull(points).astype(np.int32)
+        cv2.polylines(overlay, [hull], True, (255, 0, 255), 2)
+        cx, cy = points.mean(axis=0)
+        cv2.drawMarker(overlay, (int(cx), int(cy)), (255, 0, 255), cv2.MARKER_CROSS, 20, 2)
+        return overlay
+
+    def create_metrics_view(self, metrics, camera_index=0):
+        """Create quality metrics visualization"""
+        w, h = self.view_size
+        vis = self._canvas('metrics', (h, w, 3))
+
+        # Draw graphs
+        self.draw_metric_graphs(vis, camera_index)
+
+        # Draw current values
+        self.draw_metric_values(vis, metrics)
+
+        return vis
+
+    def draw_metric_graphs(self, vis, camera_index=0):
+        """Polyline per metric over the camera's recorded history"""
+        history = self.history(camera_index)
+        if len(history) < 2:
+            return
+        h, w = vis.shape[:2]
+        history = np.asarray(history, dtype=np.float32)
+        xs = np.linspace(0, w - 1, len(history))
+        graph_top, graph_bottom = 80, h - 10
+        colors = ((0, 165, 255), (0, 255, 0), (255, 0, 0))
+        for column, color in enumerate(colors):
+            recorded = np.isfinite(history[:, column])  # reprojection error is NaN without a board model
+            if np.count_nonzero(recorded) < 2:
+                continue
+            values = np.clip(history[recorded, column], 0.0, 1.0)
+            ys = graph_bottom - values * (graph_bottom - graph_top)
+            points = np.stack((xs[recorded], ys), axis=1).astype(np.int32)
+            cv2.polylines(vis, [points], False, color, 1, cv2.LINE_AA)
+
+    def draw_metric_values(self, vis, metrics):
+        error = metrics['reprojection_error']
+        lines = (
+            (f"Reprojection error: {error:.2f} px" if error is not None
+             else "Reprojection error: n/a (no board model)", (0, 165, 255)),
+            (f"Coverage: {metrics['coverage']:.0%}", (0, 255, 0)),
+            (f"Stability: {metrics['stability']:.2f}  Poses: {metrics['pose_count']}", (255, 0, 0)),
+        )
+        for i, (text, color) in enumerate(lines):
+            cv2.putText(vis, text, (10, 20 + i * 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+
+    def create_coverage_view(self, quality_engine=None):
+        """Create coverage visualization"""
+        w, h = self.view_size
+        vis = self._canvas('coverage', (h, w, 3))
+
+        if quality_engine is not None:
+            # Create heatmap
+            heatmap = self.calculate_coverage_heatmap(quality_engine.coverage_grid, (h, w))
+
+            # Colorize heatmap
+            self.colorize_heatmap(heatmap, vis)
+
+            # Add coverage statistics
+            self.add_coverage_stats(vis, quality_engine.coverage_grid)
+
+        return vis
+
+    def calculate_coverage_heatmap(self, coverage_grid, shape):
+        """Occupancy grid scaled up to the view size"""
+        h, w = shape
+        return cv2.resize(coverage_grid.astype(np.uint8) * 255, (w, h), interpolation=cv2.INTER_NEAREST)
+
+    def colorize_heatmap(self, heatmap, out):
+        cv2.applyColorMap(heatmap, cv2.COLORMAP_JET, dst=out)
+        return out
+
+    def add_coverage_stats(self, vis, coverage_grid):
+        rows, cols = coverage_grid.shape
+        h, w = vis.shape[:2]
+        for c in range(1, cols):
+            x = c * w // cols
+            cv2.line(vis, (x, 0), (x, h), (255, 255, 255), 1)
+        for r in range(1, rows):
+            y = r * h // rows
+            cv2.line(vis, (0, y), (w, y), (255, 255, 255), 1)
+        cv2.putText(vis, f"Coverage: {coverage_grid.mean():.0%}", (10, 25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+    def create_3d_view(self, corners, ids, quality_engine=None):
+        """Create 3D visualization"""
+        w, h = self.view_size
+        vis = self._canvas('3d', (h, w, 3))
+
+        if corners is not None and ids is not None:
+            # Estimate pose
+            rvec, tvec = self.estimate_pose(corners, ids, quality_engine)
+
+            if rvec is not None:
+                camera_matrix = self._view_camera_matrix()
+                # Draw 3D coordinate system
+                self.draw_3d_coords(vis, rvec, tvec, camera_matrix)
+
+                # Draw 3D board model
+                self.draw_3d_board(vis, rvec, tvec, camera_matrix, quality_engine)
+
+                # Add pose information
+                self.add_pose_info(vis, rvec, tvec)
+
+        return vis
+
+    def estimate_pose(self, corners, ids, quality_engine=None):
+        """Board pose from the metrics engine's latest solvePnP fit"""
+        if quality_engine is None or quality_engine.last_pose is None:
+            return None, None
+        return quality_engine.last_pose
+
+    def _view_camera_matrix(self):
+        w, h = self.view_size
+        return CalibrationQualityMetrics.default_camera_matrix((h, w))
+
+    def draw_3d_coords(self, vis, rvec, tvec, camera_matrix):
+        cv2.drawFrameAxes(vis, camera_matrix, np.zeros(5), rvec, tvec, 0.05, 2)
+
+    def draw_3d_board(self, vis, rvec, tvec, camera_matrix, quality_engine=None):
+        if quality_engine is None or quality_engine.board is None:
+            return
+        for marker in quality_engine.board.getObjPoints():
+            projected, _ = cv2.projectPoints(np.asarray(marker, dtype=np.float32), rvec, tvec,
+                                             camera_matrix, np.zeros(5))
+            cv2.polylines(vis, [projected.reshape(-1, 2).astype(np.int32)], True, (200, 200, 200), 1)
+
+    def add_pose_info(self, vis, rvec, tvec):
+        h = vis.shape[0]
+        t = np.asarray(tvec).ravel()
+        r = np.degrees(np.asarray(rvec).ravel())
+        cv2.putText(vis, f"t: {t[0]:.3f} {t[1]:.3f} {t[2]:.3f}", (10, h - 35),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        cv2.putText(vis, f"r: {r[0]:.1f} {r[1]:.1f} {r[2]:.1f} deg", (10, h - 15),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    def add_quality_indicators(self, img, metrics):
+        """Add quality indicators to image"""
+        # Draw quality bars
+        self.draw_quality_bars(img, metrics)
+
+        # Draw stability indicator
+        self.draw_stability_indicator(img, metrics['stability'])
+
+        # Draw coverage indicator
+        self.draw_coverage_indicator(img, metrics['coverage'])
+
+    def draw_stability_indicator(self, img, stability):
+        h, w = img.shape[:2]
+        color = (0, 255, 0) if stability >= 0.8 else (0, 165, 255) if stability >= 0.5 else (0, 0, 255)
+        cv2.circle(img, (w - 30, 30), 15, color, -1)
+
+    def draw_coverage_indicator(self, img, coverage):
+        h, w = img.shape[:2]
+        cv2.ellipse(img, (w - 30, 75), (15, 15), -90, 0, int(360 * min(max(coverage, 0.0), 1.0)),
+                    (0, 255, 0), 4)
+
+    def draw_quality_bars(self, img, metrics):
+        """Draw quality metric bars"""
+        h, w = img.shape[:2]
+        bar_h = 20
+        bar_w = 150
+        margin = 10
+        
+        metrics_to_show = [
+            ('Reprojection Error', metrics['reprojection_error'], 0, 1, (0,165,255)),
+            ('Coverage', metrics['coverage'], 0, 1, (0,255,0)),
+            ('Stability', metrics['stability'], 0, 1, (255,0,0))
+        ]
+        
+        for i, (name, value, min_val, max_val, color) in enumerate(metrics_to_show):
+            if value is None:
+                continue
+            y = margin + i * (bar_h + 5)
+            
+            # Draw bar background
+            cv2.rectangle(img, (margin,y), (margin+bar_w,y+bar_h), (50,50,50), -1)
+            
+            # Draw bar value
+            normalized = min(max((value - min_val) / (max_val - min_val), 0.0), 1.0)
+            cv2.rectangle(img, (margin,y), 
+                        (margin+int(bar_w*normalized),y+bar_h), 
+                        color, -1)
+            
+            # Draw text
+            cv2.putText(img, f"{name}: {value:.2f}", (margin+bar_w+5, y+15),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255,255,255), 1)
+    
+    def add_feedback(self, img, metrics):
+        """Add real-time feedback messages"""
+        h, w = img.shape[:2]
+        
+        feedback = []
+        if metrics['reprojection_error'] is not None and metrics['reprojection_error'] > 0.5:
+            feedback.append(("Move board more slowly", (0,165,255)))
+        if metrics['coverage'] < 0.7:
+            feedback.append(("Cover more image area", (0,255,0)))
+        if metrics['stability'] < 0.8:
+            feedback.append(("Hold board more steady", (255,0,0)))
+        if not feedback:
+            feedback.append(("Good capture!", (0,255,0)))
+        
+        # Draw feedback box
+        y = h - 10
+        for msg, color in reversed(feedback):
+            cv2.putText(img, msg, (10, y), cv2.FONT_HERSHEY_SIMPLEX,
+                       0.7, color, 2)
+            y -= 25
+    
+    def save_debug_info(self, frame, corners, ids, metrics, failed=False):
+        """
+        Queue the frame (with detections drawn in the writer thread) and its
+        metrics for the background writer. Takes ownership of frame.
+        """
+        def draw_detections(debug_frame):
+            if corners is not None and len(corners):
+                cv2.aruco.drawDetectedMarkers(debug_frame, corners, ids)
+
+        return self.debug_writer.submit(frame, metrics, failed=failed, annotate=draw_detections)
+
+# Create an instance of our visualization system
+vis_system = CalibrationVisualizationSystem()
+
+calibration_state = CalibrationState()
+# Quality metrics per camera index; coverage and histories are per camera
+calibration_metrics = {}
+
+@functools.lru_cache(maxsize=None)
+def calibration_board():
+    """
+    (board_size, marker_length, marker_separation) of the calibration
+    target from Config.CALIBRATION_BOARD, or (None, None, None) if it is
+    not configured; the board-model metrics are then skipped. Raises on an
+    invalid configuration.
+    """
+    board = Config.CALIBRATION_BOARD
+    if not any(board.values()):
+        logger.warning(
+            "No calibration board configured (CALIBRATION_BOARD_SIZE, CALIBRATION_MARKER_LENGTH, "
+            "CALIBRATION_MARKER_SEPARATION); reprojection error will not be reported")
+        return None, None, None
+    try:
+        if not all(board.values()):
+            raise ValueError("all three settings are required")
+        board_size = tuple(int(v) for v in board['size'].split(','))
+        if len(board_size) != 2:
+            raise ValueError("expected two values")
+        return board_size, float(board['marker_length']), float(board['marker_separation'])
+    except ValueError as e:
+        raise RuntimeError(f"Invalid calibration board configuration {board}: {str(e)}")
+
+def get_quality_metrics(camera_index):
+    if camera_index not in calibration_metrics:
+        calibration_metrics[camera_index] = CalibrationQualityMetrics(*calibration_board())
+    return calibration_metrics[camera_index]
+
+def requested_views(data):
+    """Views named in the 'views' field or query parameter (list or comma-separated)"""
+    views = data.get('views') or request.args.get('views')
+    if not views:
+        return ()
+    if isinstance(views, str):
+        views = views.split(',')
+    return tuple(view.strip() for view in views if view.strip() in CalibrationVisualizationSystem.VIEWS)
+
+@calibration_bp.route('/capture_checkerboard_image', methods=['POST'])
+def capture_checkerboard_image():
+    try:
+        # Decode the image straight from the request body (raw/multipart),
+        # falling back to a base64 data URI in a JSON body
+        try:
+            img, data = decode_request_image(request, 'image_data')
+        except ImageTooLarge as e:
+            return jsonify({'error': str(e)}), 413
+        except ValueError as e:
+            return jsonify({'error': f"Error processing image: {str(e)}"}), 400
+        # Get which camera sent the image (0, 1, or 2)
+        camera_index = int(data.get('camera_index', 0))
+        
+        # Try to find the ChArUco board in the image
+        success, corners, ids = detect_pattern(img)
+        
+        # Calculate quality metrics (reprojection error, coverage, etc.)
+        metrics_engine = get_quality_metrics(camera_index)
+        quality_metrics = metrics_engine.calculate_metrics(
+            corners, 
+            ids, 
+            img.shape[:2],
+            calibration_state.camera_matrices.get(camera_index),
+            calibration_state.dist_coeffs.get(camera_index)
+        )
+        
+        vis_system.record(quality_metrics, camera_index)
+        
+        response = {
+            'success': success,  # Whether pattern was found
+            'quality_metrics': quality_metrics,  # Quality measurements
+            'feedback': metrics_engine.generate_feedback(quality_metrics)  # User instructions
+        }
+
+        # Render overlays only for the views the client asked for
+        views = requested_views(data)
+        if views:
+            rendered = vis_system.render(views, img, corners, ids, quality_metrics, metrics_engine, camera_index)
+            encoded = {}
+            for name, vis_img in rendered.items():
+                # Convert the visualization image to base64 for web display
+                _, buffer = cv2.imencode('.jpg', vis_img)
+                encoded[name] = f"data:image/jpeg;base64,{base64.b64encode(buffer).decode('utf-8')}"
+            response['views'] = encoded
+            if 'main' in encoded:
+                response['visualization'] = encoded['main']  # Image with overlays
+
+        # Queue images and metrics for debugging; img is not used after this
+        vis_system.save_debug_info(img, corners, ids, quality_metrics, failed=not success)
+        
+        # Send back the results
+        return jsonify(response), 200
+        
+    except Exception as e:
+        logger.exception("Error in capture_checkerboard_image")
+        return jsonify({'error': str(e)}), 500
+
+def detect_pattern(img):
+    try:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        detector = detector_registry.get(PATTERN_DICTIONARY)
+        corners, ids, rejected = detector.detectMarkers(gray)
+        
+        if ids is not None and len(ids) > 0:
+            return True, corners, ids
+        return False, None, None
+        
+    except Exception as e:
+        logger.error(f"Error in pattern detection: {str(e)}")
+        return False, None, None
+
@@ -1,105 +1,308 @@
-import numpy as np
-import cv2
-from dataclasses import dataclass
-from typing import List, Tuple, Optional
-
-@dataclass
-class ScoringZone:
-    points: int
-    center: np.ndarray
-    radius: float
-    confidence: float
-
-class ScoringSystem:
-    def __init__(self):
-        # Standard dartboard measurements (in meters)
-        self.double_ring_radius = 0.170
-        self.triple_ring_radius = 0.107
-        self.bullseye_radius = 0.0127
-        self.double_bull_radius = 0.0318
-        self.scoring_zones = self._initialize_scoring_zones()
-
-    def _initialize_scoring_zones(self) -> dict:
-        # Define all scoring zones with their positions
-        zones = {}
-        sections = 20  # Standard dartboard has 20 sections
-        for i in range(sections):
-            angle = (2 * np.pi * i) / sections
-            # Standard dartboard scoring arrangement
-            number = [20, 1, 18, 4, 13, 6, 10, 15, 2, 17, 3, 19, 7, 16, 8, 11, 14, 9, 12, 5][i]
-            
-            zones[f"single_{number}"] = {
-                'points': number,
-                'multiplier': 1,
-                'angle_start': angle,
-                'angle_end': angle + (2 * np.pi / sections)
-            }
-            zones[f"double_{number}"] = {
-                'points': number * 2,
-                'multiplier': 2,
-                'radius_inner': self.double_ring_radius - 0.008,
-                'radius_outer': self.double_ring_radius
-            }
-            zones[f"triple_{number}"] = {
-                'points': number * 3,
-                'multiplier': 3,
-                'radius_inner': self.triple_ring_radius - 0.008,
-                'radius_outer': self.triple_ring_radius
-            }
-        
-        return zones
-
-    def detect_impact(self, position: np.ndarray, calibration_data: dict) -> Tuple[int, float]:
-        """
-        Detect which scoring zone was hit and return points and confidence
-        """
-        try:
-            # Transform position to dartboard coordinate system
-            board_position = self._transform_to_board_coordinates(position, calibration_data)
-            
-            # Calculate distance from center and angle
-            distance = np.linalg.norm(board_position[:2])
-            angle = np.arctan2(board_position[1], board_position[0])
-            if angle < 0:
-                angle += 2 * np.pi
-
-            # Check special cases (bullseye)
-            if distance <= self.double_bull_radius:
-                return 50, 0.95
-            elif distance <= self.bullseye_radius:
-                return 25, 0.90
-
-            # Find the scoring section
-            section_angle = (2 * np.pi) / 20
-            section_index = int(angle / section_angle)
-            
-            # Determine multiplier based on distance
-            if abs(distance - self.double_ring_radius) < 0.008:
-                multiplier = 2
-            elif abs(distance - self.triple_ring_radius) < 0.008:
-                multiplier = 3
-            else:
-                multiplier = 1
-
-            # Get base points for section
-            base_points = [20, 1, 18, 4, 13, 6, 10, 15, 2, 17, 3, 19, 7, 16, 8, 11, 14, 9, 12, 5][section_index]
-            
-            # Calculate confidence based on distance from ideal position
-            confidence = self._calculate_scoring_confidence(distance, angle, section_index)
-            
-            return base_points * multiplier, confidence
-
-        except Exception as e:
-            print(f"Error in score detection: {e}")
-            return 0, 0.0
-
-    def _calculate_scoring_confidence(self, distance: float, angle: float, section_index: int) -> float:
-        """
-        Calculate confidence score based on position accuracy
-        """
-        # Implement confidence calculation based on:
-        # 1. Distance from ideal position
-        # 2. Angle accuracy
-        # 3. Camera calibration quality
-        # Returns value between 0 and 1
-        pass
\ No newline at end of file
+import hashlib
+import os
+import numpy as np
+import cv2
+from dataclasses import dataclass
+from typing import List, Tuple, Optional
+from board_transform import BoardTransformCache
+
+# Standard dartboard scoring arrangement, counter-clockwise from the +x axis
+SEGMENT_ORDER = np.array([20, 1, 18, 4, 13, 6, 10, 15, 2, 17, 3, 19, 7, 16, 8, 11, 14, 9, 12, 5], dtype=np.int32)
+SECTION_ANGLE = (2 * np.pi) / len(SEGMENT_ORDER)
+BULL_SEGMENT = 25
+
+# Zone ID layout for the lookup table: 0 miss, 1 outer bull, 2 inner bull,
+# then three IDs (single, double, triple) per section in SEGMENT_ORDER order
+ZONE_MISS = 0
+ZONE_OUTER_BULL = 1
+ZONE_INNER_BULL = 2
+ZONE_SECTION_BASE = 3
+ZONE_SEGMENT = np.concatenate([[0, BULL_SEGMENT, BULL_SEGMENT], np.repeat(SEGMENT_ORDER, 3)]).astype(np.int32)
+ZONE_MULTIPLIER = np.concatenate([[0, 1, 2], np.tile([1, 2, 3], len(SEGMENT_ORDER))]).astype(np.int8)
+
+@dataclass
+class ScoringZone:
+    points: int
+    center: np.ndarray
+    radius: float
+    confidence: float
+
+@dataclass
+class BatchScore:
+    """Vectorized scoring result, one entry per input position"""
+    score: np.ndarray       # int32, segment * multiplier (0 for a miss)
+    multiplier: np.ndarray  # int8, 0 miss, 1 single, 2 double, 3 triple
+    segment: np.ndarray     # int32, board number, 25 for the bull, 0 for a miss
+    confidence: np.ndarray  # float64 in [0, 1]
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+class ZoneLookupTable:
+    """
+    Precomputed uint8 raster of zone IDs covering the scoring area.
+    Built once from a ScoringSystem's geometry; classification is then a
+    single index lookup per position.
+    """
+
+    def __init__(self, table: np.ndarray, resolution: float, extent: float):
+        self.table = table
+        self.resolution = resolution
+        self.extent = extent  # half-width of the raster in meters
+        self.size = table.shape[0]
+
+    @classmethod
+    def build(cls, scoring: 'ScoringSystem', resolution: float) -> 'ZoneLookupTable':
+        """Rasterize the board by classifying every cell centre"""
+        extent = scoring.double_ring_radius + scoring.ring_width
+        size = int(np.ceil(2 * extent / resolution))
+        centers = -extent + (np.arange(size) + 0.5) * resolution
+        table = np.empty((size, size), dtype=np.uint8)
+
+        # Classify row blocks to bound temporary memory at fine resolutions
+        rows_per_block = max(1, 2_000_000 // size)
+        for start in range(0, size, rows_per_block):
+            ys = centers[start:start + rows_per_block]
+            xx, yy = np.meshgrid(centers, ys)
+            distance = np.hypot(xx, yy).ravel()
+            angle = np.mod(np.arctan2(yy, xx), 2 * np.pi).ravel()
+            segment, multiplier, section_index = scoring._classify(distance, angle)
+            table[start:start + len(ys)] = cls._zone_ids(segment, multiplier, section_index).reshape(len(ys), size)
+
+        return cls(table, resolution, extent)
+
+    @classmethod
+    def load_or_build(cls, scoring: 'ScoringSystem', resolution: float,
+                      cache_dir: Optional[str] = None) -> 'ZoneLookupTable':
+        """
+        Load the table from cache_dir if present (memory-mapped, so worker
+        processes share the pages), otherwise build it and save it there.
+        """
+        if cache_dir is None:
+            return cls.build(scoring, resolution)
+
+        extent = scoring.double_ring_radius + scoring.ring_width
+        size = int(np.ceil(2 * extent / resolution))
+        path = os.path.join(cache_dir, f"zone_lut_{cls.geometry_key(scoring, resolution)}.npy")
+
+        if os.path.exists(path):
+            table = np.load(path, mmap_mode='r')
+            if table.shape == (size, size) and table.dtype == np.uint8:
+                return cls(table, resolution, extent)
+
+        lut = cls.build(scoring, resolution)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so concurrent workers never map a partial table
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, lut.table)
+        os.replace(tmp_path, path)
+        return cls(np.load(path, mmap_mode='r'), resolution, extent)
+
+    @staticmethod
+    def geometry_key(scoring: 'ScoringSystem', resolution: float) -> str:
+        """Short hash identifying the board geometry and raster resolution"""
+        geometry = (
+            scoring.double_ring_radius, scoring.triple_ring_radius,
+            scoring.bullseye_radius, scoring.double_bull_radius,
+            scoring.ring_width, resolution, tuple(SEGMENT_ORDER.tolist())
+        )
+        return hashlib.sha1(repr(geometry).encode()).hexdigest()[:12]
+
+    @staticmethod
+    def _zone_ids(segment: np.ndarray, multiplier: np.ndarray, section_index: np.ndarray) -> np.ndarray:
+        zone = ZONE_SECTION_BASE + section_index * 3 + (multiplier.astype(np.int32) - 1)
+        zone = np.where(multiplier == 0, ZONE_MISS, zone)
+        zone = np.where(segment == BULL_SEGMENT, np.where(multiplier == 2, ZONE_INNER_BULL, ZONE_OUTER_BULL), zone)
+        return zone.astype(np.uint8)
+
+    def zone_ids(self, positions: np.ndarray) -> np.ndarray:
+        """Zone ID per (N, 2)/(N, 3) board-plane position"""
+        positions = np.asarray(positions, dtype=np.float64)
+        ix = np.floor((positions[:, 0] + self.extent) / self.resolution).astype(np.intp)
+        iy = np.floor((positions[:, 1] + self.extent) / self.resolution).astype(np.intp)
+        inside = (ix >= 0) & (ix < self.size) & (iy >= 0) & (iy < self.size)
+
+        zones = np.zeros(len(positions), dtype=np.uint8)
+        zones[inside] = self.table[iy[inside], ix[inside]]
+        return zones
+
+    def classify(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns (score, multiplier, segment) arrays via table lookup"""
+        zones = self.zone_ids(positions)
+        segment = ZONE_SEGMENT[zones]
+        multiplier = ZONE_MULTIPLIER[zones]
+        return segment * multiplier, multiplier, segment
+
+class ScoringSystem:
+    def __init__(self, zone_resolution: float = 0.0005, zone_cache_dir: Optional[str] = None):
+        # Standard dartboard measurements (in meters)
+        self.double_ring_radius = 0.170
+        self.triple_ring_radius = 0.107
+        self.bullseye_radius = 0.0127
+        self.double_bull_radius = 0.0318
+        self.ring_width = 0.008  # tolerance band around the double/triple wires
+        self.boundary_tolerance = 0.002  # margin at which confidence saturates
+        self.scoring_zones = self._initialize_scoring_zones()
+
+        # Zone lookup raster, built lazily on first use and again whenever
+        # the geometry key changes
+        self.zone_resolution = zone_resolution
+        self.zone_cache_dir = zone_cache_dir
+        self._zone_table: Optional[ZoneLookupTable] = None
+        self._zone_key: Optional[str] = None
+
+        # Compiled camera -> board transforms, one per calibration version
+        self.board_transforms = BoardTransformCache()
+
+    def _initialize_scoring_zones(self) -> dict:
+        # Define all scoring zones with their positions
+        zones = {}
+        sections = len(SEGMENT_ORDER)
+        for i in range(sections):
+            angle = SECTION_ANGLE * i
+            number = int(SEGMENT_ORDER[i])
+
+            zones[f"single_{number}"] = {
+                'points': number,
+                'multiplier': 1,
+                'angle_start': angle,
+                'angle_end': angle + SECTION_ANGLE
+            }
+            zones[f"double_{number}"] = {
+                'points': number * 2,
+                'multiplier': 2,
+                'radius_inner': self.double_ring_radius - self.ring_width,
+                'radius_outer': self.double_ring_radius
+            }
+            zones[f"triple_{number}"] = {
+                'points': number * 3,
+                'multiplier': 3,
+                'radius_inner': self.triple_ring_radius - self.ring_width,
+                'radius_outer': self.triple_ring_radius
+            }
+
+        return zones
+
+    def detect_impact(self, position: np.ndarray, calibration_data: dict) -> Tuple[int, float]:
+        """
+        Detect which scoring zone was hit and return points and confidence
+        """
+        try:
+            # Transform position to dartboard coordinate system
+            board_position = self._transform_to_board_coordinates(position, calibration_data)
+            result = self.score_batch(np.asarray(board_position, dtype=np.float64).reshape(1, -1))
+            return int(result.score[0]), float(result.confidence[0])
+
+        except Exception as e:
+            print(f"Error in score detection: {e}")
+            return 0, 0.0
+
+    def _transform_to_board_coordinates(self, position: np.ndarray, calibration_data: dict) -> np.ndarray:
+        """
+        Map (N, 3) world points or (N, 2) pixels to (N, 2) board-plane
+        coordinates with the transform compiled for this calibration
+        """
+        return self.board_transforms.get(calibration_data).to_board(position)
+
+    def score_points(self, points: np.ndarray, calibration_data: dict) -> BatchScore:
+        """Transform a batch of camera-space points and score them in one pass"""
+        return self.score_batch(self._transform_to_board_coordinates(points, calibration_data))
+
+    def score_batch(self, positions: np.ndarray) -> BatchScore:
+        """
+        Score an (N, 2) or (N, 3) array of board-plane positions in one pass.
+        Only the x/y components are used; z (height above the board) is ignored.
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        if positions.ndim != 2 or positions.shape[1] not in (2, 3):
+            raise ValueError(f"Expected an (N, 2) or (N, 3) array, got shape {positions.shape}")
+
+        x = positions[:, 0]
+        y = positions[:, 1]
+        distance = np.hypot(x, y)
+        angle = np.mod(np.arctan2(y, x), 2 * np.pi)
+
+        segment, multiplier, section_index = self._classify(distance, angle)
+        confidence = self._calculate_scoring_confidence(distance, angle, section_index)
+
+        return BatchScore(
+            score=segment * multiplier,
+            multiplier=multiplier,
+            segment=segment,
+            confidence=confidence
+        )
+
+    @property
+    def zone_table(self) -> ZoneLookupTable:
+        key = ZoneLookupTable.geometry_key(self, self.zone_resolution)
+        if self._zone_table is None or key != self._zone_key:
+            self._zone_table = ZoneLookupTable.load_or_build(self, self.zone_resolution, self.zone_cache_dir)
+            self._zone_key = key
+        return self._zone_table
+
+    def lookup_zones(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        O(1)-per-point classification through the precomputed zone table.
+        Returns (score, multiplier, segment); accurate to zone_resolution
+        at the wires, use score_batch when confidences are needed.
+        """
+        return self.zone_table.classify(positions)
+
+    def _classify(self, distance: np.ndarray, angle: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Shared ring/segment geometry for the single-point and batch paths.
+        Returns (segment, multiplier, section_index) arrays.
+        """
+        # Clamp guards against angle == 2*pi after floating point wrap-around
+        section_index = np.minimum((angle / SECTION_ANGLE).astype(np.int32), len(SEGMENT_ORDER) - 1)
+        segment = SEGMENT_ORDER[section_index]
+
+        multiplier = np.ones(distance.shape, dtype=np.int8)
+        multiplier[np.abs(distance - self.triple_ring_radius) < self.ring_width] = 3
+        multiplier[np.abs(distance - self.double_ring_radius) < self.ring_width] = 2
+
+        # Anything outside the double ring band missed the scoring area
+        miss = distance >= self.double_ring_radius + self.ring_width
+        multiplier[miss] = 0
+        segment = np.where(miss, 0, segment)
+
+        # Bulls take precedence over the segment; the inner bull is the smaller circle
+        outer_bull = distance <= max(self.bullseye_radius, self.double_bull_radius)
+        inner_bull = distance <= min(self.bullseye_radius, self.double_bull_radius)
+        segment = np.where(outer_bull, BULL_SEGMENT, segment)
+        multiplier[outer_bull] = 1
+        multiplier[inner_bull] = 2
+
+        return segment.astype(np.int32), multiplier, section_index
+
+    def _calculate_scoring_confidence(self, distance: np.ndarray, angle: np.ndarray, section_index: np.ndarray) -> np.ndarray:
+        """
+        Calculate confidence score based on position accuracy.
+        Confidence grows with the distance (in meters) to the nearest zone
+        boundary and saturates once that margin exceeds boundary_tolerance.
+        Returns values between 0.5 and 1, and the fixed bull confidences.
+        """
+        inner_bull_radius = min(self.bullseye_radius, self.double_bull_radius)
+        outer_bull_radius = max(self.bullseye_radius, self.double_bull_radius)
+
+        # Radial margin to every ring edge
+        edges = np.array([
+            outer_bull_radius,
+            self.triple_ring_radius - self.ring_width,
+            self.triple_ring_radius + self.ring_width,
+            self.double_ring_radius - self.ring_width,
+            self.double_ring_radius + self.ring_width,
+        ])
+        radial_margin = np.min(np.abs(distance[:, None] - edges[None, :]), axis=1)
+
+        # Arc-length margin to the nearest segment wire
+        offset = angle - section_index * SECTION_ANGLE
+        angular_margin = np.minimum(offset, SECTION_ANGLE - offset) * distance
+
+        margin = np.minimum(radial_margin, angular_margin)
+        confidence = 0.5 + 0.5 * np.clip(margin / self.boundary_tolerance, 0.0, 1.0)
+
+        confidence = np.where(distance <= outer_bull_radius, 0.90, confidence)
+        confidence = np.where(distance <= inner_bull_radius, 0.95, confidence)
+        return confidence
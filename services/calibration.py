@@ -1,196 +1,308 @@
-
-import cv2
-import numpy as np
-import base64
-import logging
-
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
-
-class CalibrationService:
-    def __init__(self):
-        self.CHECKERBOARD_SIZE = (6, 9)
-        self.captured_images = []
-        self.calibration_data = None
-        logger.info("CalibrationService initialized with checkerboard size: %s", self.CHECKERBOARD_SIZE)
-
-    def data_uri_to_cv2_img(self, uri):
-        try:
-            logger.debug("Converting data URI to CV2 image")
-            if not uri:
-                logger.error("No URI provided")
-                return None
-                
-            # Extract the base64 part
-            if ',' in uri:
-                encoded_data = uri.split(',')[1]
-            else:
-                logger.error("Invalid data URI format")
-                return None
-
-            # Decode base64
-            decoded_data = base64.b64decode(encoded_data)
-            np_data = np.frombuffer(decoded_data, np.uint8)
-            img = cv2.imdecode(np_data, cv2.IMREAD_COLOR)
-            
-            if img is None:
-                logger.error("Failed to decode image")
-                return None
-                
-            logger.debug("Successfully converted data URI to image with shape: %s", img.shape)
-            return img
-        except Exception as e:
-            logger.exception("Error decoding image: %s", str(e))
-            return None
-
-    def find_checkerboard(self, img):
-        try:
-            logger.debug("Looking for checkerboard pattern")
-            if img is None:
-                logger.error("Input image is None")
-                return False, None
-                
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            ret, corners = cv2.findChessboardCorners(gray, self.CHECKERBOARD_SIZE, None)
-            
-            if ret:
-                logger.info("Checkerboard pattern found")
-            else:
-                logger.info("No checkerboard pattern detected")
-                
-            return ret, corners
-        except Exception as e:
-            logger.exception("Error finding checkerboard: %s", str(e))
-            return False, None
-
-def run_intrinsic_calibration(self, images):
-    logger.info("Starting intrinsic calibration with %d images", len(images))
-    objpoints, imgpoints, successful_images = self._process_images(images)
-
-    if successful_images < 10:
-        logger.error("Not enough valid images. Found %d checkerboard patterns.", successful_images)
-        return None, None, None, successful_images
-
-    return self._perform_calibration(objpoints, imgpoints, successful_images)
-
-def _process_images(self, images):
-    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-    objp = np.zeros((self.CHECKERBOARD_SIZE[0] * self.CHECKERBOARD_SIZE[1], 3), np.float32)
-    objp[:,:2] = np.mgrid[0:self.CHECKERBOARD_SIZE[0], 0:self.CHECKERBOARD_SIZE[1]].T.reshape(-1, 2)
-
-    objpoints = []
-    imgpoints = []
-    successful_images = 0
-
-    for i, img in enumerate(images):
-        logger.debug("Processing image %d/%d", i + 1, len(images))
-        try:
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            ret, corners = cv2.findChessboardCorners(gray, self.CHECKERBOARD_SIZE, None)
-            
-            if ret:
-                successful_images += 1
-                objpoints.append(objp)
-                corners2 = cv2.cornerSubPix(gray, corners, (11,11), (-1,-1), criteria)
-                imgpoints.append(corners2)
-                logger.debug("Successfully processed image %d", i + 1)
-            else:
-                logger.warning("No checkerboard found in image %d", i + 1)
-        except Exception as e:
-            logger.exception("Error processing image %d: %s", i + 1, str(e))
-
-    return objpoints, imgpoints, successful_images
-
-def _perform_calibration(self, objpoints, imgpoints, successful_images):
-    try:
-        logger.info("Running calibrateCamera with %d successful images", successful_images)
-        ret, mtx, dist, rvecs, tvecs = cv2.calibrateCamera(objpoints, imgpoints, self.gray_shape, None, None)
-        
-        if not ret:
-            logger.error("Calibration failed")
-            return None, None, None, successful_images
-        
-        total_error = self._calculate_reprojection_error(objpoints, imgpoints, rvecs, tvecs, mtx, dist)
-        
-        logger.info("Calibration successful. Reprojection error: %f", total_error)
-        return mtx, dist, total_error, successful_images
-
-    except Exception as e:
-        logger.exception("Error during calibration: %s", str(e))
-        return None, None, None, successful_images
-
-def _calculate_reprojection_error(self, objpoints, imgpoints, rvecs, tvecs, mtx, dist):
-    mean_error = 0
-    for i in range(len(objpoints)):
-        imgpoints2, _ = cv2.projectPoints(objpoints[i], rvecs[i], tvecs[i], mtx, dist)
-        error = cv2.norm(imgpoints[i], imgpoints2, cv2.NORM_L2)/len(imgpoints2)
-        mean_error += error
-    return mean_error/len(objpoints)
-
-    def process_image(self, image_data):
-        logger.info("Processing new image")
-        img = self.data_uri_to_cv2_img(image_data)
-        
-        if img is None:
-            logger.error("Failed to process image")
-            return {"success": False, "error": "Failed to process image"}
-
-        ret, corners = self.find_checkerboard(img)
-        
-        if ret:
-            self.captured_images.append(img)
-            logger.info("Image captured successfully. Total images: %d", len(self.captured_images))
-            return {
-                "success": True,
-                "message": f"Image {len(self.captured_images)} captured successfully",
-                "detected": True
-            }
-        else:
-            logger.warning("No checkerboard pattern detected")
-            return {
-                "success": True,
-                "message": "No checkerboard pattern detected",
-                "detected": False
-            }
-
-    def get_status(self):
-        if len(self.captured_images) < 15:
-            logger.info("Not enough images captured yet: %d/15", len(self.captured_images))
-            return {
-                "status": "collecting",
-                "progress": (len(self.captured_images) / 15) * 100,
-                "message": f"Captured {len(self.captured_images)}/15 images",
-                "imagesRequired": 15 - len(self.captured_images)
-            }
-        
-        if not self.calibration_data:
-            logger.info("Running calibration with %d images", len(self.captured_images))
-            camera_matrix, dist_coeffs, reprojection_error, successful_images = self.run_intrinsic_calibration(self.captured_images)
-            
-            if camera_matrix is None:
-                logger.error("Calibration failed. Only %d valid images found.", successful_images)
-                return {
-                    "status": "error",
-                    "message": f"Not enough valid images. Only {successful_images} images with clear checkerboard patterns.",
-                    "progress": 0
-                }
-            
-            self.calibration_data = {
-                "cameraMatrix": camera_matrix.tolist(),
-                "distCoeffs": dist_coeffs.tolist(),
-                "reprojectionError": float(reprojection_error)
-            }
-            logger.info("Calibration completed successfully")
-        
-        return {
-            "status": "complete",
-            "progress": 100,
-            "message": "Calibration complete",
-            **self.calibration_data
-        }
-
-    def stop(self):
-        logger.info("Stopping calibration and clearing data")
-        self.captured_images = []
-        self.calibration_data = None
-
+import cv2
+import numpy as np
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from image_decoder import decode_data_uri, decode_image_bytes
+from chessboard import SUBPIX_CRITERIA, find_chessboard_corners, refine_corners, to_gray
+from recalibration import OutlierRejectionConfig, calibrate_with_outlier_rejection
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+class CalibrationService:
+    SUBPIX_CRITERIA = SUBPIX_CRITERIA
+
+    def __init__(self, max_workers=None, keep_thumbnails=False, thumbnail_width=320, search_dimension=640,
+                 outlier_rejection=None):
+        self.CHECKERBOARD_SIZE = (6, 9)
+        # Pyramid chessboard search: longest side of the downscaled copy (0 = full resolution)
+        self.search_dimension = search_dimension
+        # Only the refined corners of each capture are kept, not the image
+        self.corner_futures = []
+        self.keep_thumbnails = keep_thumbnails
+        self.thumbnail_width = thumbnail_width
+        self.thumbnails = []  # JPEG bytes per capture, for review
+        self.calibration_data = None
+        self.reprojection_errors = None  # ReprojectionErrors of the last calibration
+        self.outlier_rejection = outlier_rejection or OutlierRejectionConfig()
+        self.view_captures = []  # capture index of each view passed to calibration
+        self.removed_views = []
+        self.gray_shape = None
+        self._lock = Lock()
+        # Corner detection/refinement releases the GIL, so threads run it in
+        # parallel; the pool is started on first use and shut down by stop()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._executor_lock = Lock()
+        logger.info("CalibrationService initialized with checkerboard size: %s", self.CHECKERBOARD_SIZE)
+
+    @property
+    def executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def data_uri_to_cv2_img(self, uri):
+        try:
+            logger.debug("Converting data URI to CV2 image")
+            if not uri:
+                logger.error("No URI provided")
+                return None
+
+            img = decode_data_uri(uri)
+            logger.debug("Successfully converted data URI to image with shape: %s", img.shape)
+            return img
+        except ValueError as e:
+            logger.error("Failed to decode image: %s", str(e))
+            return None
+        except Exception as e:
+            logger.exception("Error decoding image: %s", str(e))
+            return None
+
+    def decode_image(self, image_data):
+        """Decode raw encoded bytes, falling back to the data URI path for strings"""
+        if isinstance(image_data, (bytes, bytearray, memoryview)):
+            try:
+                return decode_image_bytes(image_data)
+            except ValueError as e:
+                logger.error("Failed to decode image: %s", str(e))
+                return None
+        return self.data_uri_to_cv2_img(image_data)
+
+    def find_checkerboard(self, img):
+        try:
+            logger.debug("Looking for checkerboard pattern")
+            if img is None:
+                logger.error("Input image is None")
+                return False, None
+                
+            # Unrefined; process_image refines at full resolution on the pool
+            ret, corners = find_chessboard_corners(
+                img, self.CHECKERBOARD_SIZE, self.search_dimension, refine=False)
+            
+            if ret:
+                logger.info("Checkerboard pattern found")
+            else:
+                logger.info("No checkerboard pattern detected")
+                
+            return ret, corners
+        except Exception as e:
+            logger.exception("Error finding checkerboard: %s", str(e))
+            return False, None
+
+    def run_intrinsic_calibration(self, images):
+        logger.info("Starting intrinsic calibration with %d images", len(images))
+        objpoints, imgpoints, successful_images = self._process_images(images)
+
+        if successful_images < 10:
+            logger.error("Not enough valid images. Found %d checkerboard patterns.", successful_images)
+            return None, None, None, successful_images
+
+        return self._perform_calibration(objpoints, imgpoints, successful_images)
+
+    def _object_points(self):
+        objp = np.zeros((self.CHECKERBOARD_SIZE[0] * self.CHECKERBOARD_SIZE[1], 3), np.float32)
+        objp[:,:2] = np.mgrid[0:self.CHECKERBOARD_SIZE[0], 0:self.CHECKERBOARD_SIZE[1]].T.reshape(-1, 2)
+        return objp
+
+    def _detect_and_refine(self, img, corners=None):
+        """
+        Find (unless already found) and refine the checkerboard corners of one
+        image. Runs on the worker pool; OpenCV releases the GIL here.
+        Returns (refined corners or None, (width, height)).
+        """
+        gray = to_gray(img)
+        if corners is None:
+            ret, corners = find_chessboard_corners(
+                gray, self.CHECKERBOARD_SIZE, self.search_dimension, refine=False)
+            if not ret:
+                return None, gray.shape[::-1]
+        refined = refine_corners(gray, corners, (11,11), self.SUBPIX_CRITERIA)
+        return refined, gray.shape[::-1]
+
+    def _process_images(self, images):
+        objp = self._object_points()
+
+        objpoints = []
+        imgpoints = []
+        successful_images = 0
+        self.view_captures = []
+
+        # Detect and refine all images concurrently
+        futures = [self.executor.submit(self._detect_and_refine, img) for img in images]
+        for i, future in enumerate(futures):
+            logger.debug("Processing image %d/%d", i + 1, len(images))
+            try:
+                corners2, image_size = future.result()
+                self.gray_shape = image_size
+
+                if corners2 is not None:
+                    successful_images += 1
+                    objpoints.append(objp)
+                    imgpoints.append(corners2)
+                    self.view_captures.append(i)
+                    logger.debug("Successfully processed image %d", i + 1)
+                else:
+                    logger.warning("No checkerboard found in image %d", i + 1)
+            except Exception as e:
+                logger.exception("Error processing image %d: %s", i + 1, str(e))
+
+        return objpoints, imgpoints, successful_images
+
+    def _perform_calibration(self, objpoints, imgpoints, successful_images):
+        try:
+            logger.info("Running calibrateCamera with %d successful images", successful_images)
+            refined = calibrate_with_outlier_rejection(objpoints, imgpoints, self.gray_shape, self.outlier_rejection)
+
+            if refined is None:
+                logger.error("Calibration failed")
+                return None, None, None, successful_images
+
+            self.reprojection_errors = refined.errors
+            self.removed_views = [
+                {"capture": self.view_captures[view.index] if view.index < len(self.view_captures) else view.index,
+                 "rms": view.rms}
+                for view in refined.removed_views
+            ]
+            if self.removed_views:
+                logger.info("Pruned %d outlier views: %s", len(self.removed_views), self.removed_views)
+
+            logger.info("Calibration successful. Reprojection error: %f", refined.rms)
+            return refined.camera_matrix, refined.dist_coeffs, refined.rms, len(refined.kept_views)
+
+        except Exception as e:
+            logger.exception("Error during calibration: %s", str(e))
+            return None, None, None, successful_images
+
+    def _collect_corners(self):
+        """Wait for outstanding refinements and return the cached corner sets"""
+        objp = self._object_points()
+        objpoints = []
+        imgpoints = []
+        self.view_captures = []
+
+        with self._lock:
+            futures = list(self.corner_futures)
+        for i, future in enumerate(futures):
+            try:
+                corners, image_size = future.result()
+            except Exception as e:
+                logger.exception("Error refining corners of image %d: %s", i + 1, str(e))
+                continue
+            if corners is not None:
+                self.gray_shape = image_size
+                objpoints.append(objp)
+                imgpoints.append(corners)
+                self.view_captures.append(i)
+
+        return objpoints, imgpoints, len(imgpoints)
+
+    def _make_thumbnail(self, img):
+        """Downscaled JPEG of a capture so operators can review the set"""
+        height, width = img.shape[:2]
+        scale = min(1.0, self.thumbnail_width / width)
+        if scale < 1.0:
+            img = cv2.resize(img, (self.thumbnail_width, int(round(height * scale))), interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        return buf.tobytes() if ok else None
+
+    @property
+    def capture_count(self):
+        return len(self.corner_futures)
+
+    def process_image(self, image_data):
+        logger.info("Processing new image")
+        img = self.decode_image(image_data)
+
+        if img is None:
+            logger.error("Failed to process image")
+            return {"success": False, "error": "Failed to process image"}
+
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        ret, corners = self.find_checkerboard(gray)
+
+        if ret:
+            thumbnail = self._make_thumbnail(img) if self.keep_thumbnails else None
+            with self._lock:
+                # Refine in the background; the grayscale copy is released once
+                # the future resolves to the corner array
+                self.corner_futures.append(self.executor.submit(self._detect_and_refine, gray, corners))
+                if thumbnail is not None:
+                    self.thumbnails.append(thumbnail)
+                captured = len(self.corner_futures)
+            logger.info("Image captured successfully. Total images: %d", captured)
+            return {
+                "success": True,
+                "message": f"Image {captured} captured successfully",
+                "detected": True
+            }
+        else:
+            logger.warning("No checkerboard pattern detected")
+            return {
+                "success": True,
+                "message": "No checkerboard pattern detected",
+                "detected": False
+            }
+
+    def get_status(self):
+        captured = self.capture_count
+        if captured < 15:
+            logger.info("Not enough images captured yet: %d/15", captured)
+            return {
+                "status": "collecting",
+                "progress": (captured / 15) * 100,
+                "message": f"Captured {captured}/15 images",
+                "imagesRequired": 15 - captured
+            }
+
+        if not self.calibration_data:
+            logger.info("Running calibration with %d images", captured)
+            objpoints, imgpoints, successful_images = self._collect_corners()
+            if successful_images < 10:
+                logger.error("Not enough valid images. Found %d checkerboard patterns.", successful_images)
+                camera_matrix = None
+            else:
+                camera_matrix, dist_coeffs, reprojection_error, successful_images = self._perform_calibration(
+                    objpoints, imgpoints, successful_images)
+
+            if camera_matrix is None:
+                logger.error("Calibration failed. Only %d valid images found.", successful_images)
+                return {
+                    "status": "error",
+                    "message": f"Not enough valid images. Only {successful_images} images with clear checkerboard patterns.",
+                    "progress": 0
+                }
+
+            self.calibration_data = {
+                "cameraMatrix": camera_matrix.tolist(),
+                "distCoeffs": dist_coeffs.tolist(),
+                "reprojectionError": float(reprojection_error),
+                "removedViews": self.removed_views
+            }
+            logger.info("Calibration completed successfully")
+
+        return {
+            "status": "complete",
+            "progress": 100,
+            "message": "Calibration complete",
+            **self.calibration_data
+        }
+
+    def stop(self):
+        logger.info("Stopping calibration and clearing data")
+        with self._lock:
+            for future in self.corner_futures:
+                future.cancel()
+            self.corner_futures = []
+            self.thumbnails = []
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.calibration_data = None
+        self.reprojection_errors = None
+        self.view_captures = []
+        self.removed_views = []
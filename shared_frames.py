@@ -0,0 +1,238 @@
+import cv2
+import numpy as np
+import multiprocessing as mp
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import time
+from aruco_registry import detector_registry
+
+# Slot states; a slot moves FREE -> WRITING -> READY -> READING -> FREE
+FREE = 0
+WRITING = 1
+READY = 2
+READING = 3
+
+_HEADER_ALIGN = 64
+
+@dataclass(frozen=True)
+class RingHandle:
+    """Everything a child process needs to attach to a ring"""
+    name: str
+    num_slots: int
+    frame_shape: Tuple[int, ...]
+    dtype: str
+    lock: object  # multiprocessing.Lock; only picklable while spawning processes
+
+@dataclass(frozen=True)
+class SlotDescriptor:
+    """Small message sent to workers in place of the frame itself"""
+    slot: int
+    seq: int
+    timestamp: float
+    camera_id: str = ''
+
+class SharedFrameRing:
+    """
+    Fixed-slot frame ring in multiprocessing.shared_memory. Capture
+    processes write frames into free slots and pass a SlotDescriptor to
+    detection workers, which get a zero-copy NumPy view of the slot.
+    Ownership is explicit: a writer owns a slot between acquire_write() and
+    commit(), a reader between acquire_read() and release(). When the ring
+    is full the writer reclaims the oldest READY slot; slots being read are
+    never overwritten.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, num_slots: int,
+                 frame_shape: Tuple[int, ...], dtype, lock, owner: bool):
+        self.shm = shm
+        self.num_slots = num_slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.lock = lock
+        self.owner = owner
+
+        # Header: slot states, sequence numbers, timestamps, then counters
+        offset = 0
+        self.states = np.ndarray((num_slots,), dtype=np.int32, buffer=shm.buf, offset=offset)
+        offset += num_slots * 4
+        self.seqs = np.ndarray((num_slots,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += num_slots * 8
+        self.timestamps = np.ndarray((num_slots,), dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset += num_slots * 8
+        # [next_seq, frames_written, frames_overwritten, writes_rejected]
+        self.counters = np.ndarray((4,), dtype=np.int64, buffer=shm.buf, offset=offset)
+
+        self.frames = np.ndarray(
+            (num_slots,) + self.frame_shape, dtype=self.dtype,
+            buffer=shm.buf, offset=self.header_size(num_slots)
+        )
+
+    @staticmethod
+    def header_size(num_slots: int) -> int:
+        size = num_slots * (4 + 8 + 8) + 4 * 8
+        return (size + _HEADER_ALIGN - 1) // _HEADER_ALIGN * _HEADER_ALIGN
+
+    @classmethod
+    def create(cls, num_slots: int, frame_shape: Tuple[int, ...], dtype=np.uint8,
+               name: Optional[str] = None, mp_context=None) -> 'SharedFrameRing':
+        """
+        Allocate a new ring; the creating process is responsible for unlink().
+        The ring's lock comes from mp_context (default: the default context),
+        which must be the context the worker processes are started with,
+        e.g. the pool's mp_context=get_context('spawn').
+        """
+        frame_bytes = int(np.prod(frame_shape)) * np.dtype(dtype).itemsize
+        size = cls.header_size(num_slots) + num_slots * frame_bytes
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        lock = (mp_context or mp.get_context()).Lock()
+        ring = cls(shm, num_slots, frame_shape, dtype, lock, owner=True)
+        ring.states[:] = FREE
+        ring.seqs[:] = -1
+        ring.counters[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, handle: RingHandle) -> 'SharedFrameRing':
+        """Map an existing ring created by another process"""
+        try:
+            shm = shared_memory.SharedMemory(name=handle.name, track=False)
+        except TypeError:
+            # Python < 3.13 always registers the segment with a resource tracker.
+            # Children started by multiprocessing share the creator's tracker,
+            # but an unrelated process gets its own, which would unlink the
+            # segment when that (non-owning) process exits
+            from multiprocessing import resource_tracker
+            shared_tracker = resource_tracker._resource_tracker._fd is not None
+            shm = shared_memory.SharedMemory(name=handle.name)
+            if not shared_tracker:
+                resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(shm, handle.num_slots, handle.frame_shape, handle.dtype, handle.lock, owner=False)
+
+    @property
+    def handle(self) -> RingHandle:
+        return RingHandle(self.shm.name, self.num_slots, self.frame_shape, self.dtype.str, self.lock)
+
+    def acquire_write(self, overwrite: bool = True) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Claim a slot for writing. Returns (slot, writable view) or None if
+        every slot is in use (or READY and overwrite is False).
+        """
+        with self.lock:
+            free = np.flatnonzero(self.states == FREE)
+            if len(free):
+                slot = int(free[0])
+            elif overwrite and np.any(self.states == READY):
+                # Reclaim the oldest frame nobody has started reading
+                ready = np.flatnonzero(self.states == READY)
+                slot = int(ready[np.argmin(self.seqs[ready])])
+                self.counters[2] += 1
+            else:
+                self.counters[3] += 1
+                return None
+            self.states[slot] = WRITING
+        return slot, self.frames[slot]
+
+    def commit(self, slot: int, timestamp: Optional[float] = None, camera_id: str = '') -> SlotDescriptor:
+        """Publish a written slot and return the descriptor to hand to a reader"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            if self.states[slot] != WRITING:
+                raise RuntimeError(f"Slot {slot} is not held for writing")
+            seq = int(self.counters[0])
+            self.counters[0] += 1
+            self.counters[1] += 1
+            self.seqs[slot] = seq
+            self.timestamps[slot] = timestamp
+            self.states[slot] = READY
+        return SlotDescriptor(slot=slot, seq=seq, timestamp=timestamp, camera_id=camera_id)
+
+    def abort_write(self, slot: int):
+        """Give a claimed slot back without publishing it"""
+        with self.lock:
+            if self.states[slot] == WRITING:
+                self.states[slot] = FREE
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None,
+              camera_id: str = '') -> Optional[SlotDescriptor]:
+        """Copy a frame into the ring in one step; None if no slot was available"""
+        claimed = self.acquire_write()
+        if claimed is None:
+            return None
+        slot, view = claimed
+        np.copyto(view, frame)
+        return self.commit(slot, timestamp, camera_id)
+
+    def acquire_read(self, descriptor: SlotDescriptor) -> Optional[np.ndarray]:
+        """
+        Zero-copy, read-only view of the described frame, or None if the slot
+        was already reclaimed for a newer frame. Call release() when done.
+        """
+        with self.lock:
+            if self.states[descriptor.slot] != READY or self.seqs[descriptor.slot] != descriptor.seq:
+                return None
+            self.states[descriptor.slot] = READING
+        view = self.frames[descriptor.slot]
+        view.flags.writeable = False
+        return view
+
+    def release(self, descriptor: SlotDescriptor):
+        """Hand a slot obtained with acquire_read() back to the writers"""
+        with self.lock:
+            if self.states[descriptor.slot] == READING and self.seqs[descriptor.slot] == descriptor.seq:
+                self.states[descriptor.slot] = FREE
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'frames_written': int(self.counters[1]),
+                'frames_overwritten': int(self.counters[2]),
+                'writes_rejected': int(self.counters[3]),
+                'slots_ready': int(np.count_nonzero(self.states == READY)),
+                'slots_reading': int(np.count_nonzero(self.states == READING)),
+            }
+
+    def close(self):
+        # Drop our views before unmapping the segment
+        self.states = self.seqs = self.timestamps = self.counters = self.frames = None
+        self.shm.close()
+
+    def unlink(self):
+        """Destroy the segment; only the creating process should call this"""
+        if self.owner:
+            self.shm.unlink()
+
+# Ring attached by the current worker process, set by init_ring_worker
+_worker_ring: Optional[SharedFrameRing] = None
+
+def init_ring_worker(handle: RingHandle):
+    """Process pool initializer: attach to the ring once per worker process"""
+    global _worker_ring
+    cv2.setNumThreads(1)
+    _worker_ring = SharedFrameRing.attach(handle)
+
+def detect_markers_in_slot(descriptor: SlotDescriptor, dictionary_type: int,
+                           profile: str = 'balanced') -> dict:
+    """
+    Worker task: run ArUco detection directly on a shared-memory slot.
+    Use with ProcessPoolExecutor(initializer=init_ring_worker, initargs=(ring.handle,)),
+    started with the same mp_context the ring was created with.
+    """
+    frame = _worker_ring.acquire_read(descriptor)
+    if frame is None:
+        return {'seq': descriptor.seq, 'camera_id': descriptor.camera_id, 'success': False,
+                'error': 'Frame was overwritten before it could be processed'}
+    try:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        corners, ids, rejected = detector_registry.get(dictionary_type, profile).detectMarkers(gray)
+    finally:
+        _worker_ring.release(descriptor)
+
+    return {
+        'seq': descriptor.seq,
+        'camera_id': descriptor.camera_id,
+        'timestamp': descriptor.timestamp,
+        'success': True,
+        'ids': ids.flatten().tolist() if ids is not None else [],
+        'corners': [quad.reshape(4, 2).tolist() for quad in corners],
+    }
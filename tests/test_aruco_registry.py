@@ -0,0 +1,59 @@
+import threading
+import cv2
+import numpy as np
+from aruco_registry import DetectorRegistry
+
+DICTIONARY = cv2.aruco.DICT_4X4_50
+
+def in_new_thread(fn):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+def test_warmed_up_detector_is_shared_across_threads():
+    registry = DetectorRegistry()
+    registry.warm_up([(DICTIONARY, 'fast')])
+    warmed = registry.get(DICTIONARY, 'fast')
+
+    # Thread-per-request servers get the detector built by warm_up()
+    assert in_new_thread(lambda: registry.get(DICTIONARY, 'fast')) is warmed
+    assert registry.get(DICTIONARY, 'default') is not warmed
+
+def test_concurrent_first_use_builds_one_detector():
+    registry = DetectorRegistry()
+    barrier = threading.Barrier(8)
+    detectors = []
+
+    def fetch():
+        barrier.wait()
+        detectors.append(registry.get(DICTIONARY, 'balanced'))
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(detector) for detector in detectors}) == 1
+
+def test_shared_detector_detects_from_many_threads():
+    registry = DetectorRegistry()
+    dictionary = registry.get_dictionary(DICTIONARY)
+    image = np.full((400, 400), 255, dtype=np.uint8)
+    image[100:300, 100:300] = cv2.aruco.generateImageMarker(dictionary, 7, 200)
+    detector = registry.get(DICTIONARY)
+
+    ids = [in_new_thread(lambda: registry.get(DICTIONARY).detectMarkers(image)[1]) for _ in range(4)]
+    assert all(found is not None and found.ravel().tolist() == [7] for found in ids)
+    assert registry.get(DICTIONARY) is detector
+
+def test_replacing_a_parameter_set_rebuilds_its_detectors():
+    registry = DetectorRegistry()
+    before = registry.get(DICTIONARY, 'fast')
+    default = registry.get(DICTIONARY, 'default')
+    registry.register_parameter_set('fast', {'minDistanceToBorder': 5})
+
+    assert registry.get(DICTIONARY, 'fast') is not before
+    assert registry.get(DICTIONARY, 'default') is default
+    assert registry.get_parameters('fast').minDistanceToBorder == 5
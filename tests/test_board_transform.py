@@ -0,0 +1,37 @@
+import numpy as np
+from board_transform import BoardTransformCache, calibration_key
+
+K = np.array([[1000.0, 0.0, 960.0], [0.0, 1000.0, 540.0], [0.0, 0.0, 1.0]])
+
+def calibration(dist):
+    return {
+        'cameraMatrix': K,
+        'distCoeffs': np.asarray(dist, dtype=np.float64),
+        'homography': np.eye(3),
+        'image_size': (1920, 1080),
+    }
+
+def test_recalibration_through_alias_keys_invalidates_cache():
+    cache = BoardTransformCache()
+    before = cache.get(calibration([-0.2, 0.05, 0.0, 0.0, 0.0]))
+    after = cache.get(calibration([-0.1, 0.02, 0.0, 0.0, 0.0]))
+
+    assert after is not before
+    np.testing.assert_allclose(after.dist_coeffs, [-0.1, 0.02, 0.0, 0.0, 0.0])
+    point = np.array([[100.0, 100.0]])
+    assert not np.allclose(before.to_board(point), after.to_board(point))
+
+def test_alias_and_canonical_keys_share_a_fingerprint():
+    aliased = calibration([-0.2, 0.05, 0.0, 0.0, 0.0])
+    canonical = {
+        'camera_matrix': K,
+        'dist_coeffs': aliased['distCoeffs'],
+        'homography': np.eye(3),
+        'image_size': (1920, 1080),
+    }
+    assert calibration_key(aliased) == calibration_key(canonical)
+
+def test_same_calibration_reuses_cached_transform():
+    cache = BoardTransformCache()
+    data = calibration([-0.2, 0.05, 0.0, 0.0, 0.0])
+    assert cache.get(data) is cache.get(dict(data))
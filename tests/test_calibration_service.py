@@ -0,0 +1,18 @@
+from services.calibration import CalibrationService
+
+def test_stop_shuts_the_worker_pool_down():
+    service = CalibrationService(max_workers=2)
+    executor = service.executor
+    executor.submit(lambda: None).result()
+    service.stop()
+
+    assert executor._shutdown
+    assert service._executor is None
+
+def test_service_is_usable_after_stop():
+    service = CalibrationService(max_workers=2)
+    service.executor.submit(lambda: None).result()
+    service.stop()
+
+    assert service.executor.submit(lambda: 42).result() == 42
+    service.stop()
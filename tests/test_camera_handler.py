@@ -0,0 +1,88 @@
+import time
+import numpy as np
+from camera_handler import CameraHandler, SyntheticCapture
+
+class RecordingSynchronizer:
+    def __init__(self):
+        self.frames = []
+
+    def add_frame(self, camera_id, frame, timestamp):
+        self.frames.append((camera_id, int(frame[0, 0, 0]), timestamp))
+
+def handler(capture):
+    return CameraHandler(0, capture.resolution, capture_factory=lambda camera_id: capture)
+
+def numbered_frames(count):
+    return [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(count)]
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+def test_latest_returns_the_newest_frame():
+    capture = SyntheticCapture((4, 4), fps=0, frames=numbered_frames(10), loop=False)
+    camera = handler(capture)
+    assert camera.start_grabber()
+    assert wait_for(lambda: capture.frame_index == 9 and camera.latest(copy=False).seq == 9)
+
+    latest = camera.latest()
+    assert latest.seq == 9
+    assert latest.frame[0, 0, 0] == 9
+    assert camera.get_frame()[0, 0, 0] == 9
+    camera.release()
+
+def test_frames_replaced_before_being_read_are_counted():
+    capture = SyntheticCapture((4, 4), fps=0, frames=numbered_frames(10), loop=False)
+    camera = handler(capture)
+    camera.start_grabber()
+    wait_for(lambda: capture.frame_index == 9 and camera.grab_failures > 0)
+
+    # Nobody read frames 0-8 before the next one replaced them
+    assert camera.frames_dropped == 9
+    camera.latest()
+    camera.latest()
+    assert camera.frames_dropped == 9
+    camera.release()
+
+def test_slow_reader_sees_increasing_sequence_numbers():
+    camera = handler(SyntheticCapture((8, 8), fps=200.0))
+    camera.start_grabber()
+    assert wait_for(lambda: camera.latest() is not None)
+
+    seqs = []
+    for _ in range(5):
+        time.sleep(0.03)
+        seqs.append(camera.latest().seq)
+    camera.release()
+
+    assert all(later > earlier for earlier, later in zip(seqs, seqs[1:]))
+    assert camera.frames_dropped > 0
+
+def test_grabbed_frames_feed_the_synchronizer():
+    synchronizer = RecordingSynchronizer()
+    camera = handler(SyntheticCapture((4, 4), fps=0, frames=numbered_frames(5), loop=False))
+    camera.start_grabber(synchronizer, sync_camera_id='cam0')
+    assert wait_for(lambda: len(synchronizer.frames) == 5)
+    camera.release()
+
+    assert [camera_id for camera_id, _, _ in synchronizer.frames] == ['cam0'] * 5
+    assert [value for _, value, _ in synchronizer.frames] == list(range(5))
+    timestamps = [timestamp for _, _, timestamp in synchronizer.frames]
+    assert timestamps == sorted(timestamps)
+
+def test_stop_grabber_shuts_the_thread_down():
+    capture = SyntheticCapture((8, 8), fps=5.0)
+    camera = handler(capture)
+    camera.start_grabber()
+    thread = camera._grab_thread
+    assert wait_for(lambda: camera.latest() is not None)
+
+    started = time.monotonic()
+    camera.release()
+    assert time.monotonic() - started < 1.0
+    assert not thread.is_alive()
+    assert not camera.is_grabbing
+    assert not capture.isOpened()
+    assert camera.get_frame() is None
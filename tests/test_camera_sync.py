@@ -0,0 +1,39 @@
+import threading
+import time
+import numpy as np
+from camera_sync import CameraSynchronizer
+
+def test_concurrent_consumers_never_share_a_frame_set():
+    sync = CameraSynchronizer(['cam0', 'cam1'], sync_threshold_ms=5.0, buffer_capacity=64)
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    emitted = []
+    emitted_lock = threading.Lock()
+
+    # Slow matching down so consumers overlap between snapshot and emit
+    find_min_spread = sync._find_min_spread
+    def slow_find_min_spread(candidates):
+        time.sleep(0.002)
+        return find_min_spread(candidates)
+    sync._find_min_spread = slow_find_min_spread
+
+    def consume():
+        while True:
+            synced = sync.next_matched(timeout=0.5)
+            if synced is None:
+                return
+            with emitted_lock:
+                emitted.append(synced.timestamp)
+
+    consumers = [threading.Thread(target=consume) for _ in range(4)]
+    for consumer in consumers:
+        consumer.start()
+    for i in range(100):
+        timestamp = 1000.0 + i * 0.033
+        sync.add_frame('cam0', frame, timestamp)
+        sync.add_frame('cam1', frame, timestamp + 0.001)
+        time.sleep(0.001)
+    for consumer in consumers:
+        consumer.join()
+
+    assert len(emitted) == len(set(emitted))
+    assert sync.match_stats.sets_matched == len(emitted)
@@ -0,0 +1,42 @@
+import numpy as np
+from chessboard import find_chessboard_corners
+
+PATTERN = (9, 6)  # inner corners per row, column
+
+def chessboard_image(size, square, origin):
+    """White frame of the given (width, height) with a 10x7-square board at origin"""
+    width, height = size
+    image = np.full((height, width), 255, dtype=np.uint8)
+    x0, y0 = origin
+    for row in range(PATTERN[1] + 1):
+        for col in range(PATTERN[0] + 1):
+            if (row + col) % 2 == 0:
+                y, x = y0 + row * square, x0 + col * square
+                image[y:y + square, x:x + square] = 0
+    expected = np.array([[x0 + col * square - 0.5, y0 + row * square - 0.5]
+                         for row in range(1, PATTERN[1] + 1) for col in range(1, PATTERN[0] + 1)])
+    return image, expected
+
+def corner_error(corners, expected):
+    corners = corners.reshape(-1, 2)
+    # The detector may order the corners from either end
+    return min(np.abs(corners - expected).max(), np.abs(corners[::-1] - expected).max())
+
+def test_large_board_is_found_on_the_downscaled_copy():
+    image, expected = chessboard_image((2560, 1920), 120, (600, 500))
+    found, corners = find_chessboard_corners(image, PATTERN, fallback=False)
+
+    assert found
+    assert corner_error(corners, expected) < 1.0
+
+def test_small_board_falls_back_to_full_resolution():
+    image, expected = chessboard_image((2560, 1920), 14, (1200, 900))
+    assert not find_chessboard_corners(image, PATTERN, fallback=False)[0]
+
+    found, corners = find_chessboard_corners(image, PATTERN)
+    assert found
+    assert corner_error(corners, expected) < 1.0
+
+def test_frame_without_a_board_is_rejected():
+    image = np.full((1920, 2560), 200, dtype=np.uint8)
+    assert find_chessboard_corners(image, PATTERN) == (False, None)
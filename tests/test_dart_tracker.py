@@ -0,0 +1,70 @@
+import cv2
+import numpy as np
+from app import DartTracker, app
+from camera_sync import SyncedFrame
+from impact_detector import ImpactDetectorConfig
+from triangulation import CameraModel
+
+K = np.array([[1000.0, 0.0, 960.0], [0.0, 1000.0, 540.0], [0.0, 0.0, 1.0]])
+CAMERAS = {
+    'left': CameraModel('left', K, np.zeros(5)),
+    'right': CameraModel('right', K, np.zeros(5), translation=np.array([-0.3, 0.0, 0.0])),
+}
+TARGET = np.array([0.0, 0.0, 2.0])
+FRAME_INTERVAL = 1 / 30
+
+def board(seed):
+    rng = np.random.default_rng(seed)
+    texture = cv2.GaussianBlur(rng.integers(60, 200, (1080, 1920), dtype=np.uint8), (0, 0), 6)
+    return cv2.cvtColor(texture, cv2.COLOR_GRAY2BGR)
+
+def with_dart(frame, camera):
+    tip = tuple(int(v) for v in K[:2] @ (camera.pose @ np.append(TARGET, 1.0)) / TARGET[2])
+    frame = frame.copy()
+    cv2.line(frame, tip, (tip[0] - 160, tip[1] - 140), (20, 20, 20), 10)
+    return frame
+
+def tracker(**kwargs):
+    return DartTracker(CAMERAS, ImpactDetectorConfig(settle_frames=2), **kwargs)
+
+def run(tracker, frames_by_camera):
+    results = []
+    for i, frames in enumerate(zip(*frames_by_camera.values())):
+        synced = SyncedFrame(1000.0 + i * FRAME_INTERVAL, dict(zip(frames_by_camera, frames)), {})
+        results.append(tracker.track_synced(synced))
+    return results
+
+def test_impact_settling_in_different_frame_sets_is_triangulated():
+    left, right = board(0), board(1)
+    # The right camera sees the dart two frame sets later than the left one
+    frames = {
+        'left': [left] + [with_dart(left, CAMERAS['left'])] * 7,
+        'right': [right] * 3 + [with_dart(right, CAMERAS['right'])] * 5,
+    }
+    results = run(tracker(), frames)
+
+    detected = [result for result in results if result['detected']]
+    assert len(detected) == 1
+    assert all(tip is not None for tip in detected[0]['tips'].values())
+    position = detected[0]['position']
+    assert position is not None
+    assert np.linalg.norm(np.array(position['position']) - TARGET) < 0.1
+
+def test_latched_tip_is_released_after_the_timeout():
+    left, right = board(0), board(1)
+    frames = {
+        'left': [left] + [with_dart(left, CAMERAS['left'])] * 8,
+        'right': [right] * 9,
+    }
+    results = run(tracker(latch_timeout=3 * FRAME_INTERVAL), frames)
+
+    assert results[3]['pending'] == ['left']
+    detected = [result for result in results if result['detected']]
+    assert len(detected) == 1
+    assert detected[0]['tips']['right'] is None
+    assert detected[0]['position'] is None
+    assert results[-1] == {'detected': False, 'tips': {}, 'pending': []}
+
+def test_track_dart_requires_a_camera_id():
+    response = app.test_client().post('/api/track-dart', json={'frame': 'data:image/png;base64,'})
+    assert response.status_code == 400
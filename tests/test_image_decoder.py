@@ -0,0 +1,54 @@
+import io
+import cv2
+import numpy as np
+import pytest
+from flask import Flask
+import image_decoder
+from image_decoder import ImageTooLarge, decode_request_image
+
+app = Flask(__name__)
+
+def encoded_image():
+    _, buffer = cv2.imencode('.png', np.full((16, 16, 3), 128, np.uint8))
+    return buffer.tobytes()
+
+class UnreadableStream(io.BytesIO):
+    def read(self, size=-1):
+        raise AssertionError("body read despite an oversized Content-Length")
+
+    readinto = read
+
+def test_oversized_content_length_is_rejected_before_reading():
+    oversized = {'CONTENT_LENGTH': str(image_decoder.MAX_IMAGE_BYTES + 1)}
+    with app.test_request_context('/', method='POST', input_stream=UnreadableStream(), content_type='image/jpeg',
+                                  environ_overrides=oversized):
+        from flask import request
+        with pytest.raises(ImageTooLarge):
+            decode_request_image(request)
+
+def test_app_max_content_length_takes_precedence():
+    app.config['MAX_CONTENT_LENGTH'] = 64
+    try:
+        with app.test_request_context('/', method='POST', data=encoded_image(), content_type='image/png'):
+            from flask import request
+            with pytest.raises(ImageTooLarge):
+                decode_request_image(request)
+    finally:
+        app.config['MAX_CONTENT_LENGTH'] = None
+
+def test_large_receive_buffers_are_not_kept():
+    image_decoder._local.buffer = None
+    small = image_decoder._receive_buffer(1024)
+    kept = image_decoder._local.buffer
+    large = image_decoder._receive_buffer(image_decoder.REUSED_BUFFER_BYTES + 1)
+
+    assert len(small) == 1024
+    assert len(large) == image_decoder.REUSED_BUFFER_BYTES + 1
+    assert image_decoder._local.buffer is kept
+
+def test_raw_body_decodes():
+    with app.test_request_context('/?camera_index=1', method='POST', data=encoded_image(), content_type='image/png'):
+        from flask import request
+        img, params = decode_request_image(request)
+    assert img.shape == (16, 16, 3)
+    assert params == {'camera_index': '1'}
@@ -0,0 +1,54 @@
+import cv2
+import numpy as np
+from impact_detector import OCCLUDED, ImpactDetector, ImpactDetectorConfig
+
+ROI = (560, 140, 800, 800)
+TIP = (940, 520)
+
+def board():
+    rng = np.random.default_rng(0)
+    texture = cv2.GaussianBlur(rng.integers(60, 200, (1080, 1920), dtype=np.uint8), (0, 0), 6)
+    return cv2.cvtColor(texture, cv2.COLOR_GRAY2BGR)
+
+def with_dart(frame):
+    frame = frame.copy()
+    cv2.line(frame, TIP, (1100, 380), (20, 20, 20), 10)
+    return frame
+
+def detector():
+    return ImpactDetector(ImpactDetectorConfig(roi=ROI, settle_frames=2))
+
+def feed(det, frames):
+    return [det.process(frame) for frame in frames]
+
+def test_impact_waits_for_the_dart_to_settle():
+    empty = board()
+    det = detector()
+    events = feed(det, [empty, empty] + [with_dart(empty)] * 4)
+
+    # The dart's arrival is motion; it is reported after settle_frames still frames
+    assert events[2] is None
+    impacts = [event for event in events if event is not None]
+    assert len(impacts) == 1 and impacts[0].kind == 'impact'
+    assert impacts[0].frame_index == 2 + det.config.settle_frames
+    assert np.hypot(impacts[0].tip[0] - TIP[0], impacts[0].tip[1] - TIP[1]) < 10
+
+def test_removed_dart_is_reported_as_pullout():
+    empty = board()
+    det = detector()
+    feed(det, [empty] + [with_dart(empty)] * 4)
+    events = [event for event in feed(det, [empty] * 4) if event is not None]
+
+    assert [event.kind for event in events] == ['pullout']
+    assert np.hypot(events[0].tip[0] - TIP[0], events[0].tip[1] - TIP[1]) < 10
+    assert det.impacts == 1
+
+def test_hand_in_front_of_the_board_is_an_occlusion():
+    empty = board()
+    hand = empty.copy()
+    cv2.ellipse(hand, (1000, 600), (90, 110), 0, 0, 360, (60, 80, 120), -1)
+    det = detector()
+    events = feed(det, [empty] + [hand] * 4)
+
+    assert all(event is None for event in events)
+    assert det.state == OCCLUDED
@@ -0,0 +1,33 @@
+import threading
+import numpy as np
+from metrics import MetricsRegistry
+from optimization import BLOCK, FrameProcessor
+
+FRAME = np.zeros((8, 8, 3), dtype=np.uint8)
+
+def test_stop_returns_with_a_full_block_buffer():
+    processor = FrameProcessor(buffer_size=2, num_workers=2, overflow_policy=BLOCK,
+                               metrics=MetricsRegistry())
+    submitter = threading.Thread(target=lambda: [processor.submit(FRAME) for _ in range(6)], daemon=True)
+    submitter.start()
+    submitter.join(timeout=1.0)
+
+    stopper = threading.Thread(target=processor.stop, daemon=True)
+    stopper.start()
+    stopper.join(timeout=10.0)
+    assert not stopper.is_alive()
+    submitter.join(timeout=2.0)
+    assert not submitter.is_alive()
+
+def test_block_delivers_every_frame_in_order():
+    processor = FrameProcessor(buffer_size=2, num_workers=2, overflow_policy=BLOCK,
+                               metrics=MetricsRegistry())
+    submitter = threading.Thread(target=lambda: [processor.submit(FRAME, {'i': i}) for i in range(12)])
+    submitter.start()
+    results = [processor.get_result(timeout=5.0) for _ in range(12)]
+    submitter.join(timeout=5.0)
+    processor.stop()
+
+    assert [result['metadata']['i'] for result in results] == list(range(12))
+    assert [result['seq'] for result in results] == list(range(12))
+    assert processor.results_dropped == 0
@@ -0,0 +1,41 @@
+import cv2
+import numpy as np
+from recalibration import OutlierRejectionConfig, calibrate_with_outlier_rejection
+
+IMAGE_SIZE = (1280, 720)
+K = np.array([[900.0, 0.0, 640.0], [0.0, 900.0, 360.0], [0.0, 0.0, 1.0]])
+DIST = np.array([-0.1, 0.02, 0.0, 0.0, 0.0])
+
+def synthetic_views(count=14, corrupted=(3, 9)):
+    rng = np.random.default_rng(1)
+    grid = np.zeros((6 * 9, 3), np.float32)
+    grid[:, :2] = np.mgrid[0:9, 0:6].T.reshape(-1, 2) * 0.025
+    objpoints, imgpoints = [], []
+    for view in range(count):
+        rvec = rng.uniform(-0.35, 0.35, 3)
+        tvec = np.array([rng.uniform(-0.12, 0.02), rng.uniform(-0.08, 0.0), rng.uniform(0.45, 0.7)])
+        projected, _ = cv2.projectPoints(grid, rvec, tvec, K, DIST)
+        projected = projected + rng.normal(0.0, 0.1, projected.shape)
+        if view in corrupted:
+            projected = projected + rng.normal(0.0, 4.0, projected.shape)
+        objpoints.append(grid)
+        imgpoints.append(projected.astype(np.float32))
+    return objpoints, imgpoints
+
+def test_corrupted_views_are_removed():
+    objpoints, imgpoints = synthetic_views()
+    refined = calibrate_with_outlier_rejection(objpoints, imgpoints, IMAGE_SIZE)
+
+    assert sorted(view.index for view in refined.removed_views) == [3, 9]
+    assert refined.errors.rms < 0.5
+
+def test_pruning_without_enough_improvement_is_discarded():
+    objpoints, imgpoints = synthetic_views()
+    baseline = calibrate_with_outlier_rejection(
+        objpoints, imgpoints, IMAGE_SIZE, OutlierRejectionConfig(max_iterations=0))
+    refined = calibrate_with_outlier_rejection(
+        objpoints, imgpoints, IMAGE_SIZE, OutlierRejectionConfig(min_improvement=1e6))
+
+    assert refined.removed_views == []
+    assert refined.kept_views == list(range(len(objpoints)))
+    assert refined.errors.rms == baseline.errors.rms
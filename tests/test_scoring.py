@@ -0,0 +1,68 @@
+import math
+import numpy as np
+from scoring import SECTION_ANGLE, SEGMENT_ORDER, ScoringSystem
+
+# Board pose equal to the world frame: detect_impact scores (x, y, 0) as (x, y)
+IDENTITY_POSE = {'board_rotation': np.eye(3), 'board_translation': np.zeros(3)}
+
+def reference_score(scoring, x, y):
+    """Per-point rules of a standard board, written out longhand"""
+    distance = math.hypot(x, y)
+    if distance <= min(scoring.bullseye_radius, scoring.double_bull_radius):
+        return 50
+    if distance <= max(scoring.bullseye_radius, scoring.double_bull_radius):
+        return 25
+    if distance >= scoring.double_ring_radius + scoring.ring_width:
+        return 0
+    angle = math.atan2(y, x) % (2 * math.pi)
+    segment = int(SEGMENT_ORDER[min(int(angle / SECTION_ANGLE), len(SEGMENT_ORDER) - 1)])
+    if abs(distance - scoring.double_ring_radius) < scoring.ring_width:
+        return segment * 2
+    if abs(distance - scoring.triple_ring_radius) < scoring.ring_width:
+        return segment * 3
+    return segment
+
+def boundary_points(scoring, eps=1e-6):
+    """Points just inside and outside every ring edge, bull edge and segment wire"""
+    inner_bull = min(scoring.bullseye_radius, scoring.double_bull_radius)
+    outer_bull = max(scoring.bullseye_radius, scoring.double_bull_radius)
+    radii = [inner_bull, outer_bull]
+    for ring in (scoring.triple_ring_radius, scoring.double_ring_radius):
+        radii += [ring - scoring.ring_width, ring + scoring.ring_width]
+    radii = [r + offset for r in radii for offset in (-eps, 0.0, eps)] + [0.0, 0.06, 0.14]
+
+    wire_angles = np.arange(len(SEGMENT_ORDER)) * SECTION_ANGLE
+    angles = np.concatenate([wire_angles - eps, wire_angles + eps, wire_angles + SECTION_ANGLE / 2])
+    rr, aa = np.meshgrid(radii, angles)
+    return np.column_stack((rr.ravel() * np.cos(aa.ravel()), rr.ravel() * np.sin(aa.ravel())))
+
+def grid_points(step=0.004):
+    axis = np.arange(-0.19, 0.19 + step, step)
+    xx, yy = np.meshgrid(axis, axis)
+    return np.column_stack((xx.ravel(), yy.ravel()))
+
+def test_score_batch_matches_the_per_point_rules():
+    scoring = ScoringSystem()
+    points = np.vstack((grid_points(), boundary_points(scoring)))
+    batch = scoring.score_batch(points)
+
+    expected = [reference_score(scoring, x, y) for x, y in points]
+    np.testing.assert_array_equal(batch.score, expected)
+    assert np.all((batch.confidence >= 0.0) & (batch.confidence <= 1.0))
+
+def test_score_batch_matches_detect_impact():
+    scoring = ScoringSystem()
+    points = np.vstack((grid_points(step=0.02), boundary_points(scoring)))
+    batch = scoring.score_batch(points)
+
+    for i, (x, y) in enumerate(points):
+        score, confidence = scoring.detect_impact(np.array([x, y, 0.0]), IDENTITY_POSE)
+        assert score == batch.score[i], (x, y)
+        assert math.isclose(confidence, batch.confidence[i], abs_tol=1e-9), (x, y)
+
+def test_three_dimensional_positions_ignore_height():
+    scoring = ScoringSystem()
+    points = boundary_points(scoring)
+    lifted = np.column_stack((points, np.full(len(points), 0.01)))
+
+    np.testing.assert_array_equal(scoring.score_batch(lifted).score, scoring.score_batch(points).score)
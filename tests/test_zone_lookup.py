@@ -0,0 +1,79 @@
+import os
+import numpy as np
+from scoring import SECTION_ANGLE, ScoringSystem, ZoneLookupTable
+
+RESOLUTION = 0.001
+
+def cell_centers(lut):
+    centers = -lut.extent + (np.arange(lut.size) + 0.5) * lut.resolution
+    xx, yy = np.meshgrid(centers, centers)
+    return np.column_stack((xx.ravel(), yy.ravel()))
+
+def analytic(scoring, points):
+    distance = np.hypot(points[:, 0], points[:, 1])
+    angle = np.mod(np.arctan2(points[:, 1], points[:, 0]), 2 * np.pi)
+    segment, multiplier, _ = scoring._classify(distance, angle)
+    return segment * multiplier, multiplier, segment
+
+def boundary_margin(scoring, points):
+    """Distance from each point to the nearest ring edge or segment wire"""
+    distance = np.hypot(points[:, 0], points[:, 1])
+    edges = np.array([
+        scoring.bullseye_radius, scoring.double_bull_radius,
+        scoring.triple_ring_radius - scoring.ring_width, scoring.triple_ring_radius + scoring.ring_width,
+        scoring.double_ring_radius - scoring.ring_width, scoring.double_ring_radius + scoring.ring_width,
+    ])
+    radial = np.min(np.abs(distance[:, None] - edges[None, :]), axis=1)
+    offset = np.mod(np.arctan2(points[:, 1], points[:, 0]), SECTION_ANGLE)
+    wire = np.minimum(offset, SECTION_ANGLE - offset) * distance
+    return np.minimum(radial, wire)
+
+def test_raster_agrees_with_classify_at_every_cell():
+    scoring = ScoringSystem(zone_resolution=RESOLUTION)
+    points = cell_centers(scoring.zone_table)
+
+    for looked_up, expected in zip(scoring.lookup_zones(points), analytic(scoring, points)):
+        np.testing.assert_array_equal(looked_up, expected)
+
+def test_raster_disagrees_only_within_a_cell_of_a_boundary():
+    scoring = ScoringSystem(zone_resolution=RESOLUTION)
+    points = np.random.default_rng(0).uniform(-0.2, 0.2, (20000, 2))
+    looked_up, _, _ = scoring.lookup_zones(points)
+    expected, _, _ = analytic(scoring, points)
+
+    # Any point differing from its cell centre's zone lies within a cell diagonal of a wire
+    mismatched = points[looked_up != expected]
+    assert len(mismatched) > 0
+    assert np.all(boundary_margin(scoring, mismatched) <= RESOLUTION * np.sqrt(2))
+
+def test_cached_table_is_memory_mapped_and_reused(tmp_path):
+    built = ScoringSystem(zone_resolution=RESOLUTION, zone_cache_dir=str(tmp_path)).zone_table
+    loaded = ScoringSystem(zone_resolution=RESOLUTION, zone_cache_dir=str(tmp_path)).zone_table
+
+    assert isinstance(loaded.table, np.memmap)
+    np.testing.assert_array_equal(loaded.table, built.table)
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_geometry_change_rebuilds_the_table(tmp_path):
+    scoring = ScoringSystem(zone_resolution=RESOLUTION, zone_cache_dir=str(tmp_path))
+    point = np.array([[0.0, 0.098]])
+    assert scoring.lookup_zones(point)[1][0] == 1
+
+    # Move the triple ring outwards onto the point: the cached raster is stale
+    scoring.triple_ring_radius = 0.100
+    assert scoring.lookup_zones(point)[1][0] == 3
+    assert len(os.listdir(tmp_path)) == 2
+
+    fresh = ScoringSystem(zone_resolution=RESOLUTION, zone_cache_dir=str(tmp_path))
+    fresh.triple_ring_radius = 0.100
+    assert fresh.lookup_zones(point)[1][0] == 3
+
+def test_cache_file_with_the_wrong_shape_is_rebuilt(tmp_path):
+    scoring = ScoringSystem(zone_resolution=RESOLUTION, zone_cache_dir=str(tmp_path))
+    path = tmp_path / f"zone_lut_{ZoneLookupTable.geometry_key(scoring, RESOLUTION)}.npy"
+    np.save(path, np.zeros((4, 4), dtype=np.uint8))
+
+    lut = scoring.zone_table
+    assert lut.table.shape == (lut.size, lut.size)
+    points = cell_centers(lut)
+    np.testing.assert_array_equal(scoring.lookup_zones(points)[0], analytic(scoring, points)[0])
@@ -0,0 +1,228 @@
+import cv2
+import json
+import numpy as np
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from camera_sync import SyncedFrame
+
+@dataclass
+class CameraModel:
+    """
+    Intrinsics plus the world -> camera pose of one camera:
+    x_cam = rotation @ x_world + translation.
+    """
+    camera_id: str
+    camera_matrix: np.ndarray
+    dist_coeffs: np.ndarray
+    rotation: np.ndarray = field(default_factory=lambda: np.eye(3))
+    translation: np.ndarray = field(default_factory=lambda: np.zeros(3))
+
+    def __post_init__(self):
+        self.camera_matrix = np.asarray(self.camera_matrix, dtype=np.float64).reshape(3, 3)
+        self.dist_coeffs = np.asarray(self.dist_coeffs, dtype=np.float64).ravel()
+        rotation = np.asarray(self.rotation, dtype=np.float64)
+        if rotation.size == 3:
+            rotation, _ = cv2.Rodrigues(rotation.reshape(3, 1))
+        self.rotation = rotation.reshape(3, 3)
+        self.translation = np.asarray(self.translation, dtype=np.float64).reshape(3)
+        # Projection in normalized (undistorted) image coordinates
+        self.pose = np.hstack((self.rotation, self.translation[:, None]))
+        self.focal = np.array([self.camera_matrix[0, 0], self.camera_matrix[1, 1]])
+
+    @classmethod
+    def from_dict(cls, camera_id: str, data: dict) -> 'CameraModel':
+        """
+        Build from stored calibration data. Accepts camera_matrix/mtx,
+        dist_coeffs/dist, and rotation_matrix or rvec plus
+        translation_vector/tvec; a missing pose means the reference camera.
+        """
+        def pick(*keys):
+            for key in keys:
+                if key in data and data[key] is not None:
+                    return data[key]
+            return None
+
+        camera_matrix = pick('camera_matrix', 'cameraMatrix', 'mtx')
+        if camera_matrix is None:
+            raise ValueError(f"No camera matrix for camera {camera_id}")
+        dist_coeffs = pick('dist_coeffs', 'distCoeffs', 'dist')
+        rotation = pick('rotation_matrix', 'rvec')
+        translation = pick('translation_vector', 'tvec')
+        return cls(
+            camera_id=camera_id,
+            camera_matrix=np.asarray(camera_matrix),
+            dist_coeffs=np.zeros(5) if dist_coeffs is None else np.asarray(dist_coeffs),
+            rotation=np.eye(3) if rotation is None else np.asarray(rotation),
+            translation=np.zeros(3) if translation is None else np.asarray(translation)
+        )
+
+    @property
+    def center(self) -> np.ndarray:
+        """Camera centre in world coordinates"""
+        return -self.rotation.T @ self.translation
+
+    def normalize(self, points: np.ndarray) -> np.ndarray:
+        """(N, 2) pixel coordinates -> (N, 2) undistorted normalized coordinates"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 1, 2)
+        return cv2.undistortPoints(points, self.camera_matrix, self.dist_coeffs).reshape(-1, 2)
+
+def load_camera_models(path: str) -> Dict[str, CameraModel]:
+    """Camera models from a JSON file mapping camera id -> calibration dict"""
+    with open(path) as f:
+        data = json.load(f)
+    return {camera_id: CameraModel.from_dict(camera_id, entry) for camera_id, entry in data.items()}
+
+@dataclass
+class TriangulatedPoint:
+    position: np.ndarray        # (3,) world coordinates
+    covariance: np.ndarray      # (3, 3), from the reprojection Jacobian
+    inliers: List[str]          # cameras used for the final estimate
+    reprojection_errors: Dict[str, float]  # pixels, for every camera with a detection
+    rms: float                  # over the inliers, pixels
+
+    @property
+    def num_views(self) -> int:
+        return len(self.inliers)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Per-axis standard deviation"""
+        return np.sqrt(np.clip(np.diag(self.covariance), 0.0, None))
+
+    def as_dict(self) -> dict:
+        return {
+            'position': self.position.tolist(),
+            'covariance': self.covariance.tolist(),
+            'inliers': self.inliers,
+            'reprojection_errors': self.reprojection_errors,
+            'rms': self.rms,
+        }
+
+class TriangulationEngine:
+    """
+    Multi-view triangulation of 2D tip detections. Every camera pair
+    proposes a point (cv2.triangulatePoints on undistorted normalized
+    coordinates); the proposal with the most views reprojecting within
+    inlier_threshold pixels wins. The point is then re-estimated by linear
+    DLT over its inliers and polished with a few Gauss-Newton steps on
+    the reprojection error, whose Jacobian gives the covariance.
+    """
+
+    def __init__(self, cameras: Dict[str, CameraModel], inlier_threshold: float = 3.0,
+                 pixel_sigma: float = 1.0, min_views: int = 2, refine_iterations: int = 3):
+        self.cameras = cameras
+        self.inlier_threshold = inlier_threshold
+        self.pixel_sigma = pixel_sigma
+        self.min_views = max(min_views, 2)
+        self.refine_iterations = refine_iterations
+
+    def triangulate(self, detections: Dict[str, Sequence[float]]) -> Optional[TriangulatedPoint]:
+        """
+        detections maps camera id -> (x, y) pixel position of the tip, or
+        None when that camera saw nothing. Returns None with fewer than
+        min_views consistent views.
+        """
+        camera_ids = [cam for cam, point in detections.items()
+                      if point is not None and cam in self.cameras]
+        if len(camera_ids) < self.min_views:
+            return None
+
+        cameras = [self.cameras[cam] for cam in camera_ids]
+        pixels = np.array([np.asarray(detections[cam], dtype=np.float64).reshape(2) for cam in camera_ids])
+        normalized = np.vstack([camera.normalize(pixel) for camera, pixel in zip(cameras, pixels)])
+        poses = np.stack([camera.pose for camera in cameras])       # (V, 3, 4)
+        focals = np.stack([camera.focal for camera in cameras])     # (V, 2)
+
+        # Hypotheses from every camera pair
+        pairs = list(combinations(range(len(cameras)), 2))
+        hypotheses = np.empty((len(pairs), 3))
+        for k, (i, j) in enumerate(pairs):
+            homogeneous = cv2.triangulatePoints(poses[i], poses[j], normalized[i].reshape(2, 1),
+                                                normalized[j].reshape(2, 1))
+            hypotheses[k] = homogeneous[:3, 0] / homogeneous[3, 0] if homogeneous[3, 0] != 0 else np.nan
+
+        # Score all hypotheses against all views at once: (H, V)
+        errors = self._reprojection_errors(hypotheses, poses, normalized, focals)
+        inlier_mask = errors < self.inlier_threshold
+        counts = inlier_mask.sum(axis=1)
+        total = np.where(inlier_mask, errors, 0.0).sum(axis=1)
+        best = int(np.lexsort((total, -counts))[0])
+        inliers = np.flatnonzero(inlier_mask[best])
+        if len(inliers) < self.min_views:
+            return None
+
+        position = self._dlt(poses[inliers], normalized[inliers])
+        if not np.all(np.isfinite(position)):
+            position = hypotheses[best]
+        position, covariance = self._refine(position, poses[inliers], normalized[inliers], focals[inliers])
+
+        final_errors = self._reprojection_errors(position[None], poses, normalized, focals)[0]
+        inlier_errors = final_errors[inliers]
+        return TriangulatedPoint(
+            position=position,
+            covariance=covariance,
+            inliers=[camera_ids[i] for i in inliers],
+            reprojection_errors={cam: float(err) for cam, err in zip(camera_ids, final_errors)},
+            rms=float(np.sqrt(np.mean(inlier_errors ** 2)))
+        )
+
+    def triangulate_synced(self, synced: SyncedFrame,
+                           detect_tip: Callable[[str, np.ndarray], Optional[Sequence[float]]]
+                           ) -> Optional[TriangulatedPoint]:
+        """Run detect_tip(camera_id, frame) on each frame of a synced set and triangulate"""
+        detections = {camera_id: detect_tip(camera_id, frame) for camera_id, frame in synced.frames.items()}
+        return self.triangulate(detections)
+
+    @staticmethod
+    def _reprojection_errors(points: np.ndarray, poses: np.ndarray, normalized: np.ndarray,
+                             focals: np.ndarray) -> np.ndarray:
+        """(H, 3) points against V views -> (H, V) pixel errors; inf behind a camera"""
+        homogeneous = np.concatenate((points, np.ones((len(points), 1))), axis=1)
+        cam = np.einsum('vij,hj->hvi', poses, homogeneous)  # (H, V, 3)
+        depth = cam[..., 2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            projected = cam[..., :2] / depth[..., None]
+            errors = np.linalg.norm((projected - normalized[None]) * focals[None], axis=2)
+        return np.where((depth > 0) & np.isfinite(errors), errors, np.inf)
+
+    @staticmethod
+    def _dlt(poses: np.ndarray, normalized: np.ndarray) -> np.ndarray:
+        """Linear N-view triangulation"""
+        rows = np.concatenate((
+            normalized[:, 0:1] * poses[:, 2] - poses[:, 0],
+            normalized[:, 1:2] * poses[:, 2] - poses[:, 1],
+        ))
+        _, _, vt = np.linalg.svd(rows)
+        homogeneous = vt[-1]
+        if homogeneous[3] == 0:
+            return np.full(3, np.nan)
+        return homogeneous[:3] / homogeneous[3]
+
+    def _refine(self, position: np.ndarray, poses: np.ndarray, normalized: np.ndarray,
+                focals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Gauss-Newton on pixel reprojection error; returns (position, covariance)"""
+        R = poses[:, :, :3]
+        t = poses[:, :, 3]
+        JtJ = np.eye(3)
+        for _ in range(max(self.refine_iterations, 1)):
+            cam = R @ position + t                        # (V, 3)
+            z = cam[:, 2:3]
+            residual = ((cam[:, :2] / z) - normalized) * focals   # (V, 2)
+            # d(x/z)/dX = (R0 - (x/z) R2) / z, scaled to pixels
+            J = (R[:, :2, :] - (cam[:, :2] / z)[:, :, None] * R[:, 2:3, :]) / z[:, :, None]
+            J = (J * focals[:, :, None]).reshape(-1, 3)
+            JtJ = J.T @ J
+            try:
+                step = np.linalg.solve(JtJ, -J.T @ residual.reshape(-1))
+            except np.linalg.LinAlgError:
+                break
+            position = position + step
+            if np.linalg.norm(step) < 1e-9:
+                break
+
+        try:
+            covariance = np.linalg.inv(JtJ) * self.pixel_sigma ** 2
+        except np.linalg.LinAlgError:
+            covariance = np.full((3, 3), np.inf)
+        return position, covariance
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+import cv2
+import numpy as np
+from threading import Lock
+from typing import Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+def load_intrinsics(calibration_file: str) -> Tuple[np.ndarray, np.ndarray, Optional[Tuple[int, int]]]:
+    """
+    (camera_matrix, dist_coeffs, image_size) from a calibration .npz.
+    Accepts both the mtx/dist keys written by calibration_core and
+    camera_matrix/dist_coeffs; image_size is None if it was not saved.
+    """
+    with np.load(calibration_file) as data:
+        image_size = tuple(int(v) for v in data['image_size']) if 'image_size' in data else None
+        for matrix_key, dist_key in (('camera_matrix', 'dist_coeffs'), ('mtx', 'dist')):
+            if matrix_key in data and dist_key in data:
+                return (np.asarray(data[matrix_key], dtype=np.float64).reshape(3, 3),
+                        np.asarray(data[dist_key], dtype=np.float64).ravel(),
+                        image_size)
+    raise KeyError(f"{calibration_file} has neither camera_matrix/dist_coeffs nor mtx/dist")
+
+class CameraUndistorter:
+    """
+    Undistortion for one calibrated camera. Full-frame remap tables are
+    built once per (calibration, image size) as fixed-point CV_16SC2 maps;
+    when the calibration came from an .npz they are saved next to it and
+    memory-mapped on later runs. undistort_points() only needs the
+    intrinsics and is cheap enough for the hot path.
+    """
+
+    def __init__(self, camera_matrix: np.ndarray, dist_coeffs: np.ndarray,
+                 new_camera_matrix: Optional[np.ndarray] = None,
+                 calibration_file: Optional[str] = None, image_size: Optional[Tuple[int, int]] = None):
+        self.image_size = tuple(image_size) if image_size is not None else None
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64).reshape(3, 3)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64).ravel()
+        self.new_camera_matrix = (self.camera_matrix if new_camera_matrix is None
+                                  else np.asarray(new_camera_matrix, dtype=np.float64).reshape(3, 3))
+        self.calibration_file = calibration_file
+        self._maps: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = Lock()
+
+    @classmethod
+    def from_npz(cls, calibration_file: str, new_camera_matrix: Optional[np.ndarray] = None) -> 'CameraUndistorter':
+        camera_matrix, dist_coeffs, image_size = load_intrinsics(calibration_file)
+        return cls(camera_matrix, dist_coeffs, new_camera_matrix, calibration_file, image_size)
+
+    @property
+    def has_distortion(self) -> bool:
+        return bool(np.any(self.dist_coeffs))
+
+    def fingerprint(self, image_size: Tuple[int, int]) -> str:
+        """Short hash of everything the remap tables depend on"""
+        digest = hashlib.blake2b(digest_size=6)
+        for array in (self.camera_matrix, self.dist_coeffs, self.new_camera_matrix):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(repr(tuple(image_size)).encode())
+        return digest.hexdigest()
+
+    def map_paths(self, image_size: Tuple[int, int]) -> Optional[Tuple[str, str]]:
+        """Where the tables for this size live next to the calibration file"""
+        if self.calibration_file is None:
+            return None
+        base = os.path.splitext(self.calibration_file)[0]
+        width, height = image_size
+        stem = f"{base}.undistort_{width}x{height}_{self.fingerprint(image_size)}"
+        return f"{stem}.map1.npy", f"{stem}.map2.npy"
+
+    def _remove_stale_maps(self, image_size: Tuple[int, int], keep: Tuple[str, str]):
+        """Delete tables left by an earlier calibration of this camera at this size"""
+        directory = os.path.dirname(self.calibration_file) or '.'
+        width, height = image_size
+        prefix = f"{os.path.basename(os.path.splitext(self.calibration_file)[0])}.undistort_{width}x{height}_"
+        keep = {os.path.basename(path) for path in keep}
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name.endswith('.npy') and name not in keep:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def maps(self, image_size: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """(map1, map2) CV_16SC2 remap tables for a (width, height) image"""
+        image_size = (int(image_size[0]), int(image_size[1]))
+        maps = self._maps.get(image_size)
+        if maps is not None:
+            return maps
+        with self._lock:
+            maps = self._maps.get(image_size)
+            if maps is None:
+                maps = self._maps[image_size] = self._load_or_build(image_size)
+            return maps
+
+    def _load_or_build(self, image_size: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        paths = self.map_paths(image_size)
+        if paths is not None and all(os.path.exists(path) for path in paths):
+            try:
+                return np.load(paths[0], mmap_mode='r'), np.load(paths[1], mmap_mode='r')
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable undistortion maps %s: %s", paths[0], str(e))
+
+        map1, map2 = cv2.initUndistortRectifyMap(
+            self.camera_matrix, self.dist_coeffs, None, self.new_camera_matrix, image_size, cv2.CV_16SC2)
+        if paths is None:
+            return map1, map2
+
+        try:
+            for path, table in zip(paths, (map1, map2)):
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, table)
+                os.replace(tmp_path, path)
+            self._remove_stale_maps(image_size, paths)
+            return np.load(paths[0], mmap_mode='r'), np.load(paths[1], mmap_mode='r')
+        except OSError as e:
+            logger.warning("Could not persist undistortion maps next to %s: %s", self.calibration_file, str(e))
+            return map1, map2
+
+    def prepare(self) -> bool:
+        """Map (or build and persist) the tables for the calibrated image size up front"""
+        if self.image_size is None:
+            return False
+        self.maps(self.image_size)
+        return True
+
+    def remap(self, frame: np.ndarray, dst: Optional[np.ndarray] = None,
+              interpolation: int = cv2.INTER_LINEAR) -> np.ndarray:
+        """Undistort a full frame with the precomputed tables"""
+        height, width = frame.shape[:2]
+        map1, map2 = self.maps((width, height))
+        return cv2.remap(frame, map1, map2, interpolation, dst=dst)
+
+    def undistort_points(self, points: np.ndarray, normalized: bool = False) -> np.ndarray:
+        """
+        (N, 2) distorted pixels -> undistorted pixels in new_camera_matrix
+        (or normalized camera coordinates with normalized=True)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 1, 2)
+        if normalized:
+            return cv2.undistortPoints(points, self.camera_matrix, self.dist_coeffs).reshape(-1, 2)
+        if not self.has_distortion and self.new_camera_matrix is self.camera_matrix:
+            return points.reshape(-1, 2)
+        return cv2.undistortPoints(points, self.camera_matrix, self.dist_coeffs,
+                                   P=self.new_camera_matrix).reshape(-1, 2)
+
+class UndistortionService:
+    """Per-camera undistorters, each loaded once from its calibration file"""
+
+    def __init__(self):
+        self._undistorters: Dict[Union[int, str], CameraUndistorter] = {}
+        self._lock = Lock()
+
+    def register(self, camera_id: Union[int, str], undistorter: CameraUndistorter) -> CameraUndistorter:
+        with self._lock:
+            self._undistorters[camera_id] = undistorter
+        return undistorter
+
+    def load(self, camera_id: Union[int, str], calibration_file: str,
+             image_size: Optional[Tuple[int, int]] = None) -> CameraUndistorter:
+        """
+        Load a camera's calibration and map its remap tables now, for
+        image_size or the size stored in the calibration file
+        """
+        undistorter = CameraUndistorter.from_npz(calibration_file)
+        if image_size is not None:
+            undistorter.maps(image_size)
+        else:
+            undistorter.prepare()
+        return self.register(camera_id, undistorter)
+
+    def get(self, camera_id: Union[int, str]) -> Optional[CameraUndistorter]:
+        return self._undistorters.get(camera_id)
+
+    def remap(self, camera_id: Union[int, str], frame: np.ndarray) -> np.ndarray:
+        undistorter = self.get(camera_id)
+        return undistorter.remap(frame) if undistorter is not None else frame
+
+    def undistort_points(self, camera_id: Union[int, str], points: np.ndarray) -> np.ndarray:
+        undistorter = self.get(camera_id)
+        if undistorter is None:
+            return np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return undistorter.undistort_points(points)
+
+# Process-wide service; cameras register as their calibrations are loaded
+undistortion_service = UndistortionService()